@@ -1,39 +1,85 @@
 import argparse
 import sys
 import time
-import cv2
 import numpy as np
-from picamera2 import Picamera2, MappedArray, CompletedRequest
-from picamera2.devices import IMX500
-from picamera2.devices.imx500 import NetworkIntrinsics
-from gpiozero import Motor, PWMOutputDevice
+from src.computer_vision.detections import DetectionPostProcessor
+from src.computer_vision.pipeline import LatencyStats, Stage, format_stats
+from src.computer_vision.tracker import Tracker
+from src.motor_control.control_loop import ControlLoop, TargetEstimate, follow_speeds
+from src.motor_control.motor_driver import MotorDriver
+from src.utils import instrumentation
+from src.utils.instrumentation import CAPTURE, CONTROL, DETECTIONS, METADATA, OVERLAY, count, log, span
+from src.utils.mailbox import Mailbox
 
 
 class RobotFollower:
-    def __init__(self, model_file, camera_num=0):
-        self.imx500 = IMX500(model_file)
-        self.intrinsics = self.imx500.network_intrinsics or NetworkIntrinsics()
-        self.intrinsics.task = "object detection"
-
-        self.picam2 = Picamera2(camera_num=camera_num)
-        config = self.picam2.create_preview_configuration(
-            main={"format": "XRGB8888"},  # ✅ Fixed preview crash
-            controls={"FrameRate": self.intrinsics.inference_rate},
-            buffer_count=12
-        )
-        self.picam2.start(config, show_preview=True)
+    def __init__(self, model_file, camera_num=0, headless=False, targets=("person",), threshold=0.5, top_k=None,
+                 detect_every=1, camera=None, driver=None, recorder=None, clock=time.monotonic,
+                 control_rate=None, lidar=None):
+        self.headless = headless
+        self.detect_every = max(1, detect_every)
+        self._frame_index = 0
+        self.recorder = recorder
+        self.clock = clock
+
+        if camera is not None:
+            # A replay (or simulated) source standing in for both Picamera2 and IMX500.
+            # Overlays are drawn through picamera2's preview buffers, which it does not have.
+            if not headless:
+                raise ValueError("Replayed and simulated cameras have no preview to draw on; use headless=True")
+            self.imx500 = self.picam2 = camera
+            self.intrinsics = camera.network_intrinsics
+        else:
+            # Camera libraries are imported here, not at module level,
+            # so the control code can be imported and tested without them
+            from picamera2 import Picamera2
+            from picamera2.devices import IMX500
+            from picamera2.devices.imx500 import NetworkIntrinsics
+
+            self.imx500 = IMX500(model_file)
+            self.intrinsics = self.imx500.network_intrinsics or NetworkIntrinsics()
+            self.intrinsics.task = "object detection"
+
+            self.picam2 = Picamera2(camera_num=camera_num)
+            config = self.picam2.create_preview_configuration(
+                main={"format": "XRGB8888"},  # ✅ Fixed preview crash
+                controls={"FrameRate": self.intrinsics.inference_rate},
+                buffer_count=12
+            )
+            self.picam2.start(config, show_preview=not headless)
+        self.frame_size = self.picam2.camera_config["main"]["size"]
         if self.intrinsics.preserve_aspect_ratio:
             self.imx500.set_auto_aspect_ratio()
 
         self.labels = self._load_labels()
+        self.postprocessor = DetectionPostProcessor(self.labels, targets, threshold, top_k)
+        if headless:
+            self.compositor = None
+        else:
+            from src.computer_vision.overlay import OverlayCompositor
+            self.compositor = OverlayCompositor()
+        self.tracker = Tracker()
 
         # Setup motors
-        self.motor_a = Motor(forward=17, backward=27)
-        self.motor_b = Motor(forward=22, backward=23)
-        self.enable_a = PWMOutputDevice(24, frequency=1000)
-        self.enable_b = PWMOutputDevice(25, frequency=1000)
+        self.driver = MotorDriver() if driver is None else driver
         self.stop_motors()
 
+        # With a control rate, motor commands come from a fixed-rate loop fed with the
+        # newest target instead of being issued once per camera frame
+        self.targets = Mailbox()
+        self.lidar = lidar
+        self.control_loop = None
+        if control_rate:
+            self.control_loop = ControlLoop(self.driver, self.targets, control_rate, lidar=lidar, clock=clock)
+
+        if recorder is not None:
+            recorder.record_metadata(self.clock(), 0, {"camera": {
+                "size": list(self.frame_size),
+                "labels": list(self.labels),
+                "inference_rate": self.intrinsics.inference_rate,
+            }})
+        self._record_seq = 0
+
     def _load_labels(self):
         if self.intrinsics.labels is None:
             with open("assets/coco_labels.txt", "r") as f:
@@ -41,117 +87,230 @@ class RobotFollower:
         return self.intrinsics.labels
 
     def stop_motors(self):
-        print("[STOP] Motors")
-        self.motor_a.stop()
-        self.motor_b.stop()
-        self.enable_a.value = 0
-        self.enable_b.value = 0
+        if self.driver.stop():
+            log("STOP", "Motors")
 
     def move_robot(self, left_speed, right_speed):
-        self.enable_a.value = left_speed
-        self.enable_b.value = right_speed
-        self.motor_a.forward()
-        self.motor_b.forward()
-        print(f"[MOVE] L={left_speed:.2f}, R={right_speed:.2f}")
+        if self.driver.command(left_speed, right_speed):
+            log("MOVE", L=float(left_speed), R=float(right_speed))
 
     def get_detections(self, request):
-        try:
+        with span(METADATA):
             metadata = request.get_metadata()
+        return self.detections_from_metadata(metadata)
+
+    def detections_from_metadata(self, metadata):
+        try:
             outputs = self.imx500.get_outputs(metadata, add_batch=True)
             if outputs is None:
-                return []
+                return self.postprocessor.empty
             boxes, scores, classes = outputs[0][0], outputs[1][0], outputs[2][0]
-            return [
-                {
-                    "box": self.imx500.convert_inference_coords(b, metadata, self.picam2),
-                    "score": s,
-                    "class_id": int(c)
-                }
-                for b, s, c in zip(boxes, scores, classes)
-                if s >= 0.5 and self.labels[int(c)] == "person"
-            ]
+            if self.recorder is not None:
+                self._record_seq += 1
+                self.recorder.record_detections(self.clock(), self._record_seq, boxes, scores, classes)
+            with span(DETECTIONS):
+                return self.postprocessor.process(
+                    boxes, scores, classes,
+                    convert=lambda b: self.imx500.convert_inference_coords(b, metadata, self.picam2),
+                )
         except Exception as e:
-            print(f"[ERROR] get_detections: {e}")
-            return []
+            log("ERROR", f"get_detections: {e}", key="get_detections")
+            return self.postprocessor.empty
 
-    def draw_and_control(self, request: CompletedRequest):
-        try:
-            detections = self.get_detections(request)
-            if not detections:
-                self.stop_motors()
-                return
+    def should_detect(self):
+        # With detect_every > 1 the tracker's prediction fills in the skipped frames
+        detect = self._frame_index % self.detect_every == 0
+        self._frame_index += 1
+        return detect
 
-            best = max(detections, key=lambda d: d["box"][2] * d["box"][3], default=None)
-            if not best:
-                self.stop_motors()
-                return
+    def select_target(self, detections, timestamp):
+        if detections is not None:
+            boxes = detections["box"]
+            detections = detections[(boxes[:, 3] >= 40) & (boxes[:, 2] >= 20)]
+            self.tracker.update(detections, timestamp)
+        return self.tracker.target(timestamp)
 
-            x, y, w, h = map(int, best["box"])
-            if h < 40 or w < 20:
-                print("[WARN] Small person box ignored.")
-                self.stop_motors()
-                return
+    def draw_overlay(self, frame, best):
+        with span(OVERLAY):
+            self.compositor.add_detection(best.box, self.labels[best.class_id], best.score, track_id=best.track_id)
+            self.compositor.render(frame)
 
-            with MappedArray(request, "main") as m:
-                frame_h, frame_w = m.array.shape[:2]
-                label = f"person ({best['score']:.2f})"
-                overlay = m.array.copy()
-                (tw, th), baseline = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)
-                text_x, text_y = x + 5, y + 15
-                cv2.rectangle(overlay, (text_x, text_y - th), (text_x + tw, text_y + baseline), (255, 255, 255), -1)
-                alpha = 0.3
-                cv2.addWeighted(overlay, alpha, m.array, 1 - alpha, 0, m.array)
-                cv2.putText(m.array, label, (text_x, text_y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 1)
-                cv2.rectangle(m.array, (x, y), (x + w, y + h), (0, 255, 0), 2)
-
-            # Control logic
-            frame_center = frame_w // 2
-            person_center_x = x + w // 2
-            error_x = (frame_center - person_center_x) / frame_center
-            distance_error = 1.0 - min(h / frame_h, 1.0)
-
-            if distance_error < 0.05:
-                print("[INFO] Too close.")
-                self.stop_motors()
+    def draw_preview_overlay(self, overlay, best):
+        # RGBA layer handed to picam2.set_overlay, so camera buffers are never touched
+        with span(OVERLAY):
+            if best is not None:
+                self.compositor.add_detection(best.box, self.labels[best.class_id], best.score, track_id=best.track_id)
+            self.compositor.render_layer(overlay)
+
+    def control(self, best, frame_w, frame_h):
+        with span(CONTROL):
+            self._control(best, frame_w, frame_h)
+
+    def _control(self, best, frame_w, frame_h):
+        left_speed, right_speed, mode = follow_speeds(best.box, frame_w, frame_h)
+        if mode == "stop":
+            log("INFO", "Too close.")
+            self.stop_motors()
+            return
+        if mode == "turn":
+            log("TURN", "Person far off-center. Rotating in place.")
+        self.move_robot(left_speed, right_speed)
+
+    def publish_target(self):
+        """Hand the locked track's state to the control loop (None when nothing is locked)."""
+        track = self.tracker.locked_track()
+        if track is None:
+            self.targets.put(None)
+            return
+        kalman = track.filter
+        self.targets.put(TargetEstimate(track.track_id, track.last_update, kalman.timestamp,
+                                        kalman.x.copy(), self.frame_size))
+
+    def draw_and_control(self, request):
+        try:
+            timestamp = self.clock()
+            detections = self.get_detections(request) if self.should_detect() else None
+            best = self.select_target(detections, timestamp)
+            if self.control_loop is not None:
+                self.publish_target()
+            if best is None:
+                if self.control_loop is None:
+                    self.stop_motors()
                 return
 
-            MIN_SPEED = 0.55
-            MAX_SPEED = 1.0
-
-            # === NEW TURN-IN-PLACE LOGIC ===
-            if abs(error_x) > 0.7:
-                print("[TURN] Person far off-center. Rotating in place.")
-                if error_x > 0:
-                    left_speed = MIN_SPEED
-                    right_speed = MAX_SPEED
-                else:
-                    left_speed = MAX_SPEED
-                    right_speed = MIN_SPEED
+            if self.headless:
+                frame_w, frame_h = self.frame_size
             else:
-                # Smooth gain-based steering
-                steering_gain = 1.2
-                steering = np.clip(error_x * steering_gain, -0.6, 0.6)
-                forward = np.clip(distance_error * 0.6, 0.0, 1.0)
-
-                left_speed = np.clip(forward + steering, MIN_SPEED, MAX_SPEED)
-                right_speed = np.clip(forward - steering, MIN_SPEED, MAX_SPEED)
+                from picamera2 import MappedArray
+                with MappedArray(request, "main") as m:
+                    frame_h, frame_w = m.array.shape[:2]
+                    if self.recorder is not None and self.recorder.frame_step:
+                        self.recorder.record_frame(timestamp, self._record_seq, m.array)
+                    self.draw_overlay(m.array, best)
 
-            self.move_robot(left_speed, right_speed)
+            if self.control_loop is None:
+                self.control(best, frame_w, frame_h)
         except Exception as e:
-            print(f"[ERROR] draw_and_control: {e}")
+            log("ERROR", f"draw_and_control: {e}", key="draw_and_control")
             self.stop_motors()
 
-    def run(self):
+    def run(self, pipelined=False):
+        if pipelined:
+            return self.run_pipelined()
+        self._start_control()
         try:
             while True:
-                request = self.picam2.capture_request()
+                with span(CAPTURE):
+                    request = self.picam2.capture_request()
+                count("frames")
                 self.draw_and_control(request)
                 request.release()
         except KeyboardInterrupt:
             print("Interrupted.")
+        except EOFError as e:
+            print(f"[INFO] {e}")
         finally:
-            self.stop_motors()
-            self.picam2.stop()
+            self._close()
+
+    def _start_control(self):
+        if self.control_loop is not None:
+            if self.lidar is not None:
+                self.lidar.start()
+            self.control_loop.start()
+
+    def _close(self):
+        if self.control_loop is not None:
+            self.control_loop.stop()
+            log("INFO", "Control loop", key="control stats", **self.control_loop.stats())
+            if self.lidar is not None:
+                self.lidar.stop()
+        self.driver.close()
+        self.picam2.stop()
+        if self.recorder is not None:
+            self.recorder.close()
+        instrumentation.flush()
+
+    def run_pipelined(self, report_interval=5.0):
+        """Capture, detection, control and overlay each on their own stage.
+
+        The capture loop only pulls metadata and releases the request straight away;
+        control always receives the newest detection and drops anything older.
+        """
+        frame_w, frame_h = self.frame_size
+        overlay = None if self.headless else np.zeros((frame_h, frame_w, 4), dtype=np.uint8)
+        capture_stats = LatencyStats("capture")
+        motor_stats = LatencyStats("frame->motor")
+
+        def control(item):
+            _, captured, best = item
+            if best is None:
+                self.stop_motors()
+            else:
+                self.control(best, frame_w, frame_h)
+            motor_stats.record(time.monotonic() - captured)
+
+        def draw(item):
+            self.draw_preview_overlay(overlay, item[2])
+            self.picam2.set_overlay(overlay)
+
+        # A command that failed half way must not leave the motors running
+        control_stage = Stage("control", control, on_error=lambda item, error: self.stop_motors())
+        overlay_stage = Stage("overlay", draw)
+
+        def detect(item):
+            seq, captured, timestamp, metadata = item
+            detections = None if metadata is None else self.detections_from_metadata(metadata)
+            best = self.select_target(detections, timestamp)
+            if self.control_loop is not None:
+                self.publish_target()
+            else:
+                control_stage.put((seq, captured, best))
+            if not self.headless:
+                overlay_stage.put((seq, captured, best))
+
+        detect_stage = Stage("detect", detect, maxsize=2, on_error=lambda item, error: self.stop_motors())
+        stages = [detect_stage]
+        if self.control_loop is None:
+            stages.append(control_stage)
+        if not self.headless:
+            stages.append(overlay_stage)
+        for stage in stages:
+            stage.start()
+        self._start_control()
+
+        seq = 0
+        next_report = time.monotonic() + report_interval
+        try:
+            while True:
+                with span(CAPTURE):
+                    request = self.picam2.capture_request()
+                captured = time.monotonic()
+                timestamp = self.clock()
+                try:
+                    with span(METADATA):
+                        metadata = request.get_metadata() if self.should_detect() else None
+                finally:
+                    request.release()
+                capture_stats.record(time.monotonic() - captured)
+                seq += 1
+                count("frames")
+                detect_stage.put((seq, captured, timestamp, metadata))
+                failed = [stage.name for stage in stages if stage.failed]
+                if failed:
+                    log("ERROR", f"Pipeline stopped: stage {', '.join(failed)} kept failing")
+                    break
+
+                if captured >= next_report:
+                    log("PIPE", format_stats([capture_stats] + stages + [motor_stats]))
+                    next_report = captured + report_interval
+        except KeyboardInterrupt:
+            print("Interrupted.")
+        except EOFError as e:
+            print(f"[INFO] {e}")
+        finally:
+            for stage in stages:
+                stage.stop()
+            self._close()
 
 
 if __name__ == "__main__":
@@ -161,11 +320,66 @@ if __name__ == "__main__":
     parser.add_argument("-r", "--preserve-aspect-ratio", action=argparse.BooleanOptionalAction)
     parser.add_argument("--labels", type=str, help="Path to custom labels")
     parser.add_argument("--print-intrinsics", action="store_true")
+    parser.add_argument("--targets", type=str, default="person", help="Comma-separated labels to follow")
+    parser.add_argument("--threshold", type=float, default=0.5)
+    parser.add_argument("--top-k", type=int, default=None, help="Keep at most this many detections per frame")
+    parser.add_argument("--detect-every", type=int, default=1, help="Parse detections every Nth frame and predict in between")
+    parser.add_argument("--headless", action="store_true", help="No preview window and no overlay drawing")
+    parser.add_argument("--record", type=str, help="Record detection tensors to this log file")
+    parser.add_argument("--record-frames", type=int, default=None, metavar="STEP",
+                        help="Also record frames, keeping every STEP-th pixel in each direction")
+    parser.add_argument("--replay", type=str, help="Drive the follower from a recorded log instead of the camera")
+    parser.add_argument("--replay-speed", type=float, default=1.0, help="Replay speed factor, 0 for as fast as possible")
+    parser.add_argument("--pipelined", action="store_true", help="Run capture, detection, control and overlay as separate stages")
+    parser.add_argument("--stats", type=float, default=None, metavar="SECONDS",
+                        help="Log p50/p99/max per stage and dropped frames every SECONDS")
+    parser.add_argument("--stats-dump", type=str, default=None, help="Write all timings to this JSON file on SIGUSR1")
+    parser.add_argument("--log-json", action="store_true", help="Write log lines as JSON objects")
+    parser.add_argument("--no-instrumentation", action="store_true", help="Disable timing spans")
+    parser.add_argument("--control-rate", type=float, default=None, metavar="HZ",
+                        help="Run the motor control law at this fixed rate instead of once per frame")
+    parser.add_argument("--avoid", action="store_true",
+                        help="With --control-rate, also slow down and stop for LiDAR obstacles")
+    parser.add_argument("--lidar-port", default="/dev/ttyUSB0")
     args = parser.parse_args()
+    instrumentation.configure(enabled=not args.no_instrumentation, summary_interval=args.stats,
+                              structured=args.log_json, dump_path=args.stats_dump)
+
+    if args.replay and not args.headless:
+        parser.error("--replay needs --headless: overlays are drawn on the camera preview")
+
+    camera = None
+    clock = time.monotonic
+    if args.replay:
+        from src.utils.recording import ReplayCamera
+        camera = ReplayCamera(args.replay, speed=args.replay_speed or None)
+        clock = camera.clock
+    recorder = None
+    if args.record:
+        from src.utils.recording import Recorder
+        recorder = Recorder(args.record, frame_step=args.record_frames)
+
+    lidar = None
+    if args.avoid:
+        from src.lidar.lidar_stream import LidarStream
+        lidar = LidarStream(port=args.lidar_port)
 
-    robot = RobotFollower(model_file=args.model, camera_num=args.camera_num)
+    robot = RobotFollower(
+        model_file=args.model,
+        camera_num=args.camera_num,
+        headless=args.headless,
+        targets=[t.strip() for t in args.targets.split(",")],
+        threshold=args.threshold,
+        top_k=args.top_k,
+        detect_every=args.detect_every,
+        camera=camera,
+        recorder=recorder,
+        clock=clock,
+        control_rate=args.control_rate,
+        lidar=lidar,
+    )
     if args.print_intrinsics:
         print(robot.intrinsics)
         sys.exit(0)
 
-    robot.run()
+    robot.run(pipelined=args.pipelined)
@@ -0,0 +1,67 @@
+import numpy as np
+
+DETECTION_DTYPE = np.dtype([
+    ("box", np.float32, (4,)),
+    ("score", np.float32),
+    ("class_id", np.int32),
+])
+
+
+class DetectionPostProcessor:
+    """Filters raw SSD output tensors down to a structured array of target detections.
+
+    Target class IDs are resolved from the label list once, so per frame the work is a
+    couple of vectorized masks over the raw tensors. Only the survivors (at most `top_k`,
+    highest score first) go through the per-box coordinate conversion.
+    """
+
+    def __init__(self, labels, targets=("person",), threshold=0.5, top_k=None):
+        self.labels = labels
+        self.targets = tuple(targets)
+        self.threshold = threshold
+        if top_k is not None and top_k < 1:
+            raise ValueError(f"top_k must be at least 1, got {top_k}")
+        self.top_k = top_k
+
+        self.class_ids = np.array([i for i, label in enumerate(labels) if label in self.targets], dtype=np.intp)
+        missing = set(self.targets) - {labels[i] for i in self.class_ids}
+        if missing:
+            raise ValueError(f"Unknown target labels: {sorted(missing)}")
+        self._target_mask = np.zeros(len(labels), dtype=bool)
+        self._target_mask[self.class_ids] = True
+        self.empty = np.empty(0, dtype=DETECTION_DTYPE)
+        self.empty.flags.writeable = False
+
+    def select(self, scores, classes):
+        """Indices of detections passing the score and class masks, best score first."""
+        scores = np.asarray(scores)
+        classes = np.asarray(classes).astype(np.intp)
+        valid = (classes >= 0) & (classes < len(self._target_mask))
+        keep = (scores >= self.threshold) & valid
+        keep[keep] = self._target_mask[classes[keep]]
+        idx = np.flatnonzero(keep)
+        if self.top_k is not None and len(idx) > self.top_k:
+            idx = idx[np.argpartition(scores[idx], -self.top_k)[-self.top_k:]]
+        return idx[np.argsort(scores[idx], kind="stable")[::-1]]
+
+    def process(self, boxes, scores, classes, convert=None):
+        idx = self.select(scores, classes)
+        if len(idx) == 0:
+            return self.empty
+        detections = np.empty(len(idx), dtype=DETECTION_DTYPE)
+        if convert is None:
+            detections["box"] = np.asarray(boxes)[idx]
+        else:
+            for i, j in enumerate(idx):
+                detections["box"][i] = convert(boxes[j])
+        detections["score"] = np.asarray(scores)[idx]
+        detections["class_id"] = np.asarray(classes)[idx]
+        return detections
+
+
+def largest(detections):
+    """Record with the largest box area, or None for an empty array."""
+    if len(detections) == 0:
+        return None
+    boxes = detections["box"]
+    return detections[np.argmax(boxes[:, 2] * boxes[:, 3])]
@@ -0,0 +1,148 @@
+import numpy as np
+
+class EntityStore:
+    """Struct-of-arrays store for axis-aligned game entities.
+
+    Positions, sizes and vertical velocities live in preallocated float32 arrays with an
+    `alive` mask. Dead slots go on a free list and are reused by the next spawn; the
+    arrays double in size when full. Only the first `used` slots are ever scanned.
+    """
+
+    def __init__(self, capacity=64):
+        self.capacity = 0
+        self.used = 0
+        self._free = []
+        self.x = self.y = self.w = self.h = self.vel_y = np.zeros(0, dtype=np.float32)
+        self.alive = np.zeros(0, dtype=bool)
+        self._resize(capacity)
+
+    def __len__(self):
+        return self.used - len(self._free)
+
+    def _resize(self, capacity):
+        for name in ("x", "y", "w", "h", "vel_y"):
+            grown = np.zeros(capacity, dtype=np.float32)
+            grown[:self.capacity] = getattr(self, name)
+            setattr(self, name, grown)
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:self.capacity] = self.alive
+        self.alive = alive
+        self.capacity = capacity
+
+    def spawn(self, x, y, w, h, vel_y=0.0):
+        if self._free:
+            i = self._free.pop()
+        else:
+            if self.used == self.capacity:
+                self._resize(max(2 * self.capacity, 16))
+            i = self.used
+            self.used += 1
+        self.x[i], self.y[i], self.w[i], self.h[i], self.vel_y[i] = x, y, w, h, vel_y
+        self.alive[i] = True
+        return i
+
+    def spawn_many(self, x, y, w, h, vel_y=0.0):
+        x = np.atleast_1d(np.asarray(x, dtype=np.float32))
+        n = len(x)
+        reused = min(n, len(self._free))
+        idx = np.empty(n, dtype=np.intp)
+        if reused:
+            idx[:reused] = self._free[-reused:]
+            del self._free[-reused:]
+        fresh = n - reused
+        if fresh:
+            while self.used + fresh > self.capacity:
+                self._resize(max(2 * self.capacity, 16))
+            idx[reused:] = np.arange(self.used, self.used + fresh)
+            self.used += fresh
+        self.x[idx], self.y[idx], self.w[idx], self.h[idx], self.vel_y[idx] = x, y, w, h, vel_y
+        self.alive[idx] = True
+        return idx
+
+    def kill(self, idx):
+        idx = np.unique(np.asarray(idx, dtype=np.intp))
+        idx = idx[self.alive[idx]]
+        self.alive[idx] = False
+        self._free.extend(idx.tolist())
+        if len(self._free) == self.used:
+            # Everything is dead: start filling from slot 0 again
+            self.used = 0
+            self._free = []
+        return len(idx)
+
+    def clear(self):
+        self.alive[:] = False
+        self.used = 0
+        self._free = []
+
+    def indices(self):
+        return np.flatnonzero(self.alive[:self.used])
+
+    def move(self):
+        n = self.used
+        alive = self.alive[:n]
+        self.y[:n] += np.where(alive, self.vel_y[:n], 0)
+
+    def kill_where(self, mask):
+        """Kill live entities where `mask` (over the first `used` slots) is set; return count."""
+        return self.kill(np.flatnonzero(mask & self.alive[:self.used]))
+
+    def rects(self):
+        idx = self.indices()
+        return zip(self.x[idx].tolist(), self.y[idx].tolist(), self.w[idx].tolist(), self.h[idx].tolist())
+
+
+# Offsets of the (up to) four grid cells a box no larger than a cell can span
+_CELL_DX = np.array([0, 1, 0, 1])
+_CELL_DY = np.array([0, 0, 1, 1])
+
+
+def points_in_boxes(points, boxes):
+    """Indices of live `boxes` entities that contain the (x, y) of any live `points` entity.
+
+    Uses strict inequalities, matching the original per-pair bullet/brick test. Boxes are
+    hashed into a uniform grid with cells as large as the largest box, so each box lands
+    in at most four cells and each point is only tested against the boxes in its own cell.
+    """
+    p = points.indices()
+    b = boxes.indices()
+    if len(p) == 0 or len(b) == 0:
+        return b[:0]
+    px, py = points.x[p], points.y[p]
+    bx, by, bw, bh = boxes.x[b], boxes.y[b], boxes.w[b], boxes.h[b]
+
+    cell_w = max(float(bw.max()), 1.0)
+    cell_h = max(float(bh.max()), 1.0)
+    cx0 = np.floor(bx / cell_w).astype(np.int64)
+    cy0 = np.floor(by / cell_h).astype(np.int64)
+    cx1 = np.floor((bx + bw) / cell_w).astype(np.int64)
+    cy1 = np.floor((by + bh) / cell_h).astype(np.int64)
+
+    cells_x = cx0[:, None] + _CELL_DX
+    cells_y = cy0[:, None] + _CELL_DY
+    spanned = (cells_x <= cx1[:, None]) & (cells_y <= cy1[:, None])
+    keys = _cell_key(cells_x[spanned], cells_y[spanned])
+    owners = np.broadcast_to(np.arange(len(b))[:, None], spanned.shape)[spanned]
+    order = np.argsort(keys, kind="stable")
+    keys, owners = keys[order], owners[order]
+
+    point_keys = _cell_key(np.floor(px / cell_w).astype(np.int64), np.floor(py / cell_h).astype(np.int64))
+    lo = np.searchsorted(keys, point_keys, side="left")
+    counts = np.searchsorted(keys, point_keys, side="right") - lo
+    total = int(counts.sum())
+    if total == 0:
+        return b[:0]
+
+    pair_point = np.repeat(np.arange(len(p)), counts)
+    starts = np.repeat(lo - (np.cumsum(counts) - counts), counts)
+    pair_box = owners[starts + np.arange(total)]
+
+    qx, qy = px[pair_point], py[pair_point]
+    x0, y0 = bx[pair_box], by[pair_box]
+    inside = (qx > x0) & (qx < x0 + bw[pair_box]) & (qy > y0) & (qy < y0 + bh[pair_box])
+    return b[np.unique(pair_box[inside])]
+
+
+def _cell_key(cx, cy):
+    # Pack signed cell coordinates into one sortable int64
+    return ((cx + (1 << 20)) << 32) | (cy + (1 << 20))
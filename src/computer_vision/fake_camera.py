@@ -0,0 +1,134 @@
+import time
+from types import SimpleNamespace
+import numpy as np
+
+LABELS = ("person", "bicycle", "car", "dog", "chair")
+FRAME_SIZE = (640, 480)
+MAX_DETECTIONS = 100  # SSD output rows per frame, padded with zero scores
+
+
+class FakeRequest:
+    def __init__(self, metadata, frame=None):
+        self.metadata = metadata
+        self.frame = frame
+
+    def get_metadata(self):
+        return self.metadata
+
+    def make_array(self, name="main"):
+        return self.frame
+
+    def release(self):
+        pass
+
+
+class FakeCamera:
+    """Stands in for both Picamera2 and IMX500 with synthetic SSD outputs.
+
+    `people` persons walk Lissajous paths across the frame; `clutter` extra rows per frame
+    hold other classes or scores below any sensible threshold, so the post-processing has
+    realistic work to skip. With `frames` an XRGB8888 image with the boxes filled in is
+    attached to every request. Requests are paced to `rate` unless `realtime` is False,
+    and `fail_after` raises RuntimeError after that many frames.
+    """
+
+    def __init__(self, size=FRAME_SIZE, rate=30.0, people=1, clutter=4, frames=False, realtime=True,
+                 fail_after=None, seed=0):
+        self.camera_config = {"main": {"size": tuple(size)}}
+        self.network_intrinsics = SimpleNamespace(
+            labels=list(LABELS),
+            inference_rate=rate,
+            preserve_aspect_ratio=False,
+            task="object detection",
+        )
+        self.rate = rate
+        self.people = people
+        self.clutter = clutter
+        self.realtime = realtime
+        self.fail_after = fail_after
+        self.rng = np.random.default_rng(seed)
+        self.phases = self.rng.uniform(0, 2 * np.pi, size=(people, 2))
+        self.frames_sent = 0
+        self._start = None
+
+        width, height = size
+        self._background = None
+        if frames:
+            shade = np.linspace(40, 90, height, dtype=np.uint8)
+            self._background = np.zeros((height, width, 4), dtype=np.uint8)
+            self._background[:, :, :3] = shade[:, None, None]
+            self._frame = np.empty_like(self._background)
+
+    def clock(self):
+        return time.monotonic()
+
+    def _people(self, t):
+        # Normalized (y0, x0, y1, x1) boxes; height swings so the follower drives and stops
+        phase = self.phases
+        cx = 0.5 + 0.35 * np.sin(0.4 * t + phase[:, 0])
+        h = 0.55 + 0.3 * np.sin(0.25 * t + phase[:, 1])
+        w = 0.4 * h
+        cy = 1.0 - h / 2 - 0.02
+        return np.stack([cy - h / 2, cx - w / 2, cy + h / 2, cx + w / 2], axis=1)
+
+    def capture_request(self):
+        if self.fail_after is not None and self.frames_sent >= self.fail_after:
+            raise RuntimeError("Simulated camera failure")
+        now = time.monotonic()
+        if self._start is None:
+            self._start = now
+        if self.realtime:
+            deadline = self._start + self.frames_sent / self.rate
+            if deadline > now:
+                time.sleep(deadline - now)
+                now = deadline
+        t = now - self._start
+        self.frames_sent += 1
+
+        # Fresh tensors per request, as each camera request owns its metadata
+        boxes = np.zeros((MAX_DETECTIONS, 4), dtype=np.float32)
+        scores = np.zeros(MAX_DETECTIONS, dtype=np.float32)
+        classes = np.zeros(MAX_DETECTIONS, dtype=np.float32)
+        n = min(self.people, MAX_DETECTIONS)
+        people = self._people(t)[:n]
+        boxes[:n] = people
+        scores[:n] = self.rng.uniform(0.6, 0.95, size=n)
+        k = min(self.clutter, MAX_DETECTIONS - n)
+        if k:
+            corners = self.rng.uniform(0.0, 0.8, size=(k, 2))
+            boxes[n:n + k, :2] = corners
+            boxes[n:n + k, 2:] = corners + self.rng.uniform(0.05, 0.2, size=(k, 2))
+            scores[n:n + k] = self.rng.uniform(0.05, 0.9, size=k)
+            classes[n:n + k] = self.rng.integers(1, len(LABELS), size=k)
+
+        metadata = {"outputs": [boxes[None], scores[None], classes[None]],
+                    "seq": self.frames_sent, "timestamp": now}
+        return FakeRequest(metadata, self._draw(people))
+
+    def _draw(self, people):
+        if self._background is None:
+            return None
+        width, height = self.camera_config["main"]["size"]
+        np.copyto(self._frame, self._background)
+        for y0, x0, y1, x1 in people:
+            r0, r1 = int(max(y0, 0) * height), int(min(y1, 1) * height)
+            c0, c1 = int(max(x0, 0) * width), int(min(x1, 1) * width)
+            self._frame[r0:r1, c0:c1, :3] = (60, 160, 220)
+        return self._frame
+
+    def get_outputs(self, metadata, add_batch=True):
+        return metadata.get("outputs")
+
+    def convert_inference_coords(self, box, metadata, picam2):
+        width, height = self.camera_config["main"]["size"]
+        y0, x0, y1, x1 = box
+        return (x0 * width, y0 * height, (x1 - x0) * width, (y1 - y0) * height)
+
+    def set_auto_aspect_ratio(self):
+        pass
+
+    def set_overlay(self, overlay):
+        pass
+
+    def stop(self):
+        pass
@@ -0,0 +1,123 @@
+import time
+import numpy as np
+from src.computer_vision.keypoints import LEFT_WRIST, NUM_KEYPOINTS, RIGHT_WRIST
+
+LANDMARKS = "landmarks"  # stands in for hailo.HAILO_LANDMARKS
+FRAME_SIZE = (1280, 720)
+
+# Neutral standing pose, (x, y) relative to the person's box, in COCO keypoint order
+_POSE = np.array([
+    (0.50, 0.08), (0.54, 0.06), (0.46, 0.06), (0.58, 0.08), (0.42, 0.08),
+    (0.68, 0.22), (0.32, 0.22), (0.76, 0.38), (0.24, 0.38), (0.78, 0.52), (0.22, 0.52),
+    (0.62, 0.55), (0.38, 0.55), (0.62, 0.76), (0.38, 0.76), (0.62, 0.96), (0.38, 0.96),
+], dtype=np.float32)
+
+
+class FakePoint:
+    __slots__ = ("_x", "_y", "_confidence")
+
+    def __init__(self, x, y, confidence):
+        self._x = x
+        self._y = y
+        self._confidence = confidence
+
+    def x(self):
+        return self._x
+
+    def y(self):
+        return self._y
+
+    def confidence(self):
+        return self._confidence
+
+
+class FakeBBox:
+    __slots__ = ("_box",)
+
+    def __init__(self, xmin, ymin, width, height):
+        self._box = (xmin, ymin, width, height)
+
+    def xmin(self):
+        return self._box[0]
+
+    def ymin(self):
+        return self._box[1]
+
+    def width(self):
+        return self._box[2]
+
+    def height(self):
+        return self._box[3]
+
+
+class FakeLandmarks:
+    def __init__(self, points):
+        self._points = points
+
+    def get_points(self):
+        return self._points
+
+
+class FakeDetection:
+    """Hailo detection lookalike: label, bbox and (for people) one set of landmarks."""
+
+    def __init__(self, label, bbox, landmarks=None):
+        self._label = label
+        self._bbox = bbox
+        self._landmarks = [] if landmarks is None else [landmarks]
+
+    def get_label(self):
+        return self._label
+
+    def get_bbox(self):
+        return self._bbox
+
+    def get_objects_typed(self, kind):
+        return self._landmarks if kind == LANDMARKS else []
+
+
+class FakePoseSource:
+    """Synthetic Hailo pose output: `people` players waving their wrists, plus `others`
+    non-person detections per buffer, at `rate` buffers per second unless `realtime` is
+    False. `next()` returns the detection list of one buffer, like `roi.get_objects_typed`.
+    """
+
+    def __init__(self, people=1, others=0, rate=30.0, realtime=True, frame_size=FRAME_SIZE, seed=0):
+        self.people = people
+        self.others = others
+        self.rate = rate
+        self.realtime = realtime
+        self.frame_width, self.frame_height = frame_size
+        self.rng = np.random.default_rng(seed)
+        self.phases = self.rng.uniform(0, 2 * np.pi, size=people)
+        self.buffers = 0
+        self._start = None
+
+    def next(self):
+        now = time.monotonic()
+        if self._start is None:
+            self._start = now
+        if self.realtime:
+            deadline = self._start + self.buffers / self.rate
+            if deadline > now:
+                time.sleep(deadline - now)
+                now = deadline
+        t = now - self._start
+        self.buffers += 1
+
+        detections = []
+        for i, phase in enumerate(self.phases):
+            width = 0.25 + 0.05 * i
+            xmin = 0.1 + 0.6 * (0.5 + 0.5 * np.sin(0.3 * t + phase)) * (1 - width)
+            points = _POSE.copy()
+            points[LEFT_WRIST, 1] = 0.5 - 0.4 * np.sin(2.0 * t + phase)
+            points[RIGHT_WRIST, 1] = 0.5 - 0.4 * np.cos(1.5 * t + phase)
+            points += self.rng.normal(0.0, 0.005, points.shape).astype(np.float32)
+            confidences = self.rng.uniform(0.5, 1.0, NUM_KEYPOINTS)
+            landmarks = FakeLandmarks([FakePoint(float(x), float(y), float(c))
+                                       for (x, y), c in zip(points, confidences)])
+            detections.append(FakeDetection("person", FakeBBox(float(xmin), 0.1, width, 0.85), landmarks))
+        for _ in range(self.others):
+            x, y = self.rng.uniform(0.0, 0.8, 2)
+            detections.append(FakeDetection("chair", FakeBBox(float(x), float(y), 0.1, 0.1)))
+        return detections
@@ -1,9 +1,6 @@
 import threading
-import queue
 import pygame
-import random
 import math
-from collections import namedtuple
 import gi
 gi.require_version('Gst', '1.0')
 from gi.repository import Gst, GLib
@@ -16,188 +13,87 @@ from hailo_rpi_common import (
     app_callback_class,
 )
 from pose_estimation_pipeline import GStreamerPoseEstimationApp
+from src.computer_vision.keypoints import (LEFT_WRIST, RIGHT_WRIST, CapsCache, KeypointExtractor, Poses,
+                                           primary_person)
+from src.computer_vision.shooter_renderer import ShooterRenderer
+from src.computer_vision.shooter_world import FPS, WINDOW_HEIGHT, WINDOW_WIDTH, ShooterWorld
+from src.utils.instrumentation import POSE_CALLBACK, span
+from src.utils.mailbox import Mailbox
 import time
 
 
-# Game constants
-WINDOW_WIDTH = 600  # Adjusted window width
-WINDOW_HEIGHT = 600
-FPS = 60
-PLAYER_WIDTH = 100
-PLAYER_HEIGHT = 20
-BULLET_WIDTH = 5
-BULLET_HEIGHT = 10
-BULLET_SPEED = 7
-BRICK_WIDTH = 75
-BRICK_HEIGHT = 30
-BRICK_DROP_SPEED = 2
-SPAWN_RATE = 30  # Frames between brick spawns
-STARTING_LIVES = 3
-POSITION_QUEUE_SIZE = 1
-
-# Colors
-WHITE = (255, 255, 255)
-RED = (255, 0, 0)
-GREEN = (0, 255, 0)
-BLUE = (0, 255, 255)
-BLACK = (0, 0, 0)
-
-# Game objects
-Player = namedtuple('Player', ['x', 'y', 'width', 'height'])
-Bullet = namedtuple('Bullet', ['x', 'y', 'width', 'height', 'vel_y'])
-Brick = namedtuple('Brick', ['x', 'y', 'width', 'height', 'vel_y'])
-
 class PoseShooterCallback(app_callback_class):
     def __init__(self):
         super().__init__()
         self.left_hand_pos = (WINDOW_WIDTH // 4, WINDOW_HEIGHT // 2)
         self.right_hand_pos = (3 * WINDOW_WIDTH // 4, WINDOW_HEIGHT // 2)
         self.use_frame = True
-        self.position_queue = queue.Queue(maxsize=POSITION_QUEUE_SIZE)
+        # Latest ((left_x, left_y), (right_x, right_y)) wrist positions, newest wins
+        self.hands = Mailbox()
+        # All keypoints of everyone in the latest buffer, for gestures beyond the wrists
+        self.poses = None
 
 class PoseShooter:
-    def __init__(self):
+    def __init__(self, full_redraw=False):
         pygame.init()
         self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
         pygame.display.set_caption("Pose Shooter")
         self.clock = pygame.time.Clock()
         
         # Initialize game state
-        self.reset_game()
+        self.world = ShooterWorld()
+        self.running = True
+        self.full_redraw = full_redraw
+        self.renderer = ShooterRenderer(self.screen, self.world, full_redraw)
         
         # Initialize pose estimation
+        self.keypoints = KeypointExtractor(hailo.HAILO_LANDMARKS, WINDOW_WIDTH, WINDOW_HEIGHT)
+        self.caps = CapsCache(get_caps_from_pad)
         self.user_data = PoseShooterCallback()
+        self.hands_seq = 0
         self.app = GStreamerPoseEstimationApp(self.pose_callback, self.user_data)
 
-    def reset_game(self):
-        self.player = Player(WINDOW_WIDTH // 2 - PLAYER_WIDTH // 2, WINDOW_HEIGHT - 50, PLAYER_WIDTH, PLAYER_HEIGHT)
-        self.bullets = []
-        self.bricks = []
-        self.score = 0
-        self.lives = STARTING_LIVES
-        self.frame_count = 0
-        self.game_over = False
-        self.running = True
-
     def pose_callback(self, pad, info, user_data):
+        with span(POSE_CALLBACK):
+            return self._handle_pose(pad, info)
+
+    def _handle_pose(self, pad, info):
         buffer = info.get_buffer()
         if buffer is None:
             return Gst.PadProbeReturn.OK
 
+        # Caps are read once and then only again when GStreamer renegotiates them
+        size = self.caps.size(pad)
+        if size is None:
+            return Gst.PadProbeReturn.OK
+
         roi = hailo.get_roi_from_buffer(buffer)
         detections = roi.get_objects_typed(hailo.HAILO_DETECTION)
+        poses = self.keypoints.extract(detections, size[0])
+        person = primary_person(poses)
+        if person is None:
+            return Gst.PadProbeReturn.OK
 
-        for detection in detections:
-            if detection.get_label() == "person":
-                landmarks = detection.get_objects_typed(hailo.HAILO_LANDMARKS)
-                if len(landmarks) != 0:
-                    points = landmarks[0].get_points()
-                    bbox = detection.get_bbox()
-                    format, width, height = get_caps_from_pad(pad)
-                    
-                    # Constants for y-axis scaling relative to frame height
-                    Y_MIN = 0.22 * height
-                    Y_MAX = 0.78 * height
-                    Y_RANGE = Y_MAX - Y_MIN
-
-                    # Left wrist (index 9)
-                    left_point = points[9]
-                    left_x = WINDOW_WIDTH - int((left_point.x() * bbox.width() + bbox.xmin()) * width)
-                    raw_y = (left_point.y() * bbox.height() + bbox.ymin()) * height
-                    normalized_y = (raw_y - Y_MIN) / Y_RANGE
-                    left_y = int(normalized_y * WINDOW_HEIGHT)
-
-                    # Right wrist (index 10)
-                    right_point = points[10]
-                    right_x = WINDOW_WIDTH - int((right_point.x() * bbox.width() + bbox.xmin()) * width)
-                    raw_y = (right_point.y() * bbox.height() + bbox.ymin()) * height
-                    normalized_y = (raw_y - Y_MIN) / Y_RANGE
-                    right_y = int(normalized_y * WINDOW_HEIGHT)
+        # The extractor reuses its arrays, so hand out a copy to other threads
+        self.user_data.poses = Poses(poses.points.copy(), poses.confidences.copy(), poses.boxes.copy())
+        left_x, left_y = poses.points[person, LEFT_WRIST].astype(int).tolist()
+        right_x, right_y = poses.points[person, RIGHT_WRIST].astype(int).tolist()
 
-                    try:
-                        while not self.user_data.position_queue.empty():
-                            self.user_data.position_queue.get_nowait()
-                        self.user_data.position_queue.put_nowait(((left_x, left_y), (right_x, right_y)))
-                    except queue.Full:
-                        pass
+        self.user_data.hands.put(((left_x, left_y), (right_x, right_y)))
 
         return Gst.PadProbeReturn.OK
 
-    def spawn_brick(self):
-        x = random.randint(0, WINDOW_WIDTH - BRICK_WIDTH)
-        y = -BRICK_HEIGHT
-        return Brick(x, y, BRICK_WIDTH, BRICK_HEIGHT, BRICK_DROP_SPEED)
-
-    def update_bricks(self):
-        new_bricks = []
-        for brick in self.bricks:
-            new_y = brick.y + brick.vel_y
-            if new_y > WINDOW_HEIGHT:
-                self.lives -= 1
-                if self.lives <= 0:
-                    self.game_over = True
-            else:
-                new_bricks.append(brick._replace(y=new_y))
-        self.bricks = new_bricks
-
-    def update_bullets(self):
-        new_bullets = []
-        for bullet in self.bullets:
-            new_y = bullet.y - BULLET_SPEED
-            if new_y > 0:
-                new_bullets.append(bullet._replace(y=new_y))
-        self.bullets = new_bullets
-
-    def check_collisions(self):
-        new_bricks = []
-        for brick in self.bricks:
-            hit = False
-            for bullet in self.bullets:
-                if (bullet.x > brick.x and bullet.x < brick.x + brick.width and
-                    bullet.y > brick.y and bullet.y < brick.y + brick.height):
-                    self.score += 1
-                    hit = True
-                    break
-            if not hit:
-                new_bricks.append(brick)
-        self.bricks = new_bricks
-
-    def update_player(self):
-        try:
-            left_pos, right_pos = self.user_data.position_queue.get_nowait()
-            # Use the average x-coordinate of both wrists to move the player
-            new_x = (left_pos[0] + right_pos[0]) // 2 - self.player.width // 2
-            # Ensure the player stays within the window bounds
-            new_x = max(0, min(WINDOW_WIDTH - self.player.width, new_x))
-            self.player = self.player._replace(x=new_x)
-        except queue.Empty:
-            pass
+    def read_hands(self):
+        """Wrist positions published since the last call, or None if there are none."""
+        message = self.user_data.hands.read_if_newer(self.hands_seq)
+        if message is None:
+            return None
+        self.hands_seq = message.seq
+        return message.value
 
     def draw(self):
-        self.screen.fill(BLACK)
-
-        # Draw player
-        pygame.draw.rect(self.screen, GREEN, 
-                         (self.player.x, self.player.y, self.player.width, self.player.height))
-
-        # Draw bullets
-        for bullet in self.bullets:
-            pygame.draw.rect(self.screen, RED, 
-                             (bullet.x, bullet.y, bullet.width, bullet.height))
-
-        # Draw bricks
-        for brick in self.bricks:
-            pygame.draw.rect(self.screen, BLUE, 
-                             (brick.x, brick.y, brick.width, brick.height))
-
-        # Draw score and lives
-        font = pygame.font.Font(None, 36)
-        score_text = font.render(f'Score: {self.score}', True, WHITE)
-        lives_text = font.render(f'Lives: {self.lives}', True, WHITE)
-        self.screen.blit(score_text, (10, 10))
-        self.screen.blit(lives_text, (10, 50))
-
-        pygame.display.flip()
+        # Only the rectangles that changed since the last frame are pushed to the display
+        self.renderer.draw()
 
     def run_pose_estimation(self):
         self.app.run()
@@ -215,6 +111,7 @@ class PoseShooter:
         # Step 2: Now, create the game window after pose estimation has started
         self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
         pygame.display.set_caption("Pose Shooter")
+        self.renderer = ShooterRenderer(self.screen, self.world, self.full_redraw, self.renderer.text)
 
         # Step 3: Run the game loop
         while self.running:
@@ -225,28 +122,12 @@ class PoseShooter:
                     if event.key == pygame.K_ESCAPE:
                         self.running = False
 
-            if self.game_over:
-                self.reset_game()
-            else:
-                # Spawn new bricks based on spawn rate
-                if self.frame_count % SPAWN_RATE == 0:
-                    self.bricks.append(self.spawn_brick())
-
-                # Update game state
-                self.update_bricks()
-                self.update_bullets()
-                self.check_collisions()
-                self.update_player()
-
-                # Shoot bullets
-                if self.frame_count % 10 == 0:
-                    self.bullets.append(Bullet(self.player.x + self.player.width // 2, self.player.y, BULLET_WIDTH, BULLET_HEIGHT, -BULLET_SPEED))
+            # Spawn, move, collide and shoot; resets the world after a game over
+            self.world.tick(self.read_hands())
 
             # Draw everything on the game screen
             self.draw()
 
-            # Update frame counter
-            self.frame_count += 1
             self.clock.tick(FPS)
 
         # Cleanup: Close game and pose estimation app when done
@@ -0,0 +1,111 @@
+from collections import namedtuple
+import numpy as np
+
+# COCO keypoint order used by the Hailo pose model
+NUM_KEYPOINTS = 17
+NOSE = 0
+LEFT_SHOULDER, RIGHT_SHOULDER = 5, 6
+LEFT_ELBOW, RIGHT_ELBOW = 7, 8
+LEFT_WRIST, RIGHT_WRIST = 9, 10
+LEFT_HIP, RIGHT_HIP = 11, 12
+
+# Poses for one buffer: points (P, 17, 2) in window pixels, confidences (P, 17),
+# boxes (P, 4) normalized xmin, ymin, width, height
+Poses = namedtuple('Poses', ['points', 'confidences', 'boxes'])
+
+
+class KeypointExtractor:
+    """Pulls every landmark of every detected person into preallocated arrays.
+
+    The only per-point Python work is reading the Hailo point objects; the mapping from
+    box-relative landmarks to window coordinates is one vectorized transform per buffer.
+    Arrays grow when more people than `capacity` are in view and are reused otherwise.
+    """
+
+    def __init__(self, landmarks_type, window_width, window_height, y_min=0.22, y_max=0.78,
+                 label="person", capacity=4):
+        self.landmarks_type = landmarks_type
+        self.window_width = window_width
+        self.window_height = window_height
+        self.y_min = y_min
+        self.y_range = y_max - y_min
+        self.label = label
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        self.capacity = capacity
+        self._raw = np.zeros((capacity, NUM_KEYPOINTS, 3), dtype=np.float32)
+        self._boxes = np.zeros((capacity, 4), dtype=np.float32)
+        self._points = np.zeros((capacity, NUM_KEYPOINTS, 2), dtype=np.float32)
+
+    def extract(self, detections, frame_width):
+        """Return Poses for all people in `detections`, as views valid until the next call."""
+        count = 0
+        for detection in detections:
+            if detection.get_label() != self.label:
+                continue
+            landmarks = detection.get_objects_typed(self.landmarks_type)
+            if len(landmarks) == 0:
+                continue
+            points = landmarks[0].get_points()
+            if len(points) < NUM_KEYPOINTS:
+                continue
+            if count == self.capacity:
+                self._grow()
+            bbox = detection.get_bbox()
+            self._boxes[count] = (bbox.xmin(), bbox.ymin(), bbox.width(), bbox.height())
+            self._raw[count] = [(p.x(), p.y(), p.confidence()) for p in points[:NUM_KEYPOINTS]]
+            count += 1
+        return self.to_window(count, frame_width)
+
+    def to_window(self, count, frame_width):
+        raw = self._raw[:count]
+        boxes = self._boxes[:count]
+        # Landmarks are relative to their box; move them into normalized frame coordinates
+        frame_x = raw[:, :, 0] * boxes[:, None, 2] + boxes[:, None, 0]
+        frame_y = raw[:, :, 1] * boxes[:, None, 3] + boxes[:, None, 1]
+        points = self._points[:count]
+        # Mirror horizontally so the player moves like in a mirror, and stretch the
+        # central band of the frame height over the whole window
+        points[:, :, 0] = self.window_width - np.trunc(frame_x * frame_width)
+        points[:, :, 1] = np.trunc((frame_y - self.y_min) / self.y_range * self.window_height)
+        return Poses(points, raw[:, :, 2], boxes)
+
+    def _grow(self):
+        raw, boxes = self._raw, self._boxes
+        self._allocate(self.capacity * 2)
+        self._raw[:len(raw)] = raw
+        self._boxes[:len(boxes)] = boxes
+
+
+class CapsCache:
+    """Frame size of a GStreamer pad, read once and then again only on notify::caps.
+
+    `get_caps(pad)` returns (format, width, height) like hailo_rpi_common.get_caps_from_pad.
+    """
+
+    def __init__(self, get_caps):
+        self.get_caps = get_caps
+        self.width = None
+        self.height = None
+
+    def refresh(self, pad, *args):
+        caps = self.get_caps(pad)
+        if caps is not None and caps[1]:
+            _, self.width, self.height = caps
+
+    def size(self, pad):
+        """(width, height), or None while the pad has not negotiated caps yet."""
+        if self.width is None:
+            self.refresh(pad)
+            if self.width is None:
+                return None
+            pad.connect("notify::caps", self.refresh)
+        return self.width, self.height
+
+
+def primary_person(poses):
+    """Index of the person with the largest box (usually the closest player), or None."""
+    if len(poses.boxes) == 0:
+        return None
+    return int(np.argmax(poses.boxes[:, 2] * poses.boxes[:, 3]))
@@ -0,0 +1,126 @@
+import queue
+import threading
+import time
+from src.utils.instrumentation import count, log
+
+MAX_CONSECUTIVE_ERRORS = 10
+
+
+class LatencyStats:
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.last = 0.0
+        self.mean = 0.0
+        self.max = 0.0
+
+    def record(self, latency):
+        self.count += 1
+        self.last = latency
+        # Exponential moving average, cheap enough to update on every item
+        self.mean += (latency - self.mean) * (0.05 if self.count > 1 else 1.0)
+        if latency > self.max:
+            self.max = latency
+
+    def stats(self):
+        return {
+            "name": self.name,
+            "count": self.count,
+            "mean_ms": self.mean * 1000.0,
+            "max_ms": self.max * 1000.0,
+        }
+
+
+class Stage:
+    """One pipeline stage: a worker thread draining a small bounded queue.
+
+    `put` never blocks the producer. When the queue is full the oldest item is dropped,
+    so a slow stage always works on the newest data instead of falling behind.
+    When the handler raises, `on_error(item, exc)` gets a chance to fail safe (e.g. stop
+    the motors); after `max_errors` consecutive errors the stage stops and sets `failed`.
+    """
+
+    def __init__(self, name, handler, maxsize=1, on_error=None, max_errors=MAX_CONSECUTIVE_ERRORS):
+        self.name = name
+        self.handler = handler
+        self.on_error = on_error
+        self.max_errors = max_errors
+        self.queue = queue.Queue(maxsize=maxsize)
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        self.latency = LatencyStats(name)
+        self.dropped = 0
+        self.errors = 0
+        self.consecutive_errors = 0
+        self.failed = False
+
+    def put(self, item):
+        while True:
+            try:
+                self.queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                    count("frames_dropped")
+                except queue.Empty:
+                    pass
+
+    def start(self):
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=f"stage-{self.name}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=1.0):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                item = self.queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            start = time.perf_counter()
+            try:
+                self.handler(item)
+                self.consecutive_errors = 0
+            except Exception as e:
+                self._error(item, e)
+            self.latency.record(time.perf_counter() - start)
+            if self.failed:
+                break
+
+    def _error(self, item, error):
+        self.errors += 1
+        self.consecutive_errors += 1
+        log("ERROR", f"stage {self.name}: {error}", key=f"stage {self.name}")
+        if self.on_error is not None:
+            try:
+                self.on_error(item, error)
+            except Exception as e:
+                log("ERROR", f"stage {self.name} on_error: {e}", key=f"stage {self.name} on_error")
+        if self.max_errors and self.consecutive_errors >= self.max_errors:
+            log("ERROR", f"stage {self.name}: {self.consecutive_errors} errors in a row, stopping")
+            self.failed = True
+
+    def stats(self):
+        stats = self.latency.stats()
+        stats.update(dropped=self.dropped, errors=self.errors, depth=self.queue.qsize(), failed=self.failed)
+        return stats
+
+
+def format_stats(items):
+    parts = []
+    for item in items:
+        s = item.stats()
+        part = f"{s['name']} {s['mean_ms']:.1f}/{s['max_ms']:.1f}ms"
+        if "depth" in s:
+            part += f" q={s['depth']} drop={s['dropped']}"
+        parts.append(part)
+    return " | ".join(parts)
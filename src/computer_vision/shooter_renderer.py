@@ -0,0 +1,158 @@
+from collections import OrderedDict
+import pygame
+
+# Colors
+WHITE = (255, 255, 255)
+RED = (255, 0, 0)
+GREEN = (0, 255, 0)
+BLUE = (0, 255, 255)
+BLACK = (0, 0, 0)
+
+FONT_SIZE = 36
+SCORE_POS = (10, 10)
+LIVES_POS = (10, 50)
+# Above this many dirty rectangles (or this share of the screen) one flip is cheaper
+MAX_DIRTY_RECTS = 512
+MAX_DIRTY_FRACTION = 0.5
+
+
+class TextCache:
+    """Rendered text surfaces keyed by (text, color), least recently used evicted first."""
+
+    def __init__(self, font=None, size=FONT_SIZE, antialias=True, max_entries=64):
+        if not pygame.font.get_init():
+            pygame.font.init()
+        self.font = pygame.font.Font(font, size)
+        self.antialias = antialias
+        self.max_entries = max_entries
+        self._surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, text, color=WHITE):
+        key = (text, color)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+        self.misses += 1
+        surface = self.font.render(text, self.antialias, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_entries:
+            self._surfaces.popitem(last=False)
+        return surface
+
+
+class ShooterRenderer:
+    """Draws a ShooterWorld, pushing only the changed parts of the screen to the display.
+
+    Each frame erases last frame's entity rectangles, draws the current ones and the HUD,
+    then calls pygame.display.update() with the erased and drawn rectangles plus any HUD
+    text that changed. Falls back to a full flip on the first frame, when too much of the
+    screen changed, or always with `full_redraw=True`.
+    """
+
+    def __init__(self, screen, world, full_redraw=False, text_cache=None,
+                 max_dirty_rects=MAX_DIRTY_RECTS, max_dirty_fraction=MAX_DIRTY_FRACTION):
+        self.screen = screen
+        self.world = world
+        self.full_redraw = full_redraw
+        self.text = text_cache or TextCache()
+        self.max_dirty_rects = max_dirty_rects
+        self.max_dirty_area = max_dirty_fraction * screen.get_width() * screen.get_height()
+        self._previous = []
+        self._hud = {}
+        self._needs_flip = True
+        self.frames = 0
+        self.flips = 0
+
+    def invalidate(self):
+        """Force a full redraw on the next frame (e.g. after the window was recreated)."""
+        self._needs_flip = True
+
+    def draw(self):
+        screen = self.screen
+        world = self.world
+        bounds = screen.get_rect()
+        player = world.player
+        players = [pygame.Rect(player.x, player.y, player.width, player.height)]
+        bullets = [pygame.Rect(rect) for rect in world.bullets.rects()]
+        bricks = [pygame.Rect(rect) for rect in world.bricks.rects()]
+        # Clip to the screen: Surface.fill does not clip rectangles with a negative
+        # top correctly, and off-screen entities (new bricks) never touch the display
+        current = [bounds.clip(rect) for rect in players + bullets + bricks if bounds.colliderect(rect)]
+
+        full = self.full_redraw or self._needs_flip
+        if full:
+            self._hud.clear()
+            screen.fill(BLACK)
+            dirty = []
+        else:
+            for rect in self._previous:
+                screen.fill(BLACK, rect)
+            dirty = self._previous + current
+
+        # The HUD is antialiased text blended over the entities, so it is redrawn only
+        # when its text changed or an entity was erased or drawn underneath it
+        hud = []
+        for pos, text in ((SCORE_POS, f'Score: {world.score}'), (LIVES_POS, f'Lives: {world.lives}')):
+            surface = self.text.render(text)
+            rect = surface.get_rect(topleft=pos)
+            previous = self._hud.get(pos)
+            if full or previous is None or previous[0] != text or rect.collidelist(dirty) != -1:
+                if previous is not None:
+                    screen.fill(BLACK, previous[1])
+                    dirty.append(previous[1])
+                screen.fill(BLACK, rect)
+                dirty.append(rect)
+                hud.append((surface, rect))
+                self._hud[pos] = (text, rect)
+
+        for rect in players:
+            pygame.draw.rect(screen, GREEN, rect)
+        for rect in bullets:
+            pygame.draw.rect(screen, RED, rect)
+        for rect in bricks:
+            pygame.draw.rect(screen, BLUE, rect)
+        for surface, rect in hud:
+            screen.blit(surface, rect)
+        self._previous = current
+
+        if not full and (len(dirty) > self.max_dirty_rects or
+                         sum(rect.width * rect.height for rect in dirty) > self.max_dirty_area):
+            full = True
+        if full:
+            pygame.display.flip()
+            self.flips += 1
+        else:
+            pygame.display.update(dirty)
+        self._needs_flip = False
+        self.frames += 1
+
+
+def benchmark(frames=1000, seed=0):
+    """Time dirty-rectangle rendering against a full redraw of the same game frames."""
+    import random
+    import time
+    from src.computer_vision.shooter_world import WINDOW_HEIGHT, WINDOW_WIDTH, ShooterWorld
+
+    pygame.init()
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    for full_redraw in (True, False):
+        random.seed(seed)
+        world = ShooterWorld()
+        renderer = ShooterRenderer(screen, world, full_redraw=full_redraw)
+        elapsed = 0.0
+        for _ in range(frames):
+            world.tick(((random.randint(0, WINDOW_WIDTH), 0),) * 2)
+            start = time.perf_counter()
+            renderer.draw()
+            elapsed += time.perf_counter() - start
+        mode = "full redraw" if full_redraw else "dirty rects"
+        print(f"{mode}: {elapsed / frames * 1e3:.3f} ms/frame, {renderer.flips} flips, "
+              f"text cache {renderer.text.hits} hits / {renderer.text.misses} misses")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,136 @@
+import argparse
+import random
+import time
+from collections import namedtuple
+import numpy as np
+from src.computer_vision.entity_store import EntityStore, points_in_boxes
+
+# Game constants
+WINDOW_WIDTH = 600  # Adjusted window width
+WINDOW_HEIGHT = 600
+FPS = 60
+PLAYER_WIDTH = 100
+PLAYER_HEIGHT = 20
+BULLET_WIDTH = 5
+BULLET_HEIGHT = 10
+BULLET_SPEED = 7
+BRICK_WIDTH = 75
+BRICK_HEIGHT = 30
+BRICK_DROP_SPEED = 2
+SPAWN_RATE = 30  # Frames between brick spawns
+FIRE_RATE = 10  # Frames between shots
+STARTING_LIVES = 3
+
+Player = namedtuple('Player', ['x', 'y', 'width', 'height'])
+
+
+class ShooterWorld:
+    """Pose Shooter game state and rules, with no display or pose pipeline attached."""
+
+    def __init__(self, width=WINDOW_WIDTH, height=WINDOW_HEIGHT, starting_lives=STARTING_LIVES):
+        self.width = width
+        self.height = height
+        self.starting_lives = starting_lives
+        self.bullets = EntityStore()
+        self.bricks = EntityStore()
+        self.reset()
+
+    def reset(self):
+        self.player = Player(self.width // 2 - PLAYER_WIDTH // 2, self.height - 50, PLAYER_WIDTH, PLAYER_HEIGHT)
+        self.bullets.clear()
+        self.bricks.clear()
+        self.score = 0
+        self.lives = self.starting_lives
+        self.frame_count = 0
+        self.game_over = False
+
+    def spawn_brick(self):
+        x = random.randint(0, self.width - BRICK_WIDTH)
+        return self.bricks.spawn(x, -BRICK_HEIGHT, BRICK_WIDTH, BRICK_HEIGHT, BRICK_DROP_SPEED)
+
+    def shoot(self):
+        return self.bullets.spawn(self.player.x + self.player.width // 2, self.player.y,
+                                  BULLET_WIDTH, BULLET_HEIGHT, -BULLET_SPEED)
+
+    def update_bricks(self):
+        self.bricks.move()
+        missed = self.bricks.kill_where(self.bricks.y[:self.bricks.used] > self.height)
+        if missed:
+            self.lives -= missed
+            if self.lives <= 0:
+                self.game_over = True
+
+    def update_bullets(self):
+        self.bullets.move()
+        self.bullets.kill_where(self.bullets.y[:self.bullets.used] <= 0)
+
+    def check_collisions(self):
+        self.score += self.bricks.kill(points_in_boxes(self.bullets, self.bricks))
+
+    def move_player(self, left_pos, right_pos):
+        # Use the average x-coordinate of both wrists to move the player
+        new_x = (left_pos[0] + right_pos[0]) // 2 - self.player.width // 2
+        # Ensure the player stays within the window bounds
+        new_x = max(0, min(self.width - self.player.width, new_x))
+        self.player = self.player._replace(x=new_x)
+
+    def tick(self, hands=None):
+        """Advance one frame; `hands` is ((left_x, left_y), (right_x, right_y)) or None."""
+        if self.game_over:
+            self.reset()
+        else:
+            if self.frame_count % SPAWN_RATE == 0:
+                self.spawn_brick()
+
+            self.update_bricks()
+            self.update_bullets()
+            self.check_collisions()
+            if hands is not None:
+                self.move_player(*hands)
+
+            if self.frame_count % FIRE_RATE == 0:
+                self.shoot()
+        self.frame_count += 1
+
+
+def bench(frames, entities, seed=0):
+    """Step the world headless with about `entities` live bricks and bullets; print frame times."""
+    random.seed(seed)
+    rng = np.random.default_rng(seed)
+    world = ShooterWorld(starting_lives=float('inf'))
+    half = entities // 2
+
+    def top_up():
+        missing = half - len(world.bricks)
+        if missing > 0:
+            world.bricks.spawn_many(rng.uniform(0, WINDOW_WIDTH - BRICK_WIDTH, missing),
+                                    rng.uniform(-WINDOW_HEIGHT, 0, missing), BRICK_WIDTH / 4, BRICK_HEIGHT / 4,
+                                    rng.uniform(0.5, BRICK_DROP_SPEED, missing))
+        missing = half - len(world.bullets)
+        if missing > 0:
+            world.bullets.spawn_many(rng.uniform(0, WINDOW_WIDTH, missing),
+                                     rng.uniform(WINDOW_HEIGHT / 2, WINDOW_HEIGHT, missing),
+                                     BULLET_WIDTH, BULLET_HEIGHT, -BULLET_SPEED)
+
+    times = np.empty(frames)
+    for i in range(frames):
+        top_up()
+        hand_x = int(rng.integers(0, WINDOW_WIDTH))
+        start = time.perf_counter()
+        world.tick(((hand_x, 300), (hand_x, 300)))
+        times[i] = time.perf_counter() - start
+
+    budget = 1.0 / FPS
+    p50, p99 = np.percentile(times, [50, 99]) * 1e3
+    print(f"{frames} frames, ~{entities} entities: mean {times.mean() * 1e3:.3f} ms, p50 {p50:.3f} ms, "
+          f"p99 {p99:.3f} ms, max {times.max() * 1e3:.3f} ms; "
+          f"headroom at {FPS} FPS {100 * (1 - p99 / (budget * 1e3)):.1f}% (p99), score {world.score}")
+    return times
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless Pose Shooter world benchmark")
+    parser.add_argument("--bench", type=int, default=1000, metavar="N", help="Frames to step")
+    parser.add_argument("--entities", type=int, default=2000, help="Live bricks plus bullets to maintain")
+    args = parser.parse_args()
+    bench(args.bench, args.entities)
@@ -0,0 +1,209 @@
+from collections import namedtuple
+import numpy as np
+
+Target = namedtuple('Target', ['track_id', 'box', 'score', 'class_id', 'predicted'])
+
+
+def iou_matrix(a, b):
+    """IoU between every (x, y, w, h) box in `a` and every box in `b`."""
+    a = np.asarray(a, dtype=np.float32).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float32).reshape(-1, 4)
+    ax0, ay0 = a[:, 0:1], a[:, 1:2]
+    ax1, ay1 = ax0 + a[:, 2:3], ay0 + a[:, 3:4]
+    bx0, by0 = b[:, 0], b[:, 1]
+    bx1, by1 = bx0 + b[:, 2], by0 + b[:, 3]
+    inter_w = np.clip(np.minimum(ax1, bx1) - np.maximum(ax0, bx0), 0, None)
+    inter_h = np.clip(np.minimum(ay1, by1) - np.maximum(ay0, by0), 0, None)
+    inter = inter_w * inter_h
+    union = a[:, 2:3] * a[:, 3:4] + b[:, 2] * b[:, 3] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-6), 0.0)
+
+
+class KalmanBoxFilter:
+    """Constant-velocity Kalman filter over box centre and size.
+
+    State is (cx, cy, w, h, vcx, vcy, vw, vh); velocities are per second, so the filter
+    can be predicted to any timestamp, not just to the next frame.
+    """
+
+    def __init__(self, box, timestamp, process_noise=200.0, measurement_noise=10.0):
+        x, y, w, h = box
+        self.x = np.array([x + w / 2, y + h / 2, w, h, 0, 0, 0, 0], dtype=np.float64)
+        self.P = np.diag([measurement_noise ** 2] * 4 + [500.0 ** 2] * 4)
+        self.R = np.eye(4) * measurement_noise ** 2
+        self.H = np.hstack((np.eye(4), np.zeros((4, 4))))
+        self.q = process_noise ** 2
+        self.timestamp = timestamp
+
+    def _transition(self, dt):
+        F = np.eye(8)
+        F[:4, 4:] = np.eye(4) * dt
+        # Piecewise white-acceleration noise
+        Q = np.zeros((8, 8))
+        Q[:4, :4] = np.eye(4) * (dt ** 4 / 4)
+        Q[:4, 4:] = Q[4:, :4] = np.eye(4) * (dt ** 3 / 2)
+        Q[4:, 4:] = np.eye(4) * dt ** 2
+        return F, Q * self.q
+
+    def state_at(self, timestamp):
+        dt = max(timestamp - self.timestamp, 0.0)
+        return self.x[:4] + self.x[4:] * dt
+
+    def predict(self, timestamp):
+        dt = timestamp - self.timestamp
+        if dt <= 0:
+            return
+        F, Q = self._transition(dt)
+        self.x = F @ self.x
+        self.P = F @ self.P @ F.T + Q
+        self.timestamp = timestamp
+
+    def update(self, box):
+        x, y, w, h = box
+        z = np.array([x + w / 2, y + h / 2, w, h])
+        residual = z - self.H @ self.x
+        S = self.H @ self.P @ self.H.T + self.R
+        K = self.P @ self.H.T @ np.linalg.inv(S)
+        self.x = self.x + K @ residual
+        self.P = (np.eye(8) - K @ self.H) @ self.P
+
+    @staticmethod
+    def to_box(state):
+        cx, cy, w, h = state[:4]
+        w, h = max(w, 1.0), max(h, 1.0)
+        return np.array([cx - w / 2, cy - h / 2, w, h], dtype=np.float32)
+
+
+class Track:
+    def __init__(self, track_id, detection, timestamp):
+        self.track_id = track_id
+        self.filter = KalmanBoxFilter(detection["box"], timestamp)
+        self.score = float(detection["score"])
+        self.class_id = int(detection["class_id"])
+        self.created = timestamp
+        self.last_update = timestamp
+        self.hits = 1
+        self.misses = 0
+
+    def age(self, timestamp):
+        return timestamp - self.created
+
+    def time_since_update(self, timestamp):
+        return timestamp - self.last_update
+
+    def box(self, timestamp=None):
+        state = self.filter.x if timestamp is None else self.filter.state_at(timestamp)
+        return KalmanBoxFilter.to_box(state)
+
+    def update(self, detection, timestamp):
+        self.filter.update(detection["box"])
+        self.score = float(detection["score"])
+        self.class_id = int(detection["class_id"])
+        self.last_update = timestamp
+        self.hits += 1
+        self.misses = 0
+
+
+class Tracker:
+    """Multi-target tracker with a lock-on policy for the followed target.
+
+    Detections are associated to predicted tracks greedily, first by IoU and then by
+    centroid distance for boxes that moved too far to overlap. A track is confirmed
+    after `min_hits` updates; the tracker locks on to the largest confirmed track and
+    stays with it until that track has gone unseen for `max_age` seconds. Between
+    detections `target()` returns the prediction for up to `coast_time` seconds.
+    """
+
+    def __init__(self, iou_threshold=0.3, centroid_gate=0.75, min_hits=2, max_age=1.0, coast_time=0.5):
+        self.iou_threshold = iou_threshold
+        self.centroid_gate = centroid_gate
+        self.min_hits = min_hits
+        self.max_age = max_age
+        self.coast_time = coast_time
+        self.tracks = []
+        self.locked_id = None
+        self._next_id = 1
+
+    def reset(self):
+        self.tracks = []
+        self.locked_id = None
+
+    def update(self, detections, timestamp):
+        for track in self.tracks:
+            track.filter.predict(timestamp)
+
+        matches, unmatched = self._associate(detections)
+        for t, d in matches:
+            self.tracks[t].update(detections[d], timestamp)
+        matched_tracks = {t for t, _ in matches}
+        for t, track in enumerate(self.tracks):
+            if t not in matched_tracks:
+                track.misses += 1
+
+        self.tracks = [t for t in self.tracks if t.time_since_update(timestamp) <= self.max_age]
+        for d in unmatched:
+            self.tracks.append(Track(self._next_id, detections[d], timestamp))
+            self._next_id += 1
+        self._update_lock()
+        return self.tracks
+
+    def _associate(self, detections):
+        if not self.tracks or len(detections) == 0:
+            return [], list(range(len(detections)))
+
+        predicted = np.array([t.box() for t in self.tracks])
+        boxes = np.asarray(detections["box"], dtype=np.float32)
+        ious = iou_matrix(predicted, boxes)
+        matches = []
+        used_t, used_d = set(), set()
+
+        for flat in np.argsort(ious, axis=None)[::-1]:
+            t, d = np.unravel_index(flat, ious.shape)
+            if ious[t, d] < self.iou_threshold:
+                break
+            if t in used_t or d in used_d:
+                continue
+            matches.append((int(t), int(d)))
+            used_t.add(t)
+            used_d.add(d)
+
+        # Fast movers may not overlap their prediction: fall back to centroid distance
+        centres_t = predicted[:, :2] + predicted[:, 2:] / 2
+        centres_d = boxes[:, :2] + boxes[:, 2:] / 2
+        dist = np.linalg.norm(centres_t[:, None, :] - centres_d[None, :, :], axis=2)
+        gate = self.centroid_gate * np.maximum(predicted[:, 2], predicted[:, 3])[:, None]
+        for flat in np.argsort(dist, axis=None):
+            t, d = np.unravel_index(flat, dist.shape)
+            if t in used_t or d in used_d or dist[t, d] > gate[t, 0]:
+                continue
+            matches.append((int(t), int(d)))
+            used_t.add(t)
+            used_d.add(d)
+
+        unmatched = [d for d in range(len(detections)) if d not in used_d]
+        return matches, unmatched
+
+    def _update_lock(self):
+        if self.locked_id is not None and any(t.track_id == self.locked_id for t in self.tracks):
+            return
+        confirmed = [t for t in self.tracks if t.hits >= self.min_hits]
+        if not confirmed:
+            self.locked_id = None
+            return
+        self.locked_id = max(confirmed, key=lambda t: t.filter.x[2] * t.filter.x[3]).track_id
+
+    def locked_track(self):
+        for track in self.tracks:
+            if track.track_id == self.locked_id:
+                return track
+        return None
+
+    def target(self, timestamp):
+        """Locked target's box at `timestamp`, predicted if it was not just detected."""
+        track = self.locked_track()
+        if track is None:
+            return None
+        since = track.time_since_update(timestamp)
+        if since > self.coast_time:
+            return None
+        return Target(track.track_id, track.box(timestamp), track.score, track.class_id, since > 0)
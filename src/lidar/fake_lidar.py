@@ -0,0 +1,102 @@
+import time
+import numpy as np
+
+
+class FakeLidarException(Exception):
+    pass
+
+
+class FakeLidar:
+    """Stand-in for `rplidar.RPLidar` that synthesizes scans of a rectangular room.
+
+    It implements the subset of the RPLidar API used in this repo, so anything that takes
+    a device (or a device factory) can be run and tested without the serial port.
+    Obstacles are (angle_deg, distance_mm, width_deg) patches in front of the walls.
+    `fail_after` raises FakeLidarException after that many scans, to exercise reconnects.
+    """
+
+    def __init__(self, port=None, rate=10.0, points_per_scan=800, room=(4000.0, 3000.0),
+                 obstacles=(), noise=10.0, fail_after=None, realtime=True, seed=0):
+        self.port = port
+        self.rate = rate
+        self.points_per_scan = points_per_scan
+        self.room = room
+        self.obstacles = list(obstacles)
+        self.noise = noise
+        self.fail_after = fail_after
+        self.realtime = realtime
+        self.rng = np.random.default_rng(seed)
+        self.motor_running = False
+        self.connected = True
+        self.scans_sent = 0
+
+    def get_info(self):
+        return {"model": 24, "firmware": (1, 29), "hardware": 7, "serialnumber": "FAKE"}
+
+    def get_health(self):
+        return ("Good", 0)
+
+    def start_motor(self):
+        self.motor_running = True
+
+    def stop_motor(self):
+        self.motor_running = False
+
+    def stop(self):
+        pass
+
+    def clear_input(self):
+        pass
+
+    def disconnect(self):
+        self.connected = False
+
+    def generate_scan(self):
+        """One revolution as an (N, 3) float32 array of (quality, angle, distance)."""
+        n = self.points_per_scan
+        step = 360.0 / n
+        angles = (np.arange(n) * step + self.rng.uniform(0, step)) % 360.0
+        theta = np.radians(angles)
+
+        half_w, half_h = self.room[0] / 2.0, self.room[1] / 2.0
+        with np.errstate(divide="ignore"):
+            to_x = half_w / np.abs(np.cos(theta))
+            to_y = half_h / np.abs(np.sin(theta))
+        distances = np.minimum(to_x, to_y)
+
+        for angle, distance, width in self.obstacles:
+            offset = (angles - angle + 180.0) % 360.0 - 180.0
+            hit = np.abs(offset) <= width / 2.0
+            distances[hit] = np.minimum(distances[hit], distance)
+
+        if self.noise:
+            distances = distances + self.rng.normal(0.0, self.noise, n)
+        quality = np.full(n, 15.0)
+        return np.column_stack((quality, angles, np.maximum(distances, 0.0))).astype(np.float32)
+
+    def iter_measures(self, scan_type="normal", max_buf_meas=3000):
+        self.start_motor()
+        period = 1.0 / self.rate
+        next_time = time.monotonic()
+        while self.connected:
+            if self.fail_after is not None and self.scans_sent >= self.fail_after:
+                raise FakeLidarException("Fake serial link dropped")
+            scan = self.generate_scan()
+            self.scans_sent += 1
+            if self.realtime:
+                next_time += period
+                delay = next_time - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            for i, (quality, angle, distance) in enumerate(scan.tolist()):
+                yield i == 0, int(quality), angle, distance
+
+    def iter_scans(self, scan_type="normal", max_buf_meas=3000, min_len=5):
+        scan = []
+        for new_scan, quality, angle, distance in self.iter_measures(scan_type, max_buf_meas):
+            if new_scan:
+                if len(scan) > min_len:
+                    yield scan
+                scan = []
+            if quality > 0 and distance > 0:
+                scan.append((quality, angle, distance))
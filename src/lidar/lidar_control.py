@@ -1,31 +1,77 @@
-from rplidar import RPLidar
-import matplotlib.pyplot as plt
+import argparse
+import threading
 import numpy as np
+from src.lidar.lidar_stream import LidarScan
+from src.lidar.occupancy_grid import OccupancyGrid
+from src.lidar.scan_buffer import ScanBuffer
+from src.utils import backends
+from src.utils.instrumentation import LIDAR_SCAN, log, span
 
 class LidarControl:
-    def __init__(self, port='/dev/ttyUSB0'):
-        self.lidar = RPLidar(port)
+    def __init__(self, port='/dev/ttyUSB0', resolution=1.0, history=16, reduction='min', backend=None,
+                 mapping=False):
+        self.lidar = backends.create('lidar', backend, port)
         self.info = self.lidar.get_info()
         self.health = self.lidar.get_health()
+        self.scan_buffer = ScanBuffer(capacity=history, resolution=resolution, reduction=reduction)
+        self.grid = OccupancyGrid() if mapping else None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
 
-    def start_scan(self):
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start_scan(self, view=None, duration=None):
+        """Acquire scans on a background thread and show them in `view` until it closes.
+
+        `view` defaults to a blitting PolarPlot; pass a FrameRenderer to run headless.
+        Plotting reads the newest scan at its own capped rate, so it never delays the
+        serial reader.
+        """
+        from src.lidar.lidar_view import PolarPlot, show
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._acquire, name='LidarControl', daemon=True)
+        self._thread.start()
+        if view is None:
+            view = PolarPlot(self.scan_buffer.angles)
+        try:
+            return show(self, view, duration)
+        finally:
+            view.close()
+            self._stop_event.set()
+            self._thread.join(2.0)
+
+    def _acquire(self):
         self.lidar.start_motor()
-        fig, ax = plt.subplots(subplot_kw={'projection': 'polar'})
-        scan_data = np.zeros((360, 2))
         try:
             for scan in self.lidar.iter_scans():
-                for (_, angle, distance) in scan:
-                    scan_data[int(angle)] = (np.radians(angle), distance)
-                ax.clear()
-                ax.set_ylim(0, 6000)
-                ax.plot(scan_data[:, 0], scan_data[:, 1], 'bo')
-                plt.pause(0.001)
-                print('Got %d measurements' % len(scan))
+                if self._stop_event.is_set():
+                    break
+                with span(LIDAR_SCAN), self._lock:
+                    distances = self.scan_buffer.push(scan)
+                if self.grid is not None:
+                    self.grid.integrate(distances, self.scan_buffer.angles)
+                log("SCAN", "Got measurements", points=len(scan))
+        except EOFError as e:
+            log("INFO", f"LiDAR scans ended: {e}", key="scanning")
         except Exception as e:
-            print(f"Error during scanning: {e}")
+            log("ERROR", f"Error during scanning: {e}", key="scanning")
             self.stop_scan()
-        finally:
-            plt.close(fig)
+
+    def read_if_newer(self, seq, out=None):
+        """Copy of the newest binned scan as a LidarScan if it is newer than `seq`."""
+        with self._lock:
+            buffer = self.scan_buffer
+            if buffer.count <= seq:
+                return None
+            if out is None:
+                out = np.empty(buffer.bins, dtype=np.float32)
+            out[:] = buffer.latest()
+            timestamps, _, points = buffer.window(1)
+            return LidarScan(buffer.count, float(timestamps[0]), out, int(points[0]))
 
     def stop_scan(self):
         try:
@@ -36,11 +82,26 @@ class LidarControl:
             print(f"Error during stopping: {e}")
 
 if __name__ == "__main__":
-    # Update the port as needed
-    lidar_control = LidarControl(port='/dev/ttyUSB0')
+    from src.lidar.lidar_view import DEFAULT_RATE, FORMATS, FrameRenderer, PolarPlot
+
+    parser = argparse.ArgumentParser(description="Live LiDAR view")
+    parser.add_argument("--port", default="/dev/ttyUSB0")
+    parser.add_argument("--backend", default=None, help=f"LiDAR backend, e.g. {backends.available('lidar')}")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="Maximum refresh rate in Hz")
+    parser.add_argument("--headless", metavar="DIR", default=None, help="Write frames to DIR instead of plotting")
+    parser.add_argument("--format", choices=FORMATS, default="png", help="Frame format with --headless")
+    parser.add_argument("--duration", type=float, default=None, help="Stop after this many seconds")
+    args = parser.parse_args()
+
+    lidar_control = LidarControl(port=args.port, backend=args.backend)
+    angles = lidar_control.scan_buffer.angles
+    if args.headless:
+        view = FrameRenderer(angles, args.headless, rate=args.rate, fmt=args.format)
+    else:
+        view = PolarPlot(angles, rate=args.rate)
     try:
-        lidar_control.start_scan()
+        lidar_control.start_scan(view, args.duration)
     except KeyboardInterrupt:
         print("Stopping scan...")
     finally:
-        lidar_control.stop_scan()
\ No newline at end of file
+        lidar_control.stop_scan()
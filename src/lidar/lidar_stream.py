@@ -0,0 +1,229 @@
+import threading
+import time
+from collections import namedtuple
+import numpy as np
+
+from src.lidar.scan_buffer import RESOLUTIONS, REDUCTIONS, bin_scan
+from src.lidar.sector_index import SectorIndex
+from src.utils import backends
+from src.utils.instrumentation import LIDAR_SCAN, count, log, span
+
+LidarScan = namedtuple('LidarScan', ['seq', 'timestamp', 'distances', 'points'])
+
+
+def rplidar_factory(port):
+    from rplidar import RPLidar
+    return RPLidar(port)
+
+
+class LidarStream:
+    """Long-lived producer thread that owns the LiDAR and publishes the latest scan.
+
+    Measurements are read with `iter_measures` and fed to a SectorIndex as they arrive;
+    complete revolutions are binned into the back half of a double buffer and swapped
+    to the front under a short lock. Readers copy the front buffer, so the serial reader
+    is never held up by the control loop. On any device error the stream disconnects and
+    reconnects with exponential backoff.
+    """
+
+    def __init__(self, port='/dev/ttyUSB0', device_factory=None, resolution=1.0,
+                 reduction='min', sectors=None, min_len=5, max_buf_meas=3000, late_after=0.15,
+                 reconnect_delay=0.5, max_reconnect_delay=5.0, recorder=None):
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"resolution must be one of {RESOLUTIONS}, got {resolution}")
+        if reduction not in REDUCTIONS:
+            raise ValueError(f"reduction must be one of {REDUCTIONS}, got {reduction!r}")
+        self.port = port
+        self.device_factory = backends.resolve('lidar') if device_factory is None else device_factory
+        self.resolution = resolution
+        self.reduction = reduction
+        self.min_len = min_len
+        self.max_buf_meas = max_buf_meas
+        self.late_after = late_after
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.recorder = recorder
+
+        self.bins = int(round(360.0 / resolution))
+        self.angles = np.radians((np.arange(self.bins) + 0.5) * resolution).astype(np.float32)
+        self.sectors = SectorIndex() if sectors is None else sectors
+        self.device = None
+        self.info = None
+        self.health = None
+
+        self._buffers = np.zeros((2, self.bins), dtype=np.float32)
+        self._front = 0
+        self._lock = threading.Lock()
+        self._new_scan = threading.Condition(self._lock)
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        self.seq = 0
+        self.timestamp = 0.0
+        self.points = 0
+        self._read_seq = 0
+        self.dropped = 0
+        self.late = 0
+        self.reconnects = 0
+        self.errors = 0
+        self.ended = False
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._stop_event.clear()
+        self.ended = False
+        self._thread = threading.Thread(target=self._run, name='LidarStream', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self._disconnect()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def latest(self, out=None):
+        """Copy of the newest complete scan as a LidarScan, or None before the first one."""
+        with self._lock:
+            return self._read_locked(out, self._read_seq)
+
+    def read_if_newer(self, seq, out=None):
+        with self._lock:
+            if self.seq <= seq:
+                return None
+            return self._read_locked(out, seq)
+
+    def wait_for_scan(self, after_seq=None, timeout=None, out=None):
+        """Block until a scan newer than `after_seq` (default: the last one read) is published."""
+        with self._new_scan:
+            if after_seq is None:
+                after_seq = self._read_seq
+            if not self._new_scan.wait_for(lambda: self.seq > after_seq, timeout):
+                return None
+            return self._read_locked(out, after_seq)
+
+    def age(self):
+        if self.seq == 0:
+            return float('inf')
+        return time.monotonic() - self.timestamp
+
+    def stats(self):
+        return {
+            'seq': self.seq,
+            'dropped': self.dropped,
+            'late': self.late,
+            'reconnects': self.reconnects,
+            'errors': self.errors,
+            'age': self.age(),
+        }
+
+    def _read_locked(self, out, after_seq):
+        if self.seq == 0:
+            return None
+        # Scans published after the reader's previous one and before this read were never
+        # seen by it. Readers that only use `sectors` never read and so never drop.
+        skipped = self.seq - after_seq - 1
+        if after_seq > 0 and skipped > 0:
+            self.dropped += skipped
+            count("scans_dropped", skipped)
+        if out is None:
+            out = np.empty(self.bins, dtype=np.float32)
+        out[:] = self._buffers[self._front]
+        self._read_seq = self.seq
+        return LidarScan(self.seq, self.timestamp, out, self.points)
+
+    def _publish(self, scan, timestamp):
+        back = 1 - self._front
+        with span(LIDAR_SCAN):
+            points = bin_scan(scan, self._buffers[back], self.resolution, self.reduction)
+        if self.recorder is not None:
+            self.recorder.record_scan(timestamp, self.seq + 1, scan)
+        with self._new_scan:
+            if self.seq > 0 and timestamp - self.timestamp > self.late_after:
+                self.late += 1
+            self._front = back
+            self.seq += 1
+            self.timestamp = timestamp
+            self.points = points
+            self._new_scan.notify_all()
+
+    def _connect(self):
+        self.device = self.device_factory(self.port)
+        self.info = self.device.get_info()
+        self.health = self.device.get_health()
+        self.sectors.reset()
+
+    def _disconnect(self):
+        device, self.device = self.device, None
+        if device is None:
+            return
+        try:
+            device.stop()
+            device.stop_motor()
+            device.disconnect()
+        except Exception as e:
+            log("WARN", f"LidarStream disconnect: {e}", key="LidarStream disconnect")
+
+    def _run(self):
+        delay = self.reconnect_delay
+        first = True
+        while not self._stop_event.is_set():
+            seq_before = self.seq
+            try:
+                if not first:
+                    self.reconnects += 1
+                first = False
+                self._connect()
+                self._stream()
+            except EOFError as e:
+                # A replayed log ran out (or a null device has none); nothing to reconnect to
+                log("INFO", f"LiDAR scans ended: {e}", key="LidarStream end", scans=self.seq)
+                self.ended = True
+            except Exception as e:
+                self.errors += 1
+                log("ERROR", f"LidarStream: {e}", key="LidarStream")
+            self._disconnect()
+            if self.ended:
+                break
+            if self.seq > seq_before:
+                delay = self.reconnect_delay
+            if self._stop_event.wait(delay):
+                break
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _stream(self):
+        scan = []
+        sectors = self.sectors
+        measures = self.device.iter_measures(max_buf_meas=self.max_buf_meas)
+        try:
+            for new_scan, quality, angle, distance in measures:
+                if self._stop_event.is_set():
+                    return
+                if new_scan:
+                    if len(scan) > self.min_len:
+                        self._publish(scan, time.monotonic())
+                    scan = []
+                sectors.update(angle, distance, quality, new_scan)
+                if quality > 0 and distance > 0:
+                    scan.append((quality, angle, distance))
+        except EOFError:
+            self._flush_scan(scan)
+            raise
+        self._flush_scan(scan)
+
+    def _flush_scan(self, scan):
+        # The device ran dry: its last revolution has no following new_scan marker
+        if len(scan) > self.min_len:
+            self._publish(scan, time.monotonic())
@@ -0,0 +1,149 @@
+import os
+import time
+import numpy as np
+
+MAX_RANGE = 6000  # mm, outer edge of the plot
+DEFAULT_RATE = 10.0  # Hz; a full redraw used to take longer than one scan period
+IMAGE_SIZE = 480
+RING_SPACING = 1000  # mm between range rings in rendered frames
+FORMATS = ("png", "raw")
+
+
+class PolarPlot:
+    """Matplotlib polar plot that keeps one persistent artist and redraws it by blitting.
+
+    The axes, grid and labels are drawn once and cached as a background; each frame only
+    restores that background and redraws the points. Must be used from the main thread.
+    """
+
+    def __init__(self, angles, max_range=MAX_RANGE, rate=DEFAULT_RATE):
+        import matplotlib.pyplot as plt
+
+        self.plt = plt
+        self.period = 1.0 / rate
+        self.fig, self.ax = plt.subplots(subplot_kw={'projection': 'polar'})
+        self.ax.set_ylim(0, max_range)
+        (self.points,) = self.ax.plot(angles, np.zeros(len(angles)), 'bo', animated=True)
+        self._background = None
+        # Any full redraw (first show, window resize) refreshes the cached background
+        self.fig.canvas.mpl_connect('draw_event', self._on_draw)
+        plt.show(block=False)
+        self.fig.canvas.draw()
+
+    def _on_draw(self, event):
+        self._background = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+        self.ax.draw_artist(self.points)
+
+    @property
+    def open(self):
+        return self.plt.fignum_exists(self.fig.number)
+
+    def draw(self, distances):
+        canvas = self.fig.canvas
+        self.points.set_ydata(distances)
+        if self._background is None or not canvas.supports_blit:
+            canvas.draw()
+        else:
+            canvas.restore_region(self._background)
+            self.ax.draw_artist(self.points)
+            canvas.blit(self.fig.bbox)
+        canvas.flush_events()
+
+    def wait(self, seconds):
+        # Keep the window responsive without triggering a redraw
+        self.fig.canvas.start_event_loop(max(seconds, 0.001))
+
+    def close(self):
+        self.plt.close(self.fig)
+
+
+class FrameRenderer:
+    """Headless top-down renderer writing one PNG or raw uint8 file per frame.
+
+    Forward is up and the LiDAR sits in the middle of a `size` x `size` grey image.
+    Range rings are rasterized once; each frame copies them and sets the hit pixels.
+    Raw frames are `size * size` bytes with no header.
+    """
+
+    def __init__(self, angles, out_dir, max_range=MAX_RANGE, rate=DEFAULT_RATE, size=IMAGE_SIZE,
+                 fmt="png"):
+        if fmt not in FORMATS:
+            raise ValueError(f"fmt must be one of {FORMATS}, got {fmt!r}")
+        os.makedirs(out_dir, exist_ok=True)
+        self.out_dir = out_dir
+        self.fmt = fmt
+        self.period = 1.0 / rate
+        self.size = size
+        self.scale = (size / 2 - 1) / max_range
+        self.max_range = max_range
+        # LiDAR angles run clockwise from the front, which is image up
+        self._sin = np.sin(angles).astype(np.float32)
+        self._cos = np.cos(angles).astype(np.float32)
+        self.image = np.zeros((size, size), dtype=np.uint8)
+        self._background = self._rings()
+        self.frames = 0
+        self.open = True
+        self.last_path = None
+
+    def _rings(self):
+        centre = self.size / 2
+        yy, xx = np.mgrid[:self.size, :self.size]
+        radius = np.hypot(xx - centre, yy - centre) / self.scale
+        rings = np.abs((radius + RING_SPACING / 2) % RING_SPACING - RING_SPACING / 2) < 0.75 / self.scale
+        background = np.zeros((self.size, self.size), dtype=np.uint8)
+        background[rings & (radius <= self.max_range)] = 60
+        return background
+
+    def draw(self, distances):
+        np.copyto(self.image, self._background)
+        valid = (distances > 0) & (distances <= self.max_range)
+        r = distances[valid] * self.scale
+        centre = self.size / 2
+        cols = (centre + r * self._sin[valid]).astype(np.intp)
+        rows = (centre - r * self._cos[valid]).astype(np.intp)
+        self.image[rows, cols] = 255
+
+        path = os.path.join(self.out_dir, f"scan_{self.frames:06d}.{self.fmt}")
+        if self.fmt == "png":
+            import cv2
+            cv2.imwrite(path, self.image)
+        else:
+            self.image.tofile(path)
+        self.frames += 1
+        self.last_path = path
+
+    def wait(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def close(self):
+        self.open = False
+
+
+def show(source, view, duration=None):
+    """Draw the newest scan from `source` into `view`, at most once per `view.period`.
+
+    `source` is anything with `read_if_newer(seq, out)` returning a LidarScan and a
+    `running` flag (LidarStream, LidarControl). It runs on its own thread, so a slow
+    view only skips scans and never holds up acquisition. Returns the frames drawn.
+    """
+    out = None
+    seq = 0
+    frames = 0
+    now = time.monotonic()
+    deadline = None if duration is None else now + duration
+    next_frame = now
+    while view.open and source.running and (deadline is None or now < deadline):
+        scan = source.read_if_newer(seq, out)
+        if scan is not None:
+            seq, out = scan.seq, scan.distances
+            view.draw(out)
+            frames += 1
+        next_frame += view.period
+        now = time.monotonic()
+        # After a slow frame, start again from now instead of bursting to catch up
+        if next_frame < now:
+            next_frame = now
+        view.wait(next_frame - now)
+        now = time.monotonic()
+    return frames
@@ -0,0 +1,222 @@
+import argparse
+import time
+import numpy as np
+
+MM_PER_M = 1000.0
+GRID_SIZE = 10.0  # metres per side
+GRID_RESOLUTION = 0.05  # metres per cell
+MAX_RANGE = 6.0  # metres; longer returns only clear space up to here
+# Log-odds added per scan for a hit / a beam passing through, and the clamp that
+# keeps cells able to change their mind when the scene changes
+L_OCCUPIED = 0.85
+L_FREE = -0.4
+L_MIN, L_MAX = -4.0, 4.0
+OCCUPIED_THRESHOLD = 0.5
+
+
+class OccupancyGrid:
+    """Robot-centred log-odds occupancy grid in a fixed-size float32 array.
+
+    World coordinates are metres with x/y in the map frame and heading in radians
+    counter-clockwise from +x. LiDAR angles are clockwise from the robot's front, as the
+    RPLidar reports them. The grid scrolls whenever the robot crosses a cell boundary so
+    it stays centred; cells that scroll out are forgotten, so memory is constant however
+    long the run. Without odometry the pose simply stays at the origin.
+    """
+
+    def __init__(self, size=GRID_SIZE, resolution=GRID_RESOLUTION, max_range=MAX_RANGE,
+                 l_occupied=L_OCCUPIED, l_free=L_FREE, l_min=L_MIN, l_max=L_MAX,
+                 occupied_threshold=OCCUPIED_THRESHOLD):
+        self.resolution = resolution
+        self.cells = int(round(size / resolution))
+        self.max_range = max_range
+        self.l_occupied = l_occupied
+        self.l_free = l_free
+        self.l_min = l_min
+        self.l_max = l_max
+        self.occupied_threshold = occupied_threshold
+
+        self.log_odds = np.zeros((self.cells, self.cells), dtype=np.float32)
+        self._scratch = np.zeros_like(self.log_odds)
+        self._free = np.zeros(self.cells * self.cells, dtype=bool)
+        # Beams are sampled every half cell so no traversed cell is skipped
+        steps = int(np.ceil(max_range / (resolution / 2)))
+        self._steps = ((np.arange(steps) + 0.5) * (resolution / 2)).astype(np.float32)
+        self._distance = None
+
+        self.pose = (0.0, 0.0, 0.0)
+        # Map cell (col, row) of log_odds[0, 0]
+        self.origin = (-(self.cells // 2), -(self.cells // 2))
+        self.scans = 0
+
+    def move_to(self, x, y, heading):
+        """Set the robot pose, scrolling the grid to keep the robot in the centre cell."""
+        self.pose = (float(x), float(y), float(heading))
+        origin = (int(np.floor(x / self.resolution)) - self.cells // 2,
+                  int(np.floor(y / self.resolution)) - self.cells // 2)
+        if origin != self.origin:
+            self._scroll(origin[0] - self.origin[0], origin[1] - self.origin[1])
+            self.origin = origin
+
+    def _scroll(self, dx, dy):
+        n = self.cells
+        out = self._scratch
+        out.fill(0.0)
+        if abs(dx) < n and abs(dy) < n:
+            out[max(-dy, 0):n - max(dy, 0), max(-dx, 0):n - max(dx, 0)] = \
+                self.log_odds[max(dy, 0):n - max(-dy, 0), max(dx, 0):n - max(-dx, 0)]
+        self.log_odds, self._scratch = out, self.log_odds
+        self._distance = None
+
+    def integrate(self, distances, angles, pose=None):
+        """Update the grid with one scan of `distances` (mm) at LiDAR `angles` (radians).
+
+        Zero distances (no return) are skipped. Each cell gets at most one free or one
+        occupied update per scan, whatever the number of beams crossing it.
+        """
+        if pose is not None:
+            self.move_to(*pose)
+        distances = np.asarray(distances, dtype=np.float32) / MM_PER_M
+        angles = np.asarray(angles, dtype=np.float32)
+        valid = distances > 0
+        distances, angles = distances[valid], angles[valid]
+
+        n = self.cells
+        res = self.resolution
+        x, y, heading = self.pose
+        # Robot position in (fractional) grid cells
+        gx = x / res - self.origin[0]
+        gy = y / res - self.origin[1]
+        direction = np.float32(heading) - angles
+        dir_x = np.cos(direction) / res
+        dir_y = np.sin(direction) / res
+        reach = np.minimum(distances, self.max_range)
+
+        free = self._free
+        free.fill(False)
+        if len(reach):
+            steps = self._steps[:np.searchsorted(self._steps, reach.max())]
+            # Stop half a cell short of the return so the hit cell itself is not cleared
+            along = steps[None, :] < (reach - res / 2)[:, None]
+            cols = np.floor(gx + dir_x[:, None] * steps).astype(np.intp)
+            rows = np.floor(gy + dir_y[:, None] * steps).astype(np.intp)
+            along &= (cols >= 0) & (cols < n) & (rows >= 0) & (rows < n)
+            free[rows[along] * n + cols[along]] = True
+
+        hit = distances <= self.max_range
+        cols = np.floor(gx + dir_x[hit] * distances[hit]).astype(np.intp)
+        rows = np.floor(gy + dir_y[hit] * distances[hit]).astype(np.intp)
+        inside = (cols >= 0) & (cols < n) & (rows >= 0) & (rows < n)
+        hits = rows[inside] * n + cols[inside]
+        free[hits] = False
+
+        flat = self.log_odds.reshape(-1)
+        flat[free] += self.l_free
+        flat[hits] += self.l_occupied
+        np.clip(flat, self.l_min, self.l_max, out=flat)
+        self._distance = None
+        self.scans += 1
+        return len(distances)
+
+    def integrate_measures(self, scan, pose=None):
+        """Update from raw (quality, angle_deg, distance_mm) measurements."""
+        measures = np.asarray(scan, dtype=np.float32).reshape(-1, 3)
+        return self.integrate(measures[:, 2], np.radians(measures[:, 1]), pose)
+
+    def probability(self):
+        return 1.0 / (1.0 + np.exp(-self.log_odds))
+
+    def occupied(self):
+        return self.log_odds >= self.occupied_threshold
+
+    def cell_of(self, x, y):
+        """(row, col) of the map point (x, y), which may lie outside the grid."""
+        return (int(np.floor(y / self.resolution)) - self.origin[1],
+                int(np.floor(x / self.resolution)) - self.origin[0])
+
+    def is_path_clear(self, distance, bearing=0.0, width=0.3, unknown_is_clear=True):
+        """True if no occupied cell lies in the corridor `width` metres wide that runs
+        `distance` metres from the robot along `bearing` (radians, clockwise from the front).
+        """
+        n = self.cells
+        res = self.resolution
+        x, y, heading = self.pose
+        direction = heading - bearing
+        along = np.arange(0.0, distance + res / 4, res / 2)
+        across = np.linspace(-width / 2, width / 2, int(np.ceil(width / (res / 2))) + 1)
+        cos, sin = np.cos(direction), np.sin(direction)
+        px = x + along[:, None] * cos - across[None, :] * sin
+        py = y + along[:, None] * sin + across[None, :] * cos
+        cols = np.floor(px / res).astype(np.intp) - self.origin[0]
+        rows = np.floor(py / res).astype(np.intp) - self.origin[1]
+        inside = (cols >= 0) & (cols < n) & (rows >= 0) & (rows < n)
+        values = self.log_odds[rows[inside], cols[inside]]
+        if (values >= self.occupied_threshold).any():
+            return False
+        if not unknown_is_clear and (not inside.all() or (values == 0).any()):
+            return False
+        return True
+
+    def distance_transform(self):
+        """Metres from every cell to the nearest occupied cell; cached until the grid changes."""
+        if self._distance is None:
+            occupied = self.occupied()
+            if occupied.any():
+                from scipy.ndimage import distance_transform_edt
+                self._distance = distance_transform_edt(~occupied, sampling=self.resolution).astype(np.float32)
+            else:
+                self._distance = np.full(occupied.shape, np.inf, dtype=np.float32)
+        return self._distance
+
+    def nearest_obstacle(self, x=None, y=None):
+        """Metres from (x, y), default the robot, to the nearest occupied cell.
+
+        inf if no obstacle is known, which includes points outside the grid.
+        """
+        if x is None:
+            x, y = self.pose[:2]
+        row, col = self.cell_of(x, y)
+        if not (0 <= row < self.cells and 0 <= col < self.cells):
+            return float('inf')
+        return float(self.distance_transform()[row, col])
+
+    def reset(self):
+        self.log_odds.fill(0.0)
+        self._distance = None
+        self.scans = 0
+
+
+def bench(scans=200, resolution=GRID_RESOLUTION, seed=0):
+    """Integrate simulated scans while driving forward; print per-scan and query times."""
+    import scipy.ndimage  # noqa: F401  (keep the one-off import out of the timings)
+    from src.lidar.fake_lidar import FakeLidar
+
+    lidar = FakeLidar(points_per_scan=800, obstacles=((0, 800, 20), (90, 600, 30)), realtime=False, seed=seed)
+    grid = OccupancyGrid(resolution=resolution)
+    update, clear, transform = [], [], []
+    for i in range(scans):
+        scan = lidar.generate_scan()
+        start = time.perf_counter()
+        grid.integrate_measures(scan, pose=(0.01 * i, 0.0, 0.0))
+        update.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        grid.is_path_clear(1.0)
+        clear.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        grid.nearest_obstacle()
+        transform.append(time.perf_counter() - start)
+
+    print(f"{grid.cells}x{grid.cells} grid at {resolution * 100:.0f} cm, {lidar.points_per_scan} points/scan")
+    for name, times in (("integrate", update), ("is_path_clear", clear), ("distance transform", transform)):
+        times = np.array(times) * 1e3
+        print(f"{name:<20} mean {times.mean():.3f} ms  p99 {np.percentile(times, 99):.3f} ms  max {times.max():.3f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rolling LiDAR occupancy grid benchmark")
+    parser.add_argument("--bench", type=int, default=200, metavar="N", help="Scans to integrate")
+    parser.add_argument("--resolution", type=float, default=GRID_RESOLUTION, help="Metres per cell")
+    args = parser.parse_args()
+    bench(args.bench, args.resolution)
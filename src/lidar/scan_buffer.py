@@ -0,0 +1,115 @@
+import time
+import numpy as np
+
+RESOLUTIONS = (0.25, 0.5, 1.0)
+REDUCTIONS = ("min", "mean")
+
+
+def bin_scan(scan, out, resolution=1.0, reduction="min"):
+    """Bin (quality, angle, distance) measurements into `out` in one vectorized pass.
+
+    `out` holds one float32 distance per bin of `resolution` degrees; empty bins get 0.
+    Returns the number of valid measurements used.
+    """
+    bins = out.shape[0]
+    measures = np.asarray(scan, dtype=np.float32).reshape(-1, 3)
+    measures = measures[measures[:, 2] > 0]
+    idx = (measures[:, 1] / resolution).astype(np.intp) % bins
+    distances = measures[:, 2]
+
+    if reduction == "min":
+        out.fill(np.inf)
+        np.minimum.at(out, idx, distances)
+        out[np.isinf(out)] = 0.0
+    else:
+        counts = np.bincount(idx, minlength=bins)
+        sums = np.bincount(idx, weights=distances, minlength=bins)
+        out.fill(0.0)
+        np.divide(sums, counts, out=out, where=counts > 0, casting="unsafe")
+    return len(distances)
+
+
+class ScanBuffer:
+    """Ring of the last `capacity` scans, each binned into a float32 row of distances (mm).
+
+    Every row is written twice (slot and slot + capacity) so that any window of recent
+    scans is one contiguous slice and can be handed out as a view without copying.
+    Bins without a return hold 0, like the old 360x2 array.
+    """
+
+    def __init__(self, capacity=16, resolution=1.0, reduction="min"):
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"resolution must be one of {RESOLUTIONS}, got {resolution}")
+        if reduction not in REDUCTIONS:
+            raise ValueError(f"reduction must be one of {REDUCTIONS}, got {reduction!r}")
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+
+        self.capacity = capacity
+        self.resolution = resolution
+        self.reduction = reduction
+        self.bins = int(round(360.0 / resolution))
+
+        # Bin centre angles in radians, ready for a polar plot
+        angles = np.radians((np.arange(self.bins) + 0.5) * resolution).astype(np.float32)
+        angles.flags.writeable = False
+        self.angles = angles
+
+        self._distances = np.zeros((2 * capacity, self.bins), dtype=np.float32)
+        self._timestamps = np.zeros(2 * capacity, dtype=np.float64)
+        self._points = np.zeros(2 * capacity, dtype=np.int32)
+        self.count = 0
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def push(self, scan, timestamp=None):
+        """Bin one scan of (quality, angle, distance) tuples or an (N, 3) array and store it."""
+        if timestamp is None:
+            timestamp = time.monotonic()
+        slot = self.count % self.capacity
+        row = self._distances[slot]
+
+        points = bin_scan(scan, row, self.resolution, self.reduction)
+
+        self._distances[slot + self.capacity] = row
+        self._timestamps[slot] = self._timestamps[slot + self.capacity] = timestamp
+        self._points[slot] = self._points[slot + self.capacity] = points
+        self.count += 1
+        return self._readonly(row)
+
+    def latest(self):
+        """Read-only view of the most recent binned scan, or None if nothing was pushed."""
+        if self.count == 0:
+            return None
+        return self._readonly(self._distances[(self.count - 1) % self.capacity])
+
+    def window(self, n=None):
+        """Read-only views (timestamps, distances, points) of the last n scans, oldest first."""
+        n = len(self) if n is None else min(n, len(self))
+        end = (self.count - 1) % self.capacity + 1
+        if end < n:
+            end += self.capacity
+        start = end - n
+        return (
+            self._readonly(self._timestamps[start:end]),
+            self._readonly(self._distances[start:end]),
+            self._readonly(self._points[start:end]),
+        )
+
+    def latest_timestamp(self):
+        if self.count == 0:
+            return None
+        return float(self._timestamps[(self.count - 1) % self.capacity])
+
+    def clear(self):
+        self._distances.fill(0.0)
+        self._timestamps.fill(0.0)
+        self._points.fill(0)
+        self.count = 0
+
+    @staticmethod
+    def _readonly(array):
+        view = array.view()
+        view.flags.writeable = False
+        return view
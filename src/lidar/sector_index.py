@@ -0,0 +1,109 @@
+import math
+
+# RPLidar angles grow clockwise seen from above, 0 deg pointing forward
+DEFAULT_SECTORS = {
+    "forward": (330.0, 30.0),
+    "right": (30.0, 150.0),
+    "rear": (150.0, 210.0),
+    "left": (210.0, 330.0),
+}
+
+# Stop distance grows with PWM duty: 300 mm at standstill, 500 mm at the old 0.5 duty
+BASE_STOP_DISTANCE = 300.0
+STOP_DISTANCE_PER_SPEED = 400.0
+
+
+class SectorIndex:
+    """Running minimum distance per angular sector, fed one measurement at a time.
+
+    Each sector keeps the minimum from its last complete sweep plus the minimum of the
+    sweep in progress, so a close return is visible as soon as it is measured instead
+    of after a full revolution. Sectors may overlap.
+    """
+
+    def __init__(self, sectors=None, heading_offset=0.0,
+                 base_distance=BASE_STOP_DISTANCE, distance_per_speed=STOP_DISTANCE_PER_SPEED):
+        self.sectors = dict(DEFAULT_SECTORS if sectors is None else sectors)
+        self.names = list(self.sectors)
+        self.heading_offset = heading_offset
+        self.base_distance = base_distance
+        self.distance_per_speed = distance_per_speed
+
+        self._ids = {name: i for i, name in enumerate(self.names)}
+        self._lookup = self._build_lookup()
+        n = len(self.names)
+        self._committed = [math.inf] * n
+        self._building = [math.inf] * n
+        self._in_sweep = [False] * n
+        self._last_degree = -1
+        self.revolutions = 0
+
+    def _build_lookup(self):
+        # One tuple of sector ids per whole degree, so update() never does range checks
+        lookup = []
+        for degree in range(360):
+            centre = degree + 0.5
+            ids = []
+            for i, name in enumerate(self.names):
+                start, end = self.sectors[name]
+                start %= 360.0
+                end %= 360.0
+                if start <= end:
+                    inside = start <= centre < end
+                else:
+                    inside = centre >= start or centre < end
+                if inside:
+                    ids.append(i)
+            lookup.append(tuple(ids))
+        return lookup
+
+    def update(self, angle, distance, quality=1, new_scan=False):
+        if new_scan:
+            self.revolutions += 1
+        # The sweep moves on even without a return, so an empty sector commits inf
+        degree = math.floor(angle - self.heading_offset) % 360
+        if degree != self._last_degree:
+            self._advance(degree)
+        if quality <= 0 or distance <= 0:
+            return
+        for i in self._lookup[degree]:
+            if distance < self._building[i]:
+                self._building[i] = distance
+
+    def _advance(self, degree):
+        current = self._lookup[degree]
+        for i in range(len(self.names)):
+            if i in current:
+                if not self._in_sweep[i]:
+                    self._in_sweep[i] = True
+                    self._building[i] = math.inf
+            elif self._in_sweep[i]:
+                # Sweep just left this sector: its building minimum is now complete
+                self._in_sweep[i] = False
+                self._committed[i] = self._building[i]
+                self._building[i] = math.inf
+        self._last_degree = degree
+
+    def update_measures(self, measures):
+        for new_scan, quality, angle, distance in measures:
+            self.update(angle, distance, quality, new_scan)
+
+    def nearest(self, sector="forward"):
+        i = self._ids[sector]
+        return min(self._committed[i], self._building[i])
+
+    def stop_distance(self, speed):
+        return self.base_distance + abs(speed) * self.distance_per_speed
+
+    def is_blocked(self, sector="forward", speed=0.5):
+        return self.nearest(sector) < self.stop_distance(speed)
+
+    def snapshot(self):
+        return {name: self.nearest(name) for name in self.names}
+
+    def reset(self):
+        n = len(self.names)
+        self._committed = [math.inf] * n
+        self._building = [math.inf] * n
+        self._in_sweep = [False] * n
+        self._last_degree = -1
@@ -0,0 +1,289 @@
+import threading
+import time
+from collections import namedtuple
+from src.computer_vision.tracker import KalmanBoxFilter
+from src.utils.instrumentation import CONTROL, Histogram, count, log, span
+
+CONTROL_RATE = 50.0  # Hz
+TARGET_TIMEOUT = 0.5  # seconds without a detection of the target before stopping
+LIDAR_TIMEOUT = 0.5  # seconds without a LiDAR scan before stopping
+SPIN_TIME = 0.0005  # opt-in busy-wait before each deadline; sleep() alone oversleeps, spinning costs CPU
+
+# Follow law duties; below MIN_SPEED the motors stall
+MIN_SPEED = 0.55
+MAX_SPEED = 1.0
+
+# Locked target as published by the vision loop: the tracker's Kalman state (cx, cy, w, h
+# and their velocities per second) at `timestamp`, last matched to a detection at `updated`
+TargetEstimate = namedtuple('TargetEstimate', ['track_id', 'updated', 'timestamp', 'state', 'frame_size'])
+
+
+def follow_speeds(box, frame_w, frame_h):
+    """Wheel duties steering towards `box` as (left, right, mode).
+
+    mode is "stop" when the person is close enough, "turn" when they are far
+    off-centre, otherwise "steer".
+    """
+    x, y, w, h = map(int, box)
+
+    frame_center = frame_w // 2
+    person_center_x = x + w // 2
+    error_x = (frame_center - person_center_x) / frame_center
+    distance_error = 1.0 - min(h / frame_h, 1.0)
+
+    if distance_error < 0.05:
+        return 0.0, 0.0, "stop"
+
+    if abs(error_x) > 0.7:
+        if error_x > 0:
+            return MIN_SPEED, MAX_SPEED, "turn"
+        return MAX_SPEED, MIN_SPEED, "turn"
+
+    # Smooth gain-based steering
+    steering_gain = 1.2
+    steering = min(max(error_x * steering_gain, -0.6), 0.6)
+    forward = min(max(distance_error * 0.6, 0.0), 1.0)
+
+    left_speed = min(max(forward + steering, MIN_SPEED), MAX_SPEED)
+    right_speed = min(max(forward - steering, MIN_SPEED), MAX_SPEED)
+    return left_speed, right_speed, "steer"
+
+
+def limit_for_obstacles(left, right, sectors, sector="forward"):
+    """Scale (left, right) so the faster wheel can still stop before the nearest return.
+
+    Returns (left, right, limited); both duties are zero when the clearance does not
+    allow even MIN_SPEED.
+    """
+    clearance = sectors.nearest(sector) - sectors.base_distance
+    max_speed = clearance / sectors.distance_per_speed
+    fastest = max(abs(left), abs(right))
+    if fastest <= max_speed:
+        return left, right, False
+    if max_speed < MIN_SPEED:
+        return 0.0, 0.0, True
+    scale = max_speed / fastest
+    return left * scale, right * scale, True
+
+
+def extrapolate(estimate, now):
+    """Target box at `now`, moved on from the published state at constant velocity."""
+    state = estimate.state
+    dt = max(now - estimate.timestamp, 0.0)
+    return KalmanBoxFilter.to_box(state[:4] + state[4:] * dt)
+
+
+class RateScheduler:
+    """Fixed-rate ticks on an absolute grid of monotonic deadlines.
+
+    Deadline k is always start + k * period, so sleep overshoot and slow iterations
+    never accumulate into drift. When an iteration overruns whole periods, the missed
+    deadlines are counted and skipped instead of being run back to back. With `spin`
+    (e.g. SPIN_TIME) the last stretch before each deadline is busy-waited for lower jitter.
+    """
+
+    def __init__(self, rate, clock=time.monotonic, sleep=time.sleep, spin=0.0):
+        self.period = 1.0 / rate
+        self.clock = clock
+        self.sleep = sleep
+        self.spin = spin
+        self.jitter = Histogram()
+        self.reset()
+
+    def reset(self):
+        self._start = None
+        self._tick = 0
+        self.ticks = 0
+        self.misses = 0
+        self.jitter.reset()
+
+    def wait(self):
+        """Block until the next deadline and return it."""
+        now = self.clock()
+        if self._start is None:
+            self._start = now
+        deadline = self._start + self._tick * self.period
+        behind = now - deadline
+        if behind >= self.period:
+            skipped = int(behind / self.period)
+            self.misses += skipped
+            count("control_deadline_misses", skipped)
+            self._tick += skipped
+            deadline = self._start + self._tick * self.period
+
+        remaining = deadline - now
+        if remaining > self.spin:
+            self.sleep(remaining - self.spin)
+        if self.spin:
+            while self.clock() < deadline:
+                pass
+        self.jitter.record(int((self.clock() - deadline) * 1e9))
+        self._tick += 1
+        self.ticks += 1
+        return deadline
+
+    def stats(self):
+        return {
+            "ticks": self.ticks,
+            "misses": self.misses,
+            "jitter_p50_ms": self.jitter.percentile(50) / 1e6,
+            "jitter_p99_ms": self.jitter.percentile(99) / 1e6,
+            "jitter_max_ms": self.jitter.max / 1e6,
+        }
+
+
+class ControlLoop:
+    """Combined follow + avoid control law run at a fixed rate from the newest inputs.
+
+    Each tick reads the latest TargetEstimate from `targets` (a Mailbox), moves the box
+    on to the current time, applies the follow law and caps the speed by the LiDAR
+    forward clearance from `lidar` (a LidarStream), then commands the driver. Either
+    input going stale stops the motors until it recovers, as does `inhibit()` (e.g. a
+    supervisor's emergency stop) returning true.
+    """
+
+    def __init__(self, driver, targets, rate=CONTROL_RATE, lidar=None, clock=time.monotonic,
+                 target_timeout=TARGET_TIMEOUT, lidar_timeout=LIDAR_TIMEOUT, scheduler=None,
+                 inhibit=None):
+        self.driver = driver
+        self.targets = targets
+        self.lidar = lidar
+        self.clock = clock
+        self.target_timeout = target_timeout
+        self.lidar_timeout = lidar_timeout
+        self.scheduler = RateScheduler(rate) if scheduler is None else scheduler
+        self.inhibit = inhibit
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        self.command = (0.0, 0.0)
+        self.reason = None
+        self.safe_stops = {}
+        self.limited = 0
+        self.target_age = None
+
+    def start(self):
+        if self._thread is None:
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self.run, name="ControlLoop", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=1.0):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.driver.stop()
+
+    def run(self, duration=None):
+        self.scheduler.reset()
+        end = None if duration is None else time.monotonic() + duration
+        while not self._stop_event.is_set() and (end is None or time.monotonic() < end):
+            self.scheduler.wait()
+            try:
+                with span(CONTROL):
+                    self.step()
+            except Exception as e:
+                log("ERROR", f"ControlLoop: {e}", key="ControlLoop")
+                self._safe_stop("error")
+
+    def _safe_stop(self, reason):
+        if self.reason != reason:
+            log("STOP", f"Safe stop: {reason}", key=f"safe stop {reason}")
+            self.safe_stops[reason] = self.safe_stops.get(reason, 0) + 1
+        self._stop(reason)
+
+    def _stop(self, reason):
+        self.reason = reason
+        self.command = (0.0, 0.0)
+        self.driver.stop()
+
+    def step(self, now=None):
+        now = self.clock() if now is None else now
+        if self.inhibit is not None and self.inhibit():
+            return self._safe_stop("inhibited")
+        if self.lidar is not None and self.lidar.age() > self.lidar_timeout:
+            return self._safe_stop("lidar stale")
+
+        estimate = self.targets.get().value
+        if estimate is None:
+            self.target_age = None
+            return self._stop("no target")
+        self.target_age = now - estimate.updated
+        if self.target_age > self.target_timeout:
+            return self._safe_stop("target stale")
+
+        left, right, mode = follow_speeds(extrapolate(estimate, now), *estimate.frame_size)
+        if mode == "stop":
+            return self._stop("too close")
+        if self.lidar is not None:
+            left, right, limited = limit_for_obstacles(left, right, self.lidar.sectors)
+            if limited:
+                self.limited += 1
+                if left == 0.0 and right == 0.0:
+                    return self._stop("obstacle")
+        self.reason = mode
+        self.command = (left, right)
+        self.driver.command(left, right)
+
+    def stats(self):
+        stats = self.scheduler.stats()
+        stats.update({
+            "reason": self.reason,
+            "safe_stops": dict(self.safe_stops),
+            "limited": self.limited,
+            "target_age": self.target_age,
+            "lidar_age": None if self.lidar is None else self.lidar.age(),
+        })
+        return stats
+
+
+def simulate(rate=CONTROL_RATE, duration=5.0, camera_rate=30.0, dropout=(2.0, 2.8), seed=0):
+    """Run the loop against a mock motor backend, the simulated LiDAR and a synthetic
+    target published at `camera_rate` with jitter; the target disappears during
+    `dropout` (seconds from start) to exercise the stale-input stop."""
+    import random
+    import numpy as np
+    from src.lidar.fake_lidar import FakeLidar
+    from src.lidar.lidar_stream import LidarStream
+    from src.motor_control.motor_driver import MockBackend, MotorDriver
+    from src.utils.mailbox import Mailbox
+
+    rng = random.Random(seed)
+    backend = MockBackend()
+    driver = MotorDriver(backend)
+    targets = Mailbox()
+    lidar = LidarStream(device_factory=lambda port: FakeLidar(obstacles=((0.0, 650.0, 20.0),))).start()
+    loop = ControlLoop(driver, targets, rate, lidar=lidar).start()
+
+    start = time.monotonic()
+    while time.monotonic() - start < duration:
+        t = time.monotonic()
+        elapsed = t - start
+        if not dropout[0] <= elapsed < dropout[1]:
+            cx = 320 + 200 * np.sin(elapsed)
+            state = np.array([cx, 240, 120, 300, 200 * np.cos(elapsed), 0, 0, 0], dtype=np.float64)
+            targets.put(TargetEstimate(1, t, t, state, (640, 480)))
+        time.sleep(max(1.0 / camera_rate + rng.uniform(-0.01, 0.02), 0.0))
+
+    loop.stop()
+    lidar.stop()
+    driver.close()
+    stats = loop.stats()
+    print(f"{rate:.0f} Hz for {duration:.1f} s: {stats['ticks']} ticks, {stats['misses']} deadline misses, "
+          f"jitter p50 {stats['jitter_p50_ms']:.3f} ms p99 {stats['jitter_p99_ms']:.3f} ms "
+          f"max {stats['jitter_max_ms']:.3f} ms")
+    print(f"safe stops {stats['safe_stops']}, speed-limited ticks {stats['limited']}, "
+          f"GPIO writes {len(backend.writes)}")
+    return stats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Fixed-rate control loop against simulated inputs")
+    parser.add_argument("--rate", type=float, default=CONTROL_RATE)
+    parser.add_argument("--duration", type=float, default=5.0)
+    args = parser.parse_args()
+    simulate(args.rate, args.duration)
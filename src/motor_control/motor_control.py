@@ -1,44 +1,79 @@
 #!/usr/bin/env python3
-from gpiozero import Motor, PWMOutputDevice
-from time import sleep
-from src.lidar.lidar_control import LidarControl  # Use absolute import
+import argparse
+from src.lidar.lidar_stream import LidarStream  # Use absolute import
+from src.motor_control.control_loop import RateScheduler
+from src.motor_control.motor_driver import MotorDriver
+from src.utils import instrumentation
+from src.utils.instrumentation import log
 
-# Define motors (direction control)
-motor_a = Motor(forward=17, backward=27)  # Motor A: IN1 and IN2
-motor_b = Motor(forward=22, backward=23)  # Motor B: IN3 and IN4
+# Motor A (pins 17/27, ENA 24) and Motor B (pins 22/23, ENB 25) behind one driver,
+# created on first use so importing this module never touches GPIO
+_driver = None
 
-# Define enable pins using GPIO 24 and GPIO 25
-enable_a = PWMOutputDevice(24)  # ENA for Motor A
-enable_b = PWMOutputDevice(25)  # ENB for Motor B
+# Drive at half speed
+DRIVE_SPEED = 0.5
 
-# Set enable pins to half speed
-enable_a.value = 0.5  # 50% duty cycle for Motor A
-enable_b.value = 0.5  # 50% duty cycle for Motor B
+def get_driver():
+    global _driver
+    if _driver is None:
+        _driver = MotorDriver()
+    return _driver
 
-def move_forward():
-    motor_a.forward()
-    motor_b.forward()
+def move_forward(speed=DRIVE_SPEED):
+    get_driver().command(speed, speed)
 
 def stop_motors():
-    motor_a.stop()
-    motor_b.stop()
+    get_driver().stop()
 
-def avoid_obstacle():
-    lidar_control = LidarControl(port='/dev/ttyUSB0')
+def avoid_obstacle(speed=DRIVE_SPEED, stream=None, poll_interval=0.01, stale_after=0.5,
+                   port='/dev/ttyUSB0', recorder=None):
+    # The stream owns the LiDAR on its own thread; this loop only reads its sector index
+    owns_stream = stream is None
+    if owns_stream:
+        stream = LidarStream(port=port, recorder=recorder).start()
+    moving = False
+    # Fixed-rate polling on monotonic deadlines; sleep() alone drifts with the loop's own cost
+    scheduler = RateScheduler(1.0 / poll_interval)
     try:
-        for scan in lidar_control.lidar.iter_scans():
-            distances = [distance for (_, _, distance) in scan]
-            if any(distance < 500 for distance in distances):  # Obstacle within 500 mm
-                print("Obstacle detected! Stopping motors.")
+        while True:
+            scheduler.wait()
+            if not stream.running:
+                # Only a stop() or the end of a replayed log ends the stream
+                log("STOP", "LiDAR stream ended. Stopping motors.", key="ended")
+                break
+            if stream.age() > stale_after:
+                if moving:
+                    log("STOP", "LiDAR data is stale! Stopping motors.", key="stale")
+                    stop_motors()
+                    moving = False
+            elif stream.sectors.is_blocked("forward", speed):
+                log("STOP", "Obstacle detected! Stopping motors.", key="obstacle",
+                    distance_mm=stream.sectors.nearest('forward'))
                 stop_motors()
                 break
             else:
-                move_forward()
-                sleep(0.1)
+                # Re-sent every poll to feed the driver watchdog; unchanged commands cost no GPIO writes
+                move_forward(speed)
+                moving = True
     except KeyboardInterrupt:
         print("Stopping scan...")
     finally:
-        lidar_control.stop_scan()
+        stop_motors()
+        if owns_stream:
+            stream.stop()
+            log("INFO", "LiDAR stream stats", key="stream stats", **stream.stats())
+        if recorder is not None:
+            recorder.close()
+        instrumentation.flush()
 
 if __name__ == "__main__":
-    avoid_obstacle()
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", default='/dev/ttyUSB0', help="Serial port, or a log file with AFROBOTICS_LIDAR_BACKEND=replay")
+    parser.add_argument("--record", help="Record LiDAR scans to this log file")
+    args = parser.parse_args()
+
+    recorder = None
+    if args.record:
+        from src.utils.recording import Recorder
+        recorder = Recorder(args.record)
+    avoid_obstacle(port=args.port, recorder=recorder)
\ No newline at end of file
@@ -0,0 +1,207 @@
+import threading
+import time
+from src.utils import backends
+from src.utils.instrumentation import GPIO_WRITE, log, span
+
+# (forward pin, backward pin, enable PWM pin) for each side of the L298N
+LEFT_PINS = (17, 27, 24)   # Motor A: IN1, IN2, ENA
+RIGHT_PINS = (22, 23, 25)  # Motor B: IN3, IN4, ENB
+
+
+class GpioBackend:
+    """Drives the two L298N channels through gpiozero."""
+
+    def __init__(self, left_pins=LEFT_PINS, right_pins=RIGHT_PINS, frequency=1000):
+        from gpiozero import Motor, PWMOutputDevice
+
+        self.motors = (
+            Motor(forward=left_pins[0], backward=left_pins[1]),
+            Motor(forward=right_pins[0], backward=right_pins[1]),
+        )
+        self.enables = (
+            PWMOutputDevice(left_pins[2], frequency=frequency),
+            PWMOutputDevice(right_pins[2], frequency=frequency),
+        )
+        self._directions = [None, None]
+
+    def write(self, left, right):
+        for i, speed in enumerate((left, right)):
+            direction = (speed > 0) - (speed < 0)
+            self.enables[i].value = abs(speed)
+            if direction != self._directions[i]:
+                if direction > 0:
+                    self.motors[i].forward()
+                elif direction < 0:
+                    self.motors[i].backward()
+                else:
+                    self.motors[i].stop()
+                self._directions[i] = direction
+
+    def close(self):
+        for device in self.motors + self.enables:
+            device.close()
+
+
+class MockBackend:
+    """Records every write instead of touching GPIO, for tests and benchmarks off the Pi."""
+
+    def __init__(self, write_delay=0.0):
+        self.write_delay = write_delay
+        self.writes = []
+        self.closed = False
+
+    def write(self, left, right):
+        if self.write_delay:
+            time.sleep(self.write_delay)
+        self.writes.append((time.monotonic(), left, right))
+
+    def close(self):
+        self.closed = True
+
+    @property
+    def last(self):
+        return self.writes[-1][1:] if self.writes else None
+
+
+class MotorDriver:
+    """Single owner of the drive motors.
+
+    Callers set a target with `command(left, right)` (signed duty, -1..1) and return
+    immediately. A writer thread slews the outputs towards the target at `max_accel`
+    duty per second and only touches the backend when the output actually changes.
+    If no command arrives within `watchdog_timeout` seconds the target drops to zero.
+    With `threaded=False` each command is applied synchronously instead.
+    """
+
+    def __init__(self, backend=None, max_accel=4.0, deadband=0.005, watchdog_timeout=0.5,
+                 rate=100.0, threaded=True):
+        self.backend = backends.create("motors") if backend is None else backend
+        self.max_accel = max_accel
+        self.deadband = deadband
+        self.watchdog_timeout = watchdog_timeout
+        self.period = 1.0 / rate
+        self.threaded = threaded
+
+        self.target = (0.0, 0.0)
+        self.output = (0.0, 0.0)
+        self.last_command = time.monotonic()
+        self._last_step = self.last_command
+        self._written = None
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        self.commands = 0
+        self.writes = 0
+        self.skipped = 0
+        self.watchdog_trips = 0
+        self._write(0.0, 0.0)
+        if threaded:
+            self.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def start(self):
+        if self._thread is None:
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="MotorDriver", daemon=True)
+            self._thread.start()
+
+    def command(self, left, right):
+        """Set a new target. Returns True if it differs from the previous one."""
+        left = min(max(float(left), -1.0), 1.0)
+        right = min(max(float(right), -1.0), 1.0)
+        with self._lock:
+            self.last_command = time.monotonic()
+            self.commands += 1
+            changed = (abs(left - self.target[0]) > self.deadband or
+                       abs(right - self.target[1]) > self.deadband)
+            if changed:
+                self.target = (left, right)
+        if changed:
+            self._wake.set()
+        if not self.threaded:
+            self.step()
+        return changed
+
+    def stop(self, immediate=True):
+        """Target zero; `immediate` bypasses the slew limit, as an emergency stop should."""
+        changed = self.command(0.0, 0.0)
+        if immediate:
+            with self._write_lock:
+                with self._lock:
+                    self.output = (0.0, 0.0)
+                self._write(0.0, 0.0)
+        return changed
+
+    def step(self, now=None):
+        now = time.monotonic() if now is None else now
+        # _write_lock keeps a slewed write from landing after an immediate stop;
+        # command() only takes _lock, so callers never wait on the GPIO write
+        with self._write_lock:
+            with self._lock:
+                # Steps may be timed by different callers; never slew with a negative dt
+                dt = max(now - self._last_step, 0.0)
+                self._last_step = max(now, self._last_step)
+                if now - self.last_command > self.watchdog_timeout and self.target != (0.0, 0.0):
+                    self.target = (0.0, 0.0)
+                    self.watchdog_trips += 1
+                    log("WARN", "Motor watchdog: no command received, stopping.", key="watchdog")
+                max_delta = self.max_accel * dt
+                self.output = tuple(
+                    current + min(max(goal - current, -max_delta), max_delta)
+                    for current, goal in zip(self.output, self.target)
+                )
+                left, right = self.output
+            self._write(left, right)
+
+    def _write(self, left, right):
+        if self._written is not None and (abs(left - self._written[0]) <= self.deadband and
+                                          abs(right - self._written[1]) <= self.deadband):
+            self.skipped += 1
+            return
+        # Zero is always written exactly, even from inside the deadband
+        if abs(left) <= self.deadband:
+            left = 0.0
+        if abs(right) <= self.deadband:
+            right = 0.0
+        with span(GPIO_WRITE):
+            self.backend.write(left, right)
+        self._written = (left, right)
+        self.writes += 1
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            # Sleep until the next tick, or wake early when a new target arrives
+            self._wake.wait(self.period)
+            self._wake.clear()
+            try:
+                self.step()
+            except Exception as e:
+                log("ERROR", f"MotorDriver: {e}", key="MotorDriver")
+
+    def close(self):
+        self._stop_event.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(1.0)
+            self._thread = None
+        try:
+            self.stop()
+        finally:
+            self.backend.close()
+
+    def stats(self):
+        return {
+            "commands": self.commands,
+            "writes": self.writes,
+            "skipped": self.skipped,
+            "watchdog_trips": self.watchdog_trips,
+            "output": self.output,
+        }
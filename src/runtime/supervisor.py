@@ -0,0 +1,260 @@
+import argparse
+import collections
+import multiprocessing
+import time
+import numpy as np
+from src.computer_vision.detections import DETECTION_DTYPE
+from src.runtime import workers
+from src.runtime.workers import DETECTIONS, FRAMES, MAX_DETECTIONS, SCANS, WorkerContext
+from src.utils import backends, instrumentation
+from src.utils.instrumentation import log
+from src.utils.shm_ring import SharedRing
+
+HEARTBEAT_TIMEOUT = 2.0  # seconds without a heartbeat before a worker counts as hung
+START_TIMEOUT = 20.0  # first heartbeat allowance; imports and camera start-up are slow
+MAX_RESTARTS = 5  # per worker within RESTART_WINDOW before the supervisor gives up
+RESTART_WINDOW = 60.0
+RESTART_BACKOFF = 0.5  # doubled after every restart in the window, capped at MAX_BACKOFF
+MAX_BACKOFF = 5.0
+POLL_INTERVAL = 0.05
+RING_SLOTS = 4
+SCAN_BINS = 360
+
+# name, process entry point, and whether the worker drives the motors
+WorkerSpec = collections.namedtuple('WorkerSpec', ['name', 'target', 'owns_motors'])
+
+WORKERS = {
+    "perception": WorkerSpec("perception", workers.perception_worker, False),
+    "lidar": WorkerSpec("lidar", workers.lidar_worker, False),
+    "control": WorkerSpec("control", workers.control_worker, True),
+    "ui": WorkerSpec("ui", workers.ui_worker, False),
+}
+
+
+def stop_motors(backend=None):
+    """Write zero duty from this process; used once the motor-owning worker has died."""
+    try:
+        motors = backends.create("motors", backend)
+        motors.write(0.0, 0.0)
+        motors.close()
+        log("STOP", "Supervisor motor stop", key="supervisor stop")
+    except Exception as e:
+        log("ERROR", f"Supervisor motor stop failed: {e}", key="supervisor stop")
+
+
+class _Worker:
+    def __init__(self, index, spec):
+        self.index = index
+        self.spec = spec
+        self.process = None
+        self.started = 0.0
+        self.next_start = 0.0
+        self.incarnation = 0
+        self.restarts = collections.deque()
+        self.failures = 0
+
+
+class Supervisor:
+    """Runs each worker in its own process and keeps them running.
+
+    Workers exchange frames, detections and scans through SharedRings created here, and
+    report liveness through a shared heartbeat array. A worker that exits or stops
+    beating is restarted with exponential backoff; while any worker is down the shared
+    emergency stop holds the motors at zero, and if the motor-owning worker itself dies
+    the supervisor zeroes the motors directly. More than `max_restarts` failures of one
+    worker within `restart_window` seconds shuts everything down.
+    """
+
+    def __init__(self, specs, rings, config, motor_stop=None, heartbeat_timeout=HEARTBEAT_TIMEOUT,
+                 start_timeout=START_TIMEOUT, max_restarts=MAX_RESTARTS, restart_window=RESTART_WINDOW,
+                 backoff=RESTART_BACKOFF, max_backoff=MAX_BACKOFF, poll_interval=POLL_INTERVAL):
+        self.specs = list(specs)
+        self.ring_layout = dict(rings)
+        self.config = config
+        self.motor_stop = (lambda: stop_motors(config.get("motor_backend"))) if motor_stop is None else motor_stop
+        self.heartbeat_timeout = heartbeat_timeout
+        self.start_timeout = start_timeout
+        self.max_restarts = max_restarts
+        self.restart_window = restart_window
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.poll_interval = poll_interval
+
+        # Spawned, not forked: the supervisor has threads (log sink) that must not be copied
+        self.mp = multiprocessing.get_context("spawn")
+        self.rings = {}
+        self.workers = [_Worker(i, spec) for i, spec in enumerate(self.specs)]
+        self.stop_event = None
+        self.estop = None
+        self.heartbeats = None
+        self.healthy = False
+        self.failed = None
+
+    def start(self):
+        for name, (shape, dtype) in self.ring_layout.items():
+            self.rings[name] = SharedRing.create(None, shape, dtype, RING_SLOTS)
+        self.stop_event = self.mp.Event()
+        self.estop = self.mp.Event()
+        self.estop.set()
+        self.heartbeats = self.mp.Array('d', len(self.workers), lock=False)
+        for worker in self.workers:
+            self._spawn(worker)
+        return self
+
+    def _spawn(self, worker):
+        self.heartbeats[worker.index] = 0.0
+        specs = {name: ring.spec for name, ring in self.rings.items()}
+        ctx = WorkerContext(worker.spec.name, worker.index, specs, self.stop_event, self.estop,
+                            self.heartbeats, self.config, worker.incarnation)
+        worker.process = self.mp.Process(target=workers.run_worker, args=(worker.spec.target, ctx),
+                                         name=worker.spec.name, daemon=True)
+        worker.process.start()
+        worker.started = time.monotonic()
+        worker.incarnation += 1
+        log("INFO", f"Started {worker.spec.name}", key=f"start {worker.spec.name}",
+            pid=worker.process.pid, incarnation=worker.incarnation)
+
+    def _fail(self, worker, reason, now):
+        log("ERROR", f"Worker {worker.spec.name} {reason}", key=f"fail {worker.spec.name}")
+        self.estop.set()
+        process = worker.process
+        if process.is_alive():
+            process.terminate()
+            process.join(1.0)
+            if process.is_alive():
+                process.kill()
+                process.join(1.0)
+        worker.process = None
+        worker.failures += 1
+        if worker.spec.owns_motors:
+            self.motor_stop()
+
+        while worker.restarts and now - worker.restarts[0] > self.restart_window:
+            worker.restarts.popleft()
+        if len(worker.restarts) >= self.max_restarts:
+            self.failed = f"{worker.spec.name} failed {len(worker.restarts) + 1} times in {self.restart_window:.0f} s"
+            return
+        worker.next_start = now + min(self.backoff * 2 ** len(worker.restarts), self.max_backoff)
+        worker.restarts.append(now)
+
+    def poll(self, now=None):
+        """Check every worker once; returns True while all of them are up and beating."""
+        now = time.monotonic() if now is None else now
+        healthy = True
+        for worker in self.workers:
+            process = worker.process
+            if process is None:
+                healthy = False
+                if now >= worker.next_start and self.failed is None:
+                    self._spawn(worker)
+                continue
+            beat = self.heartbeats[worker.index]
+            if not process.is_alive():
+                self._fail(worker, f"exited with code {process.exitcode}", now)
+            elif beat == 0.0:
+                if now - worker.started > self.start_timeout:
+                    self._fail(worker, "did not start", now)
+            elif now - beat > self.heartbeat_timeout:
+                self._fail(worker, f"hung ({now - beat:.1f} s since heartbeat)", now)
+            else:
+                continue
+            healthy = False
+
+        if healthy and not self.healthy:
+            log("INFO", "All workers up, releasing motors", key="healthy")
+            self.estop.clear()
+        elif not healthy and self.healthy:
+            log("STOP", "Worker down, holding motors stopped", key="estop")
+            self.estop.set()
+        self.healthy = healthy
+        return healthy
+
+    def run(self, duration=None):
+        self.start()
+        end = None if duration is None else time.monotonic() + duration
+        try:
+            while self.failed is None and (end is None or time.monotonic() < end):
+                self.poll()
+                time.sleep(self.poll_interval)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.shutdown()
+        if self.failed is not None:
+            log("ERROR", f"Giving up: {self.failed}", key="give up")
+        return self.failed is None
+
+    def shutdown(self, timeout=3.0):
+        if self.stop_event is None:
+            return
+        self.estop.set()
+        self.stop_event.set()
+        deadline = time.monotonic() + timeout
+        for worker in self.workers:
+            if worker.process is not None:
+                worker.process.join(max(deadline - time.monotonic(), 0.1))
+                if worker.process.is_alive():
+                    worker.process.kill()
+                    worker.process.join(1.0)
+        self.motor_stop()
+        for ring in self.rings.values():
+            ring.close()
+        self.rings = {}
+        instrumentation.flush()
+
+    def stats(self):
+        return {w.spec.name: {"incarnation": w.incarnation, "failures": w.failures} for w in self.workers}
+
+
+def ring_layout(config, names):
+    width, height = config["frame_size"]
+    layout = {DETECTIONS: ((MAX_DETECTIONS,), DETECTION_DTYPE)}
+    if "lidar" in names:
+        layout[SCANS] = ((SCAN_BINS,), np.float32)
+    if config.get("frames"):
+        layout[FRAMES] = ((height, width, 4), np.uint8)
+    return layout
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run perception, LiDAR, control and UI as supervised processes")
+    parser.add_argument("--simulated", action="store_true", help="Fake camera, LiDAR and motors")
+    parser.add_argument("--workers", default="perception,lidar,control,ui", help="Comma-separated workers to run")
+    parser.add_argument("--duration", type=float, default=None)
+    parser.add_argument("--model", type=str, default="/usr/share/imx500-models/imx500_network_ssd_mobilenetv2_fpnlite_320x320_pp.rpk")
+    parser.add_argument("--targets", type=str, default="person", help="Comma-separated labels to follow")
+    parser.add_argument("--threshold", type=float, default=0.5)
+    parser.add_argument("--frame-size", default="640x480", help="Camera main stream size, WIDTHxHEIGHT")
+    parser.add_argument("--camera-rate", type=float, default=30.0, help="Simulated camera frame rate")
+    parser.add_argument("--frames", action="store_true", help="Share camera frames with the UI worker")
+    parser.add_argument("--control-rate", type=float, default=None, metavar="HZ")
+    parser.add_argument("--lidar-port", default="/dev/ttyUSB0")
+    parser.add_argument("--ui-dir", default=None, help="Write UI frames and LiDAR views to this directory")
+    parser.add_argument("--crash", action="append", default=[], metavar="WORKER:SECONDS",
+                        help="Inject a fault into a worker's first run, to exercise restarts")
+    parser.add_argument("--stats", type=float, default=None, metavar="SECONDS",
+                        help="Log supervisor timing summaries at this interval")
+    args = parser.parse_args()
+
+    instrumentation.configure(summary_interval=args.stats)
+    names = [name.strip() for name in args.workers.split(",") if name.strip()]
+    config = {
+        "simulated": args.simulated,
+        "model": args.model,
+        "targets": tuple(args.targets.split(",")),
+        "threshold": args.threshold,
+        "frame_size": tuple(int(v) for v in args.frame_size.lower().split("x")),
+        "camera_rate": args.camera_rate,
+        "frames": args.frames,
+        "control_rate": args.control_rate,
+        "lidar_port": args.lidar_port,
+        "lidar_backend": backends.SIMULATED if args.simulated else None,
+        "motor_backend": backends.SIMULATED if args.simulated else None,
+        "ui_dir": args.ui_dir,
+        "crash_after": {name: float(seconds) for name, seconds in (c.split(":") for c in args.crash)},
+    }
+    supervisor = Supervisor([WORKERS[name] for name in names], ring_layout(config, names), config)
+    ok = supervisor.run(args.duration)
+    log("INFO", "Supervisor stats", key="supervisor stats", **supervisor.stats())
+    instrumentation.flush()
+    raise SystemExit(0 if ok else 1)
@@ -0,0 +1,269 @@
+import signal
+import threading
+import time
+import numpy as np
+from src.utils import instrumentation
+from src.utils.instrumentation import log
+from src.utils.shm_ring import SharedRing
+
+# Ring names shared by the supervisor and the workers
+FRAMES = "frames"
+DETECTIONS = "detections"
+SCANS = "scans"
+
+MAX_DETECTIONS = 32  # rows per frame in the detection ring
+DETECTION_POLL = 0.002  # seconds between checks of the detection ring
+UI_RATE = 5.0  # Hz
+REPORT_INTERVAL = 5.0
+
+
+class WorkerContext:
+    """What a worker process gets from the supervisor; picklable for spawned processes.
+
+    `beat()` stamps this worker's heartbeat slot and is also where faults injected with
+    `config["crash_after"]` fire, on the first incarnation only.
+    """
+
+    def __init__(self, name, index, rings, stop, estop, heartbeats, config, incarnation=0):
+        self.name = name
+        self.index = index
+        self.rings = rings
+        self.stop = stop
+        self.estop = estop
+        self.heartbeats = heartbeats
+        self.config = config
+        self.incarnation = incarnation
+        self._crash_at = None
+
+    @property
+    def stopping(self):
+        return self.stop.is_set()
+
+    def attach(self, ring):
+        return SharedRing(self.rings[ring])
+
+    def beat(self):
+        now = time.monotonic()
+        if self._crash_at is None:
+            delay = self.config.get("crash_after", {}).get(self.name)
+            self._crash_at = now + delay if delay is not None and self.incarnation == 0 else float('inf')
+        if now >= self._crash_at:
+            raise RuntimeError(f"Injected fault in {self.name}")
+        self.heartbeats[self.index] = now
+
+
+def run_worker(target, ctx):
+    """Process entry point: run `target(ctx)` and turn any exception into exit code 1."""
+    # Ctrl-C goes to the whole process group; only the supervisor decides what stops
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        target(ctx)
+    except Exception as e:
+        log("ERROR", f"{ctx.name} worker: {e!r}", key=f"worker {ctx.name}")
+        instrumentation.flush()
+        raise SystemExit(1)
+    instrumentation.flush()
+
+
+def perception_worker(ctx):
+    """Camera + IMX500 detections (or FakeCamera) into the detection and frame rings."""
+    from src.computer_vision.computer_vision import RobotFollower
+    from src.motor_control.motor_driver import MotorDriver
+    from src.utils import backends
+
+    config = ctx.config
+    camera = None
+    if config.get("simulated"):
+        camera = backends.create("camera", backends.SIMULATED, size=config["frame_size"],
+                                 rate=config.get("camera_rate", 30.0), frames=config.get("frames", False),
+                                 seed=ctx.incarnation)
+    # Motors belong to the control worker; this follower only detects
+    follower = RobotFollower(config.get("model"), headless=True, camera=camera,
+                             targets=config.get("targets", ("person",)),
+                             threshold=config.get("threshold", 0.5),
+                             driver=MotorDriver(backends.create("motors", backends.NULL), threaded=False))
+    detections = ctx.attach(DETECTIONS)
+    frames = ctx.attach(FRAMES) if FRAMES in ctx.rings else None
+    try:
+        while not ctx.stopping:
+            request = follower.picam2.capture_request()
+            try:
+                timestamp = time.monotonic()
+                detections.write(follower.get_detections(request), timestamp)
+                if frames is not None:
+                    frame = request.make_array("main")
+                    if frame is not None:
+                        frames.write(frame, timestamp)
+            finally:
+                request.release()
+            ctx.beat()
+    finally:
+        follower.picam2.stop()
+        detections.close()
+        if frames is not None:
+            frames.close()
+
+
+def lidar_worker(ctx):
+    """LidarStream scans, binned, into the scan ring."""
+    from src.lidar.lidar_stream import LidarStream
+    from src.utils import backends
+
+    config = ctx.config
+    scans = ctx.attach(SCANS)
+    stream = LidarStream(port=config.get("lidar_port", "/dev/ttyUSB0"),
+                         device_factory=backends.resolve("lidar", config.get("lidar_backend")),
+                         resolution=360.0 / scans.shape[0]).start()
+    out = np.empty(scans.shape, dtype=np.float32)
+    try:
+        while not ctx.stopping:
+            scan = stream.wait_for_scan(timeout=0.2, out=out)
+            if scan is not None:
+                scans.write(scan.distances, scan.timestamp)
+            ctx.beat()
+    finally:
+        stream.stop()
+        scans.close()
+
+
+class RingLidar:
+    """LidarStream stand-in for ControlLoop, fed from binned scans in a SharedRing.
+
+    Every age() call picks up a newer scan if there is one and replays all its bins,
+    empty ones included, into a SectorIndex, so `sectors` answers the same questions as
+    the stream's own index and sectors without returns clear.
+    """
+
+    def __init__(self, ring, sectors=None):
+        from src.lidar.sector_index import SectorIndex
+
+        self.ring = ring
+        self.sectors = SectorIndex() if sectors is None else sectors
+        bins = ring.shape[0]
+        self.angles = ((np.arange(bins) + 0.5) * 360.0 / bins).tolist()
+        self.seq = 0
+        self._out = np.empty(ring.shape, dtype=ring.dtype)
+        self._lock = threading.Lock()
+
+    def age(self):
+        with self._lock:
+            message = self.ring.read(self.seq, self._out)
+            if message is not None:
+                self.seq = message.seq
+                update = self.sectors.update
+                for i, (angle, distance) in enumerate(zip(self.angles, message.value.tolist())):
+                    update(angle, distance, new_scan=i == 0)
+        return self.ring.age()
+
+
+def _track_detections(ctx, ring, targets, frame_size):
+    # Tracking runs next to the control loop so the Kalman state never crosses processes
+    from src.computer_vision.tracker import Tracker
+    from src.motor_control.control_loop import TargetEstimate
+
+    tracker = Tracker()
+    out = np.empty(ring.shape, dtype=ring.dtype)
+    seq = 0
+    while not ctx.stopping:
+        message = ring.read(seq, out)
+        if message is None:
+            time.sleep(DETECTION_POLL)
+            continue
+        seq = message.seq
+        detections = message.value
+        boxes = detections["box"]
+        tracker.update(detections[(boxes[:, 3] >= 40) & (boxes[:, 2] >= 20)], message.timestamp)
+        track = tracker.locked_track()
+        if track is None:
+            targets.put(None)
+        else:
+            kalman = track.filter
+            targets.put(TargetEstimate(track.track_id, track.last_update, kalman.timestamp,
+                                       kalman.x.copy(), frame_size))
+
+
+def control_worker(ctx):
+    """Tracker plus the fixed-rate follow + avoid loop; the only process driving motors.
+
+    The supervisor's emergency stop holds the motors at zero while any worker is down.
+    """
+    from src.motor_control.control_loop import CONTROL_RATE, ControlLoop
+    from src.motor_control.motor_driver import MotorDriver
+    from src.utils import backends
+    from src.utils.mailbox import Mailbox
+
+    config = ctx.config
+    detections = ctx.attach(DETECTIONS)
+    scans = ctx.attach(SCANS) if SCANS in ctx.rings else None
+    driver = MotorDriver(backends.create("motors", config.get("motor_backend")))
+    targets = Mailbox()
+    loop = ControlLoop(driver, targets, config.get("control_rate") or CONTROL_RATE,
+                       lidar=None if scans is None else RingLidar(scans), inhibit=ctx.estop.is_set)
+    tracker = threading.Thread(target=_track_detections, name="Tracker", daemon=True,
+                               args=(ctx, detections, targets, tuple(config["frame_size"])))
+    tracker.start()
+    loop.start()
+    try:
+        while not ctx.stopping:
+            if not tracker.is_alive():
+                raise RuntimeError("Tracker thread died")
+            ctx.beat()
+            time.sleep(0.05)
+    finally:
+        loop.stop()
+        log("INFO", "Control loop stats", key="control stats", writes=driver.writes,
+            **{k: v for k, v in loop.stats().items() if k in ("ticks", "misses", "limited", "safe_stops")})
+        driver.close()
+        tracker.join(1.0)
+        detections.close()
+        if scans is not None:
+            scans.close()
+
+
+def ui_worker(ctx):
+    """Reads the newest frame and scan at UI_RATE; with `ui_dir` writes them as images."""
+    from src.motor_control.control_loop import RateScheduler
+
+    config = ctx.config
+    out_dir = config.get("ui_dir")
+    frames = ctx.attach(FRAMES) if FRAMES in ctx.rings else None
+    scans = ctx.attach(SCANS) if SCANS in ctx.rings else None
+    frame = None if frames is None else np.empty(frames.shape, dtype=frames.dtype)
+    scan = None if scans is None else np.empty(scans.shape, dtype=scans.dtype)
+    renderer = None
+    if out_dir is not None and scans is not None:
+        from src.lidar.lidar_view import FrameRenderer
+        bins = scans.shape[0]
+        renderer = FrameRenderer(np.radians((np.arange(bins) + 0.5) * 360.0 / bins), out_dir)
+
+    scheduler = RateScheduler(config.get("ui_rate", UI_RATE))
+    frame_seq = scan_seq = 0
+    shown = {"frames": 0, "scans": 0}
+    next_report = time.monotonic() + REPORT_INTERVAL
+    try:
+        while not ctx.stopping:
+            scheduler.wait()
+            if frames is not None:
+                message = frames.read(frame_seq, frame)
+                if message is not None:
+                    frame_seq = message.seq
+                    shown["frames"] += 1
+                    if out_dir is not None:
+                        import cv2
+                        cv2.imwrite(f"{out_dir}/frame_{shown['frames']:06d}.png", frame[:, :, :3])
+            if scans is not None:
+                message = scans.read(scan_seq, scan)
+                if message is not None:
+                    scan_seq = message.seq
+                    shown["scans"] += 1
+                    if renderer is not None:
+                        renderer.draw(scan)
+            now = time.monotonic()
+            if now >= next_report:
+                log("UI", key="ui", frame_seq=frame_seq, scan_seq=scan_seq, **shown)
+                next_report = now + REPORT_INTERVAL
+            ctx.beat()
+    finally:
+        for ring in (frames, scans):
+            if ring is not None:
+                ring.close()
@@ -0,0 +1,113 @@
+import importlib
+import os
+
+REAL = "real"
+SIMULATED = "simulated"
+NULL = "null"
+REPLAY = "replay"
+
+# kind -> {name: "module:attribute"}. Entries are resolved only when created, so
+# importing this registry (or anything that uses it) never pulls in hardware libraries.
+_registry = {
+    "motors": {
+        REAL: "src.motor_control.motor_driver:GpioBackend",
+        SIMULATED: "src.motor_control.motor_driver:MockBackend",
+        NULL: "src.utils.backends:NullBackend",
+    },
+    "lidar": {
+        REAL: "src.lidar.lidar_stream:rplidar_factory",
+        SIMULATED: "src.lidar.fake_lidar:FakeLidar",
+        REPLAY: "src.utils.recording:ReplayLidar",
+        NULL: "src.utils.backends:NullLidar",
+    },
+    # Picamera2 + IMX500 stand-ins; RobotFollower opens the real camera itself
+    "camera": {
+        SIMULATED: "src.computer_vision.fake_camera:FakeCamera",
+        REPLAY: "src.utils.recording:ReplayCamera",
+    },
+    "pose": {
+        SIMULATED: "src.computer_vision.fake_pose:FakePoseSource",
+    },
+}
+
+
+class NullBackend:
+    """Accepts and discards everything."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class NullLidar:
+    """RPLidar-compatible device that never sees anything.
+
+    It connects and reports healthy, but its iterators yield no measurements and end at
+    once with EOFError, like an empty replay log, so streams stop instead of reconnecting.
+    """
+
+    def __init__(self, port=None, *args, **kwargs):
+        self.port = port
+        self.connected = True
+
+    def get_info(self):
+        return {"model": 0, "serialnumber": "NULL"}
+
+    def get_health(self):
+        return ("Good", 0)
+
+    def start_motor(self):
+        pass
+
+    def stop_motor(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def clear_input(self):
+        pass
+
+    def disconnect(self):
+        self.connected = False
+
+    def iter_measures(self, scan_type="normal", max_buf_meas=3000):
+        raise EOFError("Null LiDAR has no scans")
+        yield
+
+    def iter_scans(self, scan_type="normal", max_buf_meas=3000, min_len=5):
+        raise EOFError("Null LiDAR has no scans")
+        yield
+
+
+def register(kind, name, target):
+    """Register a factory (callable or "module:attribute" string) for a backend kind."""
+    _registry.setdefault(kind, {})[name] = target
+
+
+def available(kind):
+    return sorted(_registry.get(kind, {}))
+
+
+def default_name(kind):
+    """Backend chosen by AFROBOTICS_<KIND>_BACKEND, then AFROBOTICS_BACKEND, then "real"."""
+    return os.environ.get(f"AFROBOTICS_{kind.upper()}_BACKEND") or os.environ.get("AFROBOTICS_BACKEND") or REAL
+
+
+def resolve(kind, name=None):
+    name = default_name(kind) if name is None else name
+    try:
+        target = _registry[kind][name]
+    except KeyError:
+        raise ValueError(f"No {kind!r} backend named {name!r}; available: {available(kind)}") from None
+    if isinstance(target, str):
+        module_name, _, attribute = target.partition(":")
+        target = getattr(importlib.import_module(module_name), attribute)
+        _registry[kind][name] = target
+    return target
+
+
+def create(kind, name=None, *args, **kwargs):
+    return resolve(kind, name)(*args, **kwargs)
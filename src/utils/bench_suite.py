@@ -0,0 +1,488 @@
+import argparse
+import gc
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+import numpy as np
+from src.utils import backends, instrumentation
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Timings only mean something on the machine that recorded them, so the baseline is
+# local (git-ignored): record it with --save-baseline on the robot or CI box itself
+BASELINE_PATH = os.path.join(REPO_ROOT, "benchmarks", "baseline.json")
+
+CALLS = 2000
+ROUNDS = 5  # percentiles are the median over rounds, so one noisy stretch does not fail a check
+WARMUP = 50
+WARMUP_TIME = 0.5  # seconds; warm-up keeps going at least this long so clocks and caches settle
+ALLOC_CALLS = 200  # tracemalloc slows calls down, so allocations get their own shorter pass
+POOL = 64  # synthetic inputs generated up front and cycled through
+
+REPEATS = 5  # whole-suite runs; baselines and checks use the median of each metric
+
+# Allowed relative growth over the baseline before a metric counts as a regression.
+# Throughput is checked through p50; allocations also get ALLOC_SLACK_KB of absolute slack.
+# A case whose metric spread more than this across repeats gets NOISE_MARGIN times its
+# measured spread instead, so a noisy case cannot fail a check on noise alone.
+THRESHOLDS = {"p50_us": 0.25, "p99_us": 0.50, "alloc_kb": 0.10}
+ALLOC_SLACK_KB = 1.0
+NOISE_MARGIN = 1.5
+
+# Synthetic input sizes; `--scale` multiplies the counts
+DENSITY = {
+    "lidar_points": 800,
+    "people": 2,
+    "clutter": 20,
+    "entities": 2000,
+    "pose_people": 2,
+}
+
+# name, setup(density) -> zero-argument callable doing one hot-path call, description
+Case = namedtuple('Case', ['name', 'setup', 'description'])
+
+
+class _Discard:
+    def write(self, text):
+        pass
+
+    def flush(self):
+        pass
+
+
+def _cycle(items):
+    items = list(items)
+    state = [0]
+
+    def next_item():
+        item = items[state[0] % len(items)]
+        state[0] += 1
+        return item
+    return next_item
+
+
+def _lidar_scans(density):
+    lidar = backends.create("lidar", backends.SIMULATED, points_per_scan=density["lidar_points"],
+                            obstacles=((0.0, 800.0, 20.0), (90.0, 500.0, 30.0)), realtime=False)
+    return [lidar.generate_scan() for _ in range(POOL)]
+
+
+def setup_scan_binning(density):
+    from src.lidar.scan_buffer import ScanBuffer
+
+    # LidarControl pushes RPLidar's list of (quality, angle, distance) tuples
+    scans = _cycle([[tuple(m) for m in scan.tolist()] for scan in _lidar_scans(density)])
+    buffer = ScanBuffer()
+    return lambda: buffer.push(scans())
+
+
+def setup_avoid(density):
+    from src.lidar.sector_index import SectorIndex
+
+    revolutions = []
+    for scan in _lidar_scans(density):
+        revolutions.append([(i == 0, int(q), a, d) for i, (q, a, d) in enumerate(scan.tolist())])
+    revolutions = _cycle(revolutions)
+    sectors = SectorIndex()
+
+    def avoid():
+        sectors.update_measures(revolutions())
+        return sectors.is_blocked("forward", 0.5)
+    return avoid
+
+
+def _follower(density, frames=False):
+    from src.computer_vision.computer_vision import RobotFollower
+    from src.motor_control.motor_driver import MotorDriver
+
+    camera = backends.create("camera", backends.SIMULATED, people=density["people"],
+                             clutter=density["clutter"], realtime=False, frames=frames)
+    driver = MotorDriver(backends.create("motors", backends.SIMULATED), threaded=False)
+    # Frame-paced clock so tracking does the same work however fast the calls run
+    frames = itertools.count()
+    follower = RobotFollower(None, headless=True, camera=camera, driver=driver,
+                             clock=lambda: next(frames) / camera.rate)
+    requests = [camera.capture_request() for _ in range(POOL)]
+    return follower, requests
+
+
+def setup_detections(density):
+    follower, requests = _follower(density)
+    requests = _cycle(requests)
+    return lambda: follower.get_detections(requests())
+
+
+def setup_draw_and_control(density):
+    follower, requests = _follower(density)
+    requests = _cycle(requests)
+    return lambda: follower.draw_and_control(requests())
+
+
+def setup_overlay(density):
+    from src.computer_vision.overlay import OverlayCompositor
+
+    # Simulated cameras only run headless; draw_overlay just needs a compositor
+    follower, requests = _follower(density, frames=True)
+    follower.compositor = OverlayCompositor()
+    frames = [r.make_array("main").copy() for r in requests[:4]]
+    targets = []
+    for i, request in enumerate(requests):
+        targets.append(follower.select_target(follower.get_detections(request), i / 30.0))
+    best = next(t for t in targets if t is not None)
+    frames = _cycle(frames)
+    return lambda: follower.draw_overlay(frames(), best)
+
+
+def setup_pose(density):
+    from src.computer_vision.fake_pose import LANDMARKS
+    from src.computer_vision.keypoints import LEFT_WRIST, RIGHT_WRIST, KeypointExtractor, primary_person
+    from src.computer_vision.shooter_world import WINDOW_HEIGHT, WINDOW_WIDTH
+
+    source = backends.create("pose", backends.SIMULATED, people=density["pose_people"], others=2, realtime=False)
+    buffers = _cycle([source.next() for _ in range(POOL)])
+    extractor = KeypointExtractor(LANDMARKS, WINDOW_WIDTH, WINDOW_HEIGHT)
+
+    # PoseShooter._handle_pose without the GStreamer and Hailo buffer plumbing
+    def pose():
+        poses = extractor.extract(buffers(), source.frame_width)
+        person = primary_person(poses)
+        if person is None:
+            return None
+        left = poses.points[person, LEFT_WRIST].astype(int).tolist()
+        right = poses.points[person, RIGHT_WRIST].astype(int).tolist()
+        return left, right
+    return pose
+
+
+def _world(density, seed=0):
+    import random
+    from src.computer_vision.shooter_world import (BRICK_DROP_SPEED, BRICK_HEIGHT, BRICK_WIDTH, BULLET_HEIGHT,
+                                                   BULLET_SPEED, BULLET_WIDTH, WINDOW_HEIGHT, WINDOW_WIDTH,
+                                                   ShooterWorld)
+
+    random.seed(seed)
+    rng = np.random.default_rng(seed)
+    world = ShooterWorld(starting_lives=float('inf'))
+    half = density["entities"] // 2
+
+    def tick():
+        # Keep the entity count steady, as shooter_world.bench does
+        missing = half - len(world.bricks)
+        if missing > 0:
+            world.bricks.spawn_many(rng.uniform(0, WINDOW_WIDTH - BRICK_WIDTH, missing),
+                                    rng.uniform(-WINDOW_HEIGHT, 0, missing), BRICK_WIDTH / 4, BRICK_HEIGHT / 4,
+                                    rng.uniform(0.5, BRICK_DROP_SPEED, missing))
+        missing = half - len(world.bullets)
+        if missing > 0:
+            world.bullets.spawn_many(rng.uniform(0, WINDOW_WIDTH, missing),
+                                     rng.uniform(WINDOW_HEIGHT / 2, WINDOW_HEIGHT, missing),
+                                     BULLET_WIDTH, BULLET_HEIGHT, -BULLET_SPEED)
+        hand_x = int(rng.integers(0, WINDOW_WIDTH))
+        world.tick(((hand_x, 300), (hand_x, 300)))
+    return world, tick
+
+
+def setup_shooter_tick(density):
+    _, tick = _world(density)
+    return tick
+
+
+def setup_shooter_draw(density):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    import pygame
+    from src.computer_vision.shooter_renderer import ShooterRenderer
+    from src.computer_vision.shooter_world import WINDOW_HEIGHT, WINDOW_WIDTH
+
+    pygame.init()
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    # Game-sized entity counts; the renderer is not meant for thousands of sprites
+    world, tick = _world(dict(density, entities=min(density["entities"], 60)))
+    renderer = ShooterRenderer(screen, world)
+
+    def draw():
+        tick()
+        renderer.draw()
+    return draw
+
+
+def setup_control_step(density):
+    from src.motor_control.control_loop import ControlLoop, TargetEstimate
+    from src.motor_control.motor_driver import MotorDriver
+    from src.utils.mailbox import Mailbox
+
+    driver = MotorDriver(backends.create("motors", backends.SIMULATED), threaded=False)
+    targets = Mailbox()
+    loop = ControlLoop(driver, targets)
+    state = np.array([300, 240, 120, 300, 40, 0, 0, 0], dtype=np.float64)
+
+    def step():
+        now = time.monotonic()
+        targets.put(TargetEstimate(1, now, now, state, (640, 480)))
+        loop.step(now)
+    return step
+
+
+def setup_frame_ring(density):
+    from src.utils.shm_ring import SharedRing
+
+    camera = backends.create("camera", backends.SIMULATED, people=density["people"], frames=True, realtime=False)
+    frame = camera.capture_request().make_array("main").copy()
+    ring = SharedRing.create(None, frame.shape, frame.dtype)
+    out = np.empty_like(frame)
+
+    def publish():
+        ring.write(frame)
+        return ring.read(out=out)
+    publish.close = ring.close
+    return publish
+
+
+CASES = [
+    Case("scan_binning", setup_scan_binning, "LidarControl: bin one revolution into the ScanBuffer"),
+    Case("avoid", setup_avoid, "avoid_obstacle: feed one revolution to the SectorIndex and threshold"),
+    Case("detections", setup_detections, "RobotFollower.get_detections on synthetic SSD tensors"),
+    Case("draw_and_control", setup_draw_and_control, "RobotFollower.draw_and_control, headless"),
+    Case("overlay", setup_overlay, "RobotFollower.draw_overlay on a synthetic frame"),
+    Case("pose", setup_pose, "PoseShooter pose callback: keypoints, primary person, wrists"),
+    Case("shooter_tick", setup_shooter_tick, "PoseShooter world update and collisions"),
+    Case("shooter_draw", setup_shooter_draw, "PoseShooter dirty-rect draw (SDL dummy driver)"),
+    Case("control_step", setup_control_step, "ControlLoop.step with a fresh target"),
+    Case("frame_ring", setup_frame_ring, "SharedRing write + read of one camera frame"),
+]
+
+
+def measure(call, calls=CALLS, warmup=WARMUP, alloc_calls=ALLOC_CALLS):
+    """Latency percentiles, throughput and per-call allocations of `call()`."""
+    end = time.perf_counter() + WARMUP_TIME
+    done = 0
+    while done < warmup or time.perf_counter() < end:
+        call()
+        done += 1
+    gc.collect()
+    times = np.empty(calls, dtype=np.int64)
+    clock = time.perf_counter_ns
+    start = clock()
+    for i in range(calls):
+        t0 = clock()
+        call()
+        times[i] = clock() - t0
+    elapsed = (clock() - start) / 1e9
+
+    # Peak traced memory above the starting point within each call, and what stays behind
+    gc.collect()
+    tracemalloc.start()
+    peaks = np.empty(alloc_calls)
+    base = tracemalloc.get_traced_memory()[0]
+    for i in range(alloc_calls):
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        call()
+        peaks[i] = tracemalloc.get_traced_memory()[1] - before
+    retained = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+
+    rounds = np.array_split(times, max(1, min(ROUNDS, calls // 100)))
+    p50, p90, p99 = np.median([np.percentile(r, [50, 90, 99]) for r in rounds], axis=0) / 1e3
+    return {
+        "calls": calls,
+        "throughput_per_s": calls / elapsed,
+        "mean_us": times.mean() / 1e3,
+        "p50_us": p50,
+        "p90_us": p90,
+        "p99_us": p99,
+        "max_us": times.max() / 1e3,
+        "alloc_kb": peaks.mean() / 1024,
+        "retained_b": retained / alloc_calls,
+    }
+
+
+def run(cases=CASES, density=DENSITY, calls=CALLS, warmup=WARMUP, alloc_calls=ALLOC_CALLS):
+    # Hot paths log; keep that off the terminal but still pay for the log() calls
+    instrumentation.configure(stream=_Discard())
+    results = {}
+    for case in cases:
+        try:
+            call = case.setup(density)
+        except ImportError as e:
+            print(f"{case.name:<18} skipped: {e}")
+            continue
+        results[case.name] = measure(call, calls, warmup, alloc_calls)
+        if hasattr(call, "close"):
+            call.close()
+        print(format_result(case.name, results[case.name]))
+    instrumentation.flush()
+    return results
+
+
+def _run_named(names, density, calls, warmup, alloc_calls):
+    results = run([case for case in CASES if case.name in names], density, calls, warmup, alloc_calls)
+    sys.stdout.flush()
+    return results
+
+
+def run_repeated(cases=CASES, density=DENSITY, calls=CALLS, warmup=WARMUP, alloc_calls=ALLOC_CALLS,
+                 repeats=REPEATS):
+    """Median of every metric over `repeats` runs, plus the relative spread of the checked ones.
+
+    With more than one repeat every run gets a fresh process: some cases settle into a
+    different speed per process (allocation layout, hash seeds), and that variance has
+    to show up in the spread rather than in a later check.
+    """
+    if repeats == 1:
+        runs = [run(cases, density, calls, warmup, alloc_calls)]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        import multiprocessing
+
+        runs = []
+        names = [case.name for case in cases]
+        for i in range(repeats):
+            print(f"Run {i + 1}/{repeats}", flush=True)
+            with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as pool:
+                runs.append(pool.submit(_run_named, names, density, calls, warmup, alloc_calls).result())
+    results, noise = {}, {}
+    for name in runs[0]:
+        samples = [r[name] for r in runs]
+        results[name] = {metric: float(np.median([sample[metric] for sample in samples])) for metric in samples[0]}
+        results[name]["calls"] = calls
+        noise[name] = {}
+        for metric in THRESHOLDS:
+            values = [sample[metric] for sample in samples]
+            median = np.median(values)
+            noise[name][metric] = float((max(values) - min(values)) / median) if median > 0 else 0.0
+    return results, noise
+
+
+def format_result(name, r):
+    return (f"{name:<18} {r['throughput_per_s']:>10.0f}/s  p50 {r['p50_us']:>9.1f} us  "
+            f"p90 {r['p90_us']:>9.1f} us  p99 {r['p99_us']:>9.1f} us  "
+            f"alloc {r['alloc_kb']:>8.1f} KB/call  retained {r['retained_b']:>7.0f} B/call")
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "platform": platform.platform(),
+    }
+
+
+def load_baseline(path=BASELINE_PATH):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(results, density, path=BASELINE_PATH, noise=None):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"environment": environment(), "density": density, "thresholds": THRESHOLDS,
+                   "results": results, "noise": noise or {}}, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def baseline_calls(baseline):
+    """Call counts the baseline was recorded with; tail percentiles shift with the count."""
+    return sorted({result["calls"] for result in baseline["results"].values()})
+
+
+def compare(results, baseline, thresholds=None, noise=None):
+    """Regressions as (case, metric, baseline value, current value, limit) tuples.
+
+    `noise` is the spread of `results` across repeats, as returned by run_repeated();
+    the larger of it and the baseline's own spread widens each case's tolerance.
+    """
+    thresholds = baseline.get("thresholds", THRESHOLDS) if thresholds is None else thresholds
+    noise = {} if noise is None else noise
+    regressions = []
+    for name, current in results.items():
+        reference = baseline["results"].get(name)
+        if reference is None:
+            continue
+        spread = {metric: max(baseline.get("noise", {}).get(name, {}).get(metric, 0.0),
+                              noise.get(name, {}).get(metric, 0.0)) for metric in thresholds}
+        for metric, tolerance in thresholds.items():
+            limit = reference[metric] * (1 + max(tolerance, NOISE_MARGIN * spread[metric]))
+            if metric == "alloc_kb":
+                limit += ALLOC_SLACK_KB
+            if current[metric] > limit:
+                regressions.append((name, metric, reference[metric], current[metric], limit))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hot-path benchmarks on simulated sensors, with baselines")
+    parser.add_argument("--only", default=None, help="Comma-separated case names")
+    parser.add_argument("--list", action="store_true", help="List the cases and exit")
+    parser.add_argument("--calls", type=int, default=CALLS)
+    parser.add_argument("--warmup", type=int, default=WARMUP)
+    parser.add_argument("--alloc-calls", type=int, default=ALLOC_CALLS)
+    parser.add_argument("--repeats", type=int, default=REPEATS, help="Whole-suite runs to take medians over")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every synthetic input density")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--check", action="store_true", help="Exit non-zero on regressions against the baseline")
+    parser.add_argument("--tolerance-scale", type=float, default=1.0,
+                        help="Multiply the regression thresholds, e.g. on a noisy shared machine")
+    parser.add_argument("--json", default=None, help="Also write the results to this file")
+    args = parser.parse_args()
+
+    if args.list:
+        for case in CASES:
+            print(f"{case.name:<18} {case.description}")
+        sys.exit(0)
+
+    cases = CASES
+    if args.only:
+        names = args.only.split(",")
+        unknown = set(names) - {case.name for case in CASES}
+        if unknown:
+            parser.error(f"unknown cases: {', '.join(sorted(unknown))}")
+        cases = [case for case in CASES if case.name in names]
+    density = {key: max(1, int(round(value * args.scale))) for key, value in DENSITY.items()}
+
+    baseline = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        baseline = load_baseline(args.baseline)
+        recorded = baseline_calls(baseline)
+        if args.check and recorded != [args.calls]:
+            parser.error(f"--calls {args.calls} does not match the baseline's {', '.join(map(str, recorded))} "
+                         "calls; p99 is only comparable at the same call count")
+
+    results, noise = run_repeated(cases, density, args.calls, args.warmup, args.alloc_calls, args.repeats)
+    if args.repeats > 1:
+        print(f"Median of {args.repeats} runs")
+        for name, result in results.items():
+            print(format_result(name, result))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"environment": environment(), "density": density, "results": results, "noise": noise}, f, indent=2)
+    if args.save_baseline:
+        save_baseline(results, density, args.baseline, noise)
+        print(f"Baseline written to {args.baseline}")
+        sys.exit(0)
+
+    if baseline is None:
+        print(f"No baseline at {args.baseline}; run with --save-baseline first")
+        sys.exit(1 if args.check else 0)
+    if baseline_calls(baseline) != [args.calls]:
+        print(f"Not comparing: baseline was recorded with --calls {', '.join(map(str, baseline_calls(baseline)))}")
+        sys.exit(0)
+    if baseline.get("density") != density:
+        print("Warning: baseline was recorded with different densities")
+    if baseline.get("environment", {}).get("machine") != platform.machine():
+        print("Warning: baseline was recorded on a different machine type")
+    thresholds = {metric: tolerance * args.tolerance_scale
+                  for metric, tolerance in baseline.get("thresholds", THRESHOLDS).items()}
+    regressions = compare(results, baseline, thresholds, noise)
+    for name, metric, reference, current, limit in regressions:
+        print(f"REGRESSION {name} {metric}: {current:.1f} vs baseline {reference:.1f} (limit {limit:.1f})")
+    if not regressions:
+        print(f"No regressions against {args.baseline}")
+    sys.exit(1 if regressions and args.check else 0)
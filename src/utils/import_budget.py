@@ -0,0 +1,68 @@
+import argparse
+import os
+import subprocess
+import sys
+
+# Cumulative import time budgets in milliseconds, measured with `python -X importtime`.
+# None of these modules may import camera, GPIO, serial or plotting libraries at import time.
+BUDGETS = {
+    "src.utils.backends": 20,
+    "src.motor_control.motor_driver": 20,
+    "src.motor_control.motor_control": 300,
+    "src.lidar.lidar_stream": 300,
+    "src.lidar.lidar_control": 300,
+    "src.computer_vision.computer_vision": 400,
+}
+
+FORBIDDEN = ("gpiozero", "picamera2", "rplidar", "matplotlib", "cv2", "serial")
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def measure(module):
+    """Return (cumulative_ms, imported module names) for a fresh import of `module`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+    cumulative = 0
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if not cumulative_us.isdigit():
+            continue
+        imported.add(name)
+        if name == module:
+            cumulative = int(cumulative_us)
+    return cumulative / 1000.0, imported
+
+
+def report(budgets=BUDGETS, scale=1.0):
+    failures = 0
+    print(f"{'module':<40} {'ms':>8} {'budget':>8}")
+    for module, budget in budgets.items():
+        try:
+            elapsed, imported = measure(module)
+        except RuntimeError as e:
+            print(f"{module:<40} {'error':>8} {budget * scale:>8.0f}  {e}")
+            failures += 1
+            continue
+        heavy = sorted(name for name in imported if name.split(".")[0] in FORBIDDEN)
+        over = elapsed > budget * scale
+        status = "OVER" if over else "ok"
+        if heavy:
+            status += f" imports {', '.join(heavy)}"
+        print(f"{module:<40} {elapsed:>8.1f} {budget * scale:>8.0f}  {status}")
+        failures += over or bool(heavy)
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check import-time budgets")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply all budgets (e.g. for slower boards)")
+    args = parser.parse_args()
+    sys.exit(1 if report(scale=args.scale) else 0)
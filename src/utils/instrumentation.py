@@ -0,0 +1,403 @@
+import collections
+import sys
+import threading
+import time
+from array import array
+
+# Spans used across the robot loops
+CAPTURE = "capture"
+METADATA = "metadata"
+DETECTIONS = "detections"
+OVERLAY = "overlay"
+CONTROL = "control"
+GPIO_WRITE = "gpio_write"
+LIDAR_SCAN = "lidar_scan"
+POSE_CALLBACK = "pose_callback"
+
+RING_SIZE = 1024
+# 2**SUB_BITS buckets per power of two keeps every bucket within ~3% of its value
+SUB_BITS = 5
+MAX_NS_BITS = 40  # ~18 minutes; longer durations land in the last bucket
+
+LOG_INTERVAL = 1.0  # seconds between lines with the same key
+LOG_BACKLOG = 1024
+
+
+class Histogram:
+    """HDR-style log-linear histogram of nanosecond durations in a fixed-size table."""
+
+    def __init__(self, sub_bits=SUB_BITS, max_bits=MAX_NS_BITS):
+        self.sub_bits = sub_bits
+        self.sub = 1 << sub_bits
+        self.counts = [0] * ((max_bits - sub_bits + 1) * self.sub)
+        self.reset()
+
+    def reset(self):
+        self.counts[:] = [0] * len(self.counts)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def _index(self, ns):
+        if ns < 2 * self.sub:
+            return ns
+        shift = ns.bit_length() - self.sub_bits - 1
+        return min(shift * self.sub + (ns >> shift), len(self.counts) - 1)
+
+    def _value(self, index):
+        # Midpoint of the bucket in nanoseconds
+        if index < 2 * self.sub:
+            return index
+        shift = index // self.sub - 1
+        return ((index - shift * self.sub) << shift) + (1 << (shift - 1))
+
+    def record(self, ns):
+        if ns < 0:
+            ns = 0
+        self.counts[self._index(ns)] += 1
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+
+    def percentile(self, p):
+        if self.count == 0:
+            return 0
+        rank = max(1, int(round(p / 100.0 * self.count)))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(self._value(index), self.max)
+        return self.max
+
+
+class Span:
+    """Named timing point: a histogram plus a ring of the last RING_SIZE durations.
+
+    Shared by every thread that times `name`, so it holds no per-call state: time a
+    block with `with span.time():` (what the module-level span() hands out), or call
+    start()/stop(token) and keep the token yourself.
+    """
+
+    __slots__ = ("name", "histogram", "ring", "index")
+
+    def __init__(self, name, ring_size=RING_SIZE):
+        self.name = name
+        self.histogram = Histogram()
+        self.ring = array("q", bytes(8 * ring_size))
+        self.index = 0
+
+    def time(self):
+        return _Timing(self)
+
+    @staticmethod
+    def start():
+        return time.perf_counter_ns()
+
+    def stop(self, token):
+        self.record(time.perf_counter_ns() - token)
+
+    def record(self, ns):
+        self.ring[self.index % len(self.ring)] = ns
+        self.index += 1
+        self.histogram.record(ns)
+
+    def recent(self):
+        """The last durations (ns) in the ring, oldest first."""
+        size = len(self.ring)
+        if self.index <= size:
+            return self.ring[:self.index].tolist()
+        split = self.index % size
+        return (self.ring[split:] + self.ring[:split]).tolist()
+
+    def summary(self):
+        h = self.histogram
+        return {
+            "count": h.count,
+            "mean_ms": h.total / h.count / 1e6 if h.count else 0.0,
+            "p50_ms": h.percentile(50) / 1e6,
+            "p99_ms": h.percentile(99) / 1e6,
+            "max_ms": h.max / 1e6,
+        }
+
+
+class _Timing:
+    """One timed block of a Span; the start lives here, not on the shared Span."""
+
+    __slots__ = ("span", "_start")
+
+    def __init__(self, span):
+        self.span = span
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        self.span.record(time.perf_counter_ns() - self._start)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def time(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        pass
+
+    @staticmethod
+    def start():
+        return 0
+
+    def stop(self, token):
+        pass
+
+    def record(self, ns):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Instruments:
+    """Registry of spans and counters. When disabled, span() hands out a shared no-op."""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.spans = {}
+        self.counters = collections.Counter()
+        self._lock = threading.Lock()
+
+    def span(self, name):
+        if not self.enabled:
+            return NULL_SPAN
+        span = self.spans.get(name)
+        if span is None:
+            with self._lock:
+                span = self.spans.setdefault(name, Span(name))
+        return span
+
+    def count(self, name, n=1):
+        if self.enabled:
+            self.counters[name] += n
+
+    def summary(self):
+        return {
+            "spans": {name: span.summary() for name, span in list(self.spans.items())},
+            "counters": dict(self.counters),
+        }
+
+    def format_summary(self):
+        parts = [f"{name} p50={s['p50_ms']:.2f}ms p99={s['p99_ms']:.2f}ms max={s['max_ms']:.2f}ms n={s['count']}"
+                 for name, s in self.summary()["spans"].items()]
+        parts += [f"{name}={n}" for name, n in sorted(self.counters.items())]
+        return " | ".join(parts)
+
+    def dump(self, path=None):
+        """Summary plus the recent durations of every span, as a dict or a JSON file."""
+        data = self.summary()
+        data["recent_ns"] = {name: span.recent() for name, span in list(self.spans.items())}
+        if path is not None:
+            import json
+            with open(path, "w") as f:
+                json.dump(data, f)
+        return data
+
+    def reset(self):
+        for span in list(self.spans.values()):
+            span.histogram.reset()
+            span.index = 0
+        self.counters.clear()
+
+
+class LogSink:
+    """Asynchronous, rate-limited writer for "[TAG] message key=value" log lines.
+
+    log() only appends to a bounded deque; a daemon thread formats and writes. Lines
+    sharing a key (default: the tag) are let through at most once per `min_interval`
+    seconds and report how many were suppressed in between. With `summary_interval`
+    the thread also writes the instruments summary periodically as a [STATS] line.
+    """
+
+    def __init__(self, stream=None, min_interval=LOG_INTERVAL, backlog=LOG_BACKLOG, structured=False,
+                 summary_interval=None, instruments=None):
+        self.stream = sys.stdout if stream is None else stream
+        self.min_interval = min_interval
+        self.structured = structured
+        self.summary_interval = summary_interval
+        self.instruments = instruments
+        self._pending = collections.deque(maxlen=backlog)
+        self._last = {}
+        self._lock = threading.Lock()  # guards the rate-limit check-and-set in log()
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._write_lock = threading.Lock()
+        self._thread = None
+        self.written = 0
+        self.suppressed = 0
+
+    def start(self):
+        if self._thread is None:
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="LogSink", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=1.0):
+        self._stop_event.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    def log(self, tag, message="", key=None, **fields):
+        """Queue a line; returns False if it was rate limited."""
+        now = time.monotonic()
+        key = tag if key is None else key
+        with self._lock:
+            last = self._last.get(key)
+            if last is not None and now - last[0] < self.min_interval:
+                self._last[key] = (last[0], last[1] + 1)
+                self.suppressed += 1
+                return False
+            self._last[key] = (now, 0)
+        self._pending.append((time.time(), tag, message, fields, last[1] if last else 0))
+        self._wake.set()
+        return True
+
+    def _format(self, wall, tag, message, fields, suppressed):
+        if self.structured:
+            import json
+            record = {"time": round(wall, 3), "tag": tag, "message": message, **fields}
+            if suppressed:
+                record["suppressed"] = suppressed
+            return json.dumps(record, default=str)
+        line = f"[{tag}] {message}" if message else f"[{tag}]"
+        if fields:
+            line += " " + " ".join(f"{k}={v:.3f}" if isinstance(v, float) else f"{k}={v}" for k, v in fields.items())
+        if suppressed:
+            line += f" (+{suppressed} suppressed)"
+        return line
+
+    def flush(self):
+        """Write everything queued so far from the calling thread."""
+        with self._write_lock:
+            lines = []
+            while self._pending:
+                lines.append(self._format(*self._pending.popleft()))
+            if lines:
+                self.stream.write("\n".join(lines) + "\n")
+                self.stream.flush()
+                self.written += len(lines)
+
+    def _run(self):
+        next_summary = None if self.summary_interval is None else time.monotonic() + self.summary_interval
+        while not self._stop_event.is_set():
+            timeout = None if next_summary is None else max(next_summary - time.monotonic(), 0.0)
+            self._wake.wait(timeout)
+            self._wake.clear()
+            try:
+                if next_summary is not None and time.monotonic() >= next_summary:
+                    self._pending.append((time.time(), "STATS", self.instruments.format_summary(), {}, 0))
+                    next_summary += self.summary_interval
+                self.flush()
+            except Exception as e:
+                sys.stderr.write(f"[ERROR] LogSink: {e}\n")
+
+
+instruments = Instruments()
+_sink = None
+
+
+def span(name):
+    """Context manager timing one block under `name`."""
+    return instruments.span(name).time()
+
+
+def count(name, n=1):
+    instruments.count(name, n)
+
+
+def get_sink():
+    global _sink
+    if _sink is None:
+        _sink = LogSink(instruments=instruments).start()
+    return _sink
+
+
+def log(tag, message="", key=None, **fields):
+    return get_sink().log(tag, message, key, **fields)
+
+
+def configure(enabled=True, summary_interval=None, min_interval=LOG_INTERVAL, structured=False,
+              dump_path=None, stream=None):
+    """Set up the shared instruments and log sink, replacing any running sink.
+
+    With `dump_path`, SIGUSR1 writes `Instruments.dump()` there (main thread only).
+    """
+    global _sink
+    instruments.enabled = enabled
+    if _sink is not None:
+        _sink.stop()
+    _sink = LogSink(stream, min_interval, structured=structured, summary_interval=summary_interval,
+                    instruments=instruments).start()
+    if dump_path is not None:
+        import signal
+        signal.signal(signal.SIGUSR1, lambda signum, frame: instruments.dump(dump_path))
+    return _sink
+
+
+def flush():
+    """Write out anything still queued; call before the process exits."""
+    if _sink is not None:
+        _sink.flush()
+
+
+def benchmark(iterations=200000):
+    """Per-call cost of a span and of a rate-limited log call."""
+    registry = Instruments()
+    timed = registry.span("bench")
+    start = time.perf_counter()
+    for _ in range(iterations):
+        with timed.time():
+            pass
+    with_span = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        pass
+    baseline = time.perf_counter() - start
+
+    class _Discard:
+        def write(self, text):
+            pass
+
+        def flush(self):
+            pass
+
+    sink = LogSink(_Discard()).start()
+    start = time.perf_counter()
+    for i in range(iterations):
+        sink.log("MOVE", "bench", left=0.5, right=0.5)
+    logged = time.perf_counter() - start
+    sink.stop()
+
+    span_us = (with_span - baseline) / iterations * 1e6
+    print(f"span enter/exit: {span_us:.3f} us, log(): {logged / iterations * 1e6:.3f} us")
+    print(f"at 30 frames/s with 8 spans per frame: {8 * 30 * span_us / 1e4:.4f}% of one core")
+    print(registry.format_summary())
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Instrumentation overhead benchmark")
+    parser.add_argument("--iterations", type=int, default=200000)
+    args = parser.parse_args()
+    benchmark(args.iterations)
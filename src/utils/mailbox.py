@@ -0,0 +1,151 @@
+import argparse
+import queue
+import threading
+import time
+from collections import namedtuple
+
+# One published value: seq starts at 1 and increases by one per put()
+Message = namedtuple('Message', ['seq', 'timestamp', 'value'])
+
+
+class Mailbox:
+    """Single-producer "latest value" handoff between threads.
+
+    put() replaces the current value with a new (seq, monotonic timestamp, value) tuple
+    in one attribute store, so readers never take a lock and never see a torn update.
+    The producer only touches the condition lock when a reader is blocked in
+    wait_for_newer(). Readers remember the last seq they handled to tell fresh values
+    from ones they have already seen.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._message = Message(0, None, None)
+        self._cond = threading.Condition(threading.Lock())
+        self._waiters = 0
+
+    @property
+    def seq(self):
+        return self._message.seq
+
+    def put(self, value):
+        message = Message(self._message.seq + 1, self.clock(), value)
+        self._message = message
+        # A waiter registers before checking seq, so either it sees this message or we see it
+        if self._waiters:
+            with self._cond:
+                self._cond.notify_all()
+        return message.seq
+
+    def get(self):
+        """Latest Message, seq 0 with value None if nothing was published yet."""
+        return self._message
+
+    def read_if_newer(self, seq):
+        """Latest Message if its seq is greater than `seq`, otherwise None. Never blocks."""
+        message = self._message
+        return message if message.seq > seq else None
+
+    def wait_for_newer(self, seq, timeout=None):
+        """Block until a Message newer than `seq` is published; None on timeout."""
+        message = self._message
+        if message.seq > seq:
+            return message
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._waiters += 1
+            try:
+                while True:
+                    message = self._message
+                    if message.seq > seq:
+                        return message
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return None
+                    self._cond.wait(remaining)
+            finally:
+                self._waiters -= 1
+
+    def age(self, now=None):
+        """Seconds since the latest put(), or None if nothing was published yet."""
+        timestamp = self._message.timestamp
+        if timestamp is None:
+            return None
+        return (self.clock() if now is None else now) - timestamp
+
+
+class _QueueHandoff:
+    """The drain-and-put Queue(maxsize=1) pattern Mailbox replaces, for benchmarking."""
+
+    def __init__(self):
+        self.queue = queue.Queue(maxsize=1)
+
+    def put(self, value):
+        try:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(value)
+        except (queue.Empty, queue.Full):
+            pass
+
+    def read(self):
+        try:
+            return self.queue.get_nowait()
+        except queue.Empty:
+            return None
+
+
+def benchmark(updates=200000, reader_hz=None):
+    """Producer thread publishing `updates` values while a reader thread polls.
+
+    Reports producer cost per update and how many values the reader saw. With
+    `reader_hz` the reader polls at that rate (like a game loop) instead of spinning.
+    """
+    def run(put, read):
+        done = threading.Event()
+        seen = [0]
+
+        def reader():
+            period = None if reader_hz is None else 1.0 / reader_hz
+            while not done.is_set():
+                if read() is not None:
+                    seen[0] += 1
+                if period:
+                    time.sleep(period)
+
+        thread = threading.Thread(target=reader, daemon=True)
+        thread.start()
+        start = time.perf_counter()
+        for i in range(updates):
+            put(i)
+        elapsed = time.perf_counter() - start
+        done.set()
+        thread.join()
+        return elapsed, seen[0]
+
+    handoff = _QueueHandoff()
+    queue_time, queue_seen = run(handoff.put, handoff.read)
+
+    mailbox = Mailbox()
+    last = [0]
+
+    def read_mailbox():
+        message = mailbox.read_if_newer(last[0])
+        if message is not None:
+            last[0] = message.seq
+        return message
+
+    mailbox_time, mailbox_seen = run(mailbox.put, read_mailbox)
+
+    for name, elapsed, seen in (("queue drain+put", queue_time, queue_seen),
+                                ("mailbox", mailbox_time, mailbox_seen)):
+        print(f"{name:<16} {elapsed / updates * 1e6:7.3f} us/update, reader saw {seen} values")
+    print(f"producer speedup {queue_time / mailbox_time:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mailbox vs Queue(maxsize=1) contention benchmark")
+    parser.add_argument("--updates", type=int, default=200000)
+    parser.add_argument("--reader-hz", type=float, default=None, help="Poll rate of the reader (default: spin)")
+    args = parser.parse_args()
+    benchmark(args.updates, args.reader_hz)
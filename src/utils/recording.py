@@ -0,0 +1,337 @@
+import json
+import mmap
+import struct
+import threading
+import time
+from collections import namedtuple
+from types import SimpleNamespace
+import numpy as np
+
+# Log layout (all little-endian):
+#   file header  : 8-byte magic, uint32 version, 4 bytes padding
+#   chunk header : b"CHNK", uint32 record count, uint64 byte length of the records
+#   record       : kind (4s), dtype code (B), ndim (B), padding (H), payload bytes (I),
+#                  timestamp (d), seq (Q), ndim x uint32 shape, payload
+# Shapes and payloads are padded to 8 bytes so arrays can be viewed straight from the mmap.
+# A chunk is only written once complete, so a log cut short by a crash is still readable
+# up to its last full chunk.
+MAGIC = b"AFROLOG\x00"
+VERSION = 1
+FILE_HEADER = struct.Struct("<8sI4x")
+CHUNK_HEADER = struct.Struct("<4sIQ")
+RECORD_HEADER = struct.Struct("<4sBBHIdQ")
+CHUNK_MAGIC = b"CHNK"
+
+DETECTIONS = b"DETS"  # (N, 6) float32: raw box (4), score, class
+FRAME = b"FRAM"       # (H, W, C) uint8, downscaled
+SCAN = b"SCAN"        # (N, 3) float32: quality, angle, distance
+META = b"META"        # JSON
+
+DTYPES = {0: np.uint8, 1: np.float32, 2: np.float64, 3: np.int32, 4: np.int64}
+DTYPE_CODES = {np.dtype(t): code for code, t in DTYPES.items()}
+JSON_CODE = 255
+
+Entry = namedtuple("Entry", ["kind", "timestamp", "seq", "offset", "dtype", "shape", "length"])
+Record = namedtuple("Record", ["kind", "timestamp", "seq", "data"])
+
+
+def _pad(n):
+    return (-n) % 8
+
+
+class Recorder:
+    """Append-only writer for detections, frames, metadata and LiDAR scans.
+
+    Records are gathered into an in-memory chunk and written out when it reaches
+    `chunk_size` bytes, so the hot paths only pay for a memcpy. Safe to share between the
+    camera and LiDAR threads.
+    """
+
+    def __init__(self, path, chunk_size=1 << 20, frame_step=None):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.frame_step = frame_step
+        self._file = open(path, "wb")
+        self._file.write(FILE_HEADER.pack(MAGIC, VERSION))
+        self._chunk = bytearray()
+        self._count = 0
+        self._lock = threading.Lock()
+        self.records = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, kind, timestamp, seq, data):
+        if isinstance(data, np.ndarray):
+            array = np.ascontiguousarray(data)
+            code = DTYPE_CODES[array.dtype]
+            shape = array.shape
+            payload = array.data.cast("B") if array.size else b""
+        else:
+            code = JSON_CODE
+            shape = ()
+            payload = json.dumps(data).encode()
+        length = len(payload)
+        header = RECORD_HEADER.pack(kind, code, len(shape), 0, length, timestamp, seq)
+        shape_bytes = struct.pack(f"<{len(shape)}I", *shape)
+        with self._lock:
+            chunk = self._chunk
+            chunk += header
+            chunk += shape_bytes
+            chunk += bytes(_pad(len(header) + len(shape_bytes)))
+            chunk += payload
+            chunk += bytes(_pad(length))
+            self._count += 1
+            self.records += 1
+            if len(chunk) >= self.chunk_size:
+                self._flush_locked()
+
+    def record_detections(self, timestamp, seq, boxes, scores, classes):
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        table = np.empty((len(boxes), 6), dtype=np.float32)
+        table[:, :4] = boxes
+        table[:, 4] = np.asarray(scores, dtype=np.float32).reshape(-1)
+        table[:, 5] = np.asarray(classes, dtype=np.float32).reshape(-1)
+        self.write(DETECTIONS, timestamp, seq, table)
+
+    def record_frame(self, timestamp, seq, frame):
+        step = self.frame_step or 1
+        self.write(FRAME, timestamp, seq, frame[::step, ::step])
+
+    def record_scan(self, timestamp, seq, scan):
+        self.write(SCAN, timestamp, seq, np.asarray(scan, dtype=np.float32).reshape(-1, 3))
+
+    def record_metadata(self, timestamp, seq, metadata):
+        self.write(META, timestamp, seq, metadata)
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._count:
+            return
+        self._file.write(CHUNK_HEADER.pack(CHUNK_MAGIC, self._count, len(self._chunk)))
+        self._file.write(self._chunk)
+        self._file.flush()
+        self._chunk = bytearray()
+        self._count = 0
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+
+
+class LogReader:
+    """Memory-mapped reader; array payloads are returned as read-only views of the map."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version = FILE_HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a recording")
+        if version != VERSION:
+            raise ValueError(f"Unsupported recording version {version}")
+        self.entries = self._index()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _index(self):
+        entries = []
+        buf = self._mmap
+        offset = FILE_HEADER.size
+        while offset + CHUNK_HEADER.size <= len(buf):
+            magic, count, length = CHUNK_HEADER.unpack_from(buf, offset)
+            offset += CHUNK_HEADER.size
+            if magic != CHUNK_MAGIC or offset + length > len(buf):
+                break  # truncated tail
+            for _ in range(count):
+                kind, code, ndim, _, size, timestamp, seq = RECORD_HEADER.unpack_from(buf, offset)
+                offset += RECORD_HEADER.size
+                shape = struct.unpack_from(f"<{ndim}I", buf, offset)
+                offset += 4 * ndim
+                offset += _pad(RECORD_HEADER.size + 4 * ndim)
+                entries.append(Entry(kind, timestamp, seq, offset, code, shape, size))
+                offset += size + _pad(size)
+        return entries
+
+    def read(self, entry):
+        if entry.dtype == JSON_CODE:
+            return json.loads(self._mmap[entry.offset:entry.offset + entry.length])
+        dtype = np.dtype(DTYPES[entry.dtype])
+        count = entry.length // dtype.itemsize
+        return np.frombuffer(self._mmap, dtype=dtype, count=count, offset=entry.offset).reshape(entry.shape)
+
+    def records(self, kinds=None):
+        for entry in self.entries:
+            if kinds is None or entry.kind in kinds:
+                yield Record(entry.kind, entry.timestamp, entry.seq, self.read(entry))
+
+    def metadata(self):
+        """All JSON metadata records merged into one dict, later keys winning."""
+        merged = {}
+        for record in self.records((META,)):
+            merged.update(record.data)
+        return merged
+
+    def close(self):
+        # Views handed out keep the map alive; closing would invalidate them
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass
+        self._file.close()
+
+
+class Pacer:
+    """Sleeps so recorded timestamps replay at `speed` x real time; speed=None never sleeps."""
+
+    def __init__(self, speed=1.0):
+        self.speed = speed
+        self._origin = None
+
+    def wait(self, timestamp):
+        if self.speed is None:
+            return
+        now = time.monotonic()
+        if self._origin is None:
+            self._origin = (timestamp, now)
+            return
+        log_start, wall_start = self._origin
+        delay = wall_start + (timestamp - log_start) / self.speed - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class ReplayRequest:
+    def __init__(self, metadata, frame=None):
+        self.metadata = metadata
+        self.frame = frame
+
+    def get_metadata(self):
+        return self.metadata
+
+    def release(self):
+        pass
+
+
+class ReplayCamera:
+    """Stands in for both Picamera2 and IMX500 when driving RobotFollower from a log.
+
+    Detection tensors come back from `get_outputs` exactly as recorded. Box conversion
+    assumes normalized (y0, x0, y1, x1) boxes over the full frame and ignores any
+    scaler crop, which is close enough for exercising the control path.
+    """
+
+    def __init__(self, path, speed=1.0):
+        self.reader = LogReader(path)
+        self.pacer = Pacer(speed)
+        info = self.reader.metadata().get("camera", {})
+        width, height = info.get("size", (640, 480))
+        self.camera_config = {"main": {"size": (width, height)}}
+        self.network_intrinsics = SimpleNamespace(
+            labels=info.get("labels"),
+            inference_rate=info.get("inference_rate", 30),
+            preserve_aspect_ratio=False,
+            task="object detection",
+        )
+        self._frames = {r.seq: r.data for r in self.reader.records((FRAME,))}
+        self._detections = [e for e in self.reader.entries if e.kind == DETECTIONS]
+        self._position = 0
+        self.timestamp = self._detections[0].timestamp if self._detections else 0.0
+
+    def clock(self):
+        return self.timestamp
+
+    def capture_request(self):
+        if self._position >= len(self._detections):
+            raise EOFError("End of replay log")
+        entry = self._detections[self._position]
+        self._position += 1
+        self.pacer.wait(entry.timestamp)
+        self.timestamp = entry.timestamp
+        table = self.reader.read(entry)
+        outputs = [table[None, :, :4], table[None, :, 4], table[None, :, 5]]
+        metadata = {"outputs": outputs, "seq": entry.seq, "timestamp": entry.timestamp}
+        return ReplayRequest(metadata, self._frames.get(entry.seq))
+
+    def get_outputs(self, metadata, add_batch=True):
+        return metadata.get("outputs")
+
+    def convert_inference_coords(self, box, metadata, picam2):
+        width, height = self.camera_config["main"]["size"]
+        y0, x0, y1, x1 = box
+        return (x0 * width, y0 * height, (x1 - x0) * width, (y1 - y0) * height)
+
+    def set_auto_aspect_ratio(self):
+        pass
+
+    def set_overlay(self, overlay):
+        pass
+
+    def stop(self):
+        self.reader.close()
+
+
+class ReplayLidar:
+    """RPLidar-compatible device that plays back recorded scans (usable as a LiDAR backend).
+
+    Like ReplayCamera, the iterators raise EOFError once the log is exhausted.
+    """
+
+    def __init__(self, port, speed=1.0):
+        self.reader = LogReader(port)
+        self.pacer = Pacer(speed)
+        self.connected = True
+
+    def get_info(self):
+        return self.reader.metadata().get("lidar", {"model": 0, "serialnumber": "REPLAY"})
+
+    def get_health(self):
+        return ("Good", 0)
+
+    def start_motor(self):
+        pass
+
+    def stop_motor(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def disconnect(self):
+        self.connected = False
+
+    def iter_measures(self, scan_type="normal", max_buf_meas=3000):
+        for record in self.reader.records((SCAN,)):
+            if not self.connected:
+                return
+            self.pacer.wait(record.timestamp)
+            for i, (quality, angle, distance) in enumerate(record.data.tolist()):
+                yield i == 0, int(quality), angle, distance
+        if self.connected:
+            raise EOFError("End of replay log")
+
+    def iter_scans(self, scan_type="normal", max_buf_meas=3000, min_len=5):
+        for record in self.reader.records((SCAN,)):
+            if not self.connected:
+                return
+            self.pacer.wait(record.timestamp)
+            if len(record.data) > min_len:
+                yield [tuple(row) for row in record.data.tolist()]
+        if self.connected:
+            raise EOFError("End of replay log")
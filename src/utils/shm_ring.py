@@ -0,0 +1,119 @@
+from collections import namedtuple
+from multiprocessing import shared_memory
+import time
+import numpy as np
+from src.utils.mailbox import Message
+
+# Everything another process needs to attach to a ring; picklable
+RingSpec = namedtuple('RingSpec', ['name', 'shape', 'dtype', 'slots'])
+
+_ALIGN = 64
+
+
+class SharedRing:
+    """Single-writer ring of fixed-size NumPy slots in `multiprocessing.shared_memory`.
+
+    Every slot carries a seqlock counter: the writer makes it odd, copies the payload,
+    stores the length and timestamp, makes it even again and only then advances the
+    shared head. Readers copy the newest slot and retry if its counter changed while
+    they were copying, so nothing is pickled and nobody takes a lock. Payloads are
+    arrays of `shape` and `dtype`; `length` rows of the first axis are valid, which
+    suits variable-size detection arrays as well as fixed frames and scans.
+
+    CPython gives no memory fences, so this relies on the stores of one process
+    becoming visible to the others in program order (true on x86; on ARM the retry
+    check catches a slot that is rewritten during a copy, but not reordered stores).
+    """
+
+    def __init__(self, spec, create=False):
+        self.shape = tuple(spec.shape)
+        self.dtype = np.dtype(spec.dtype)
+        self.slots = spec.slots
+        slot_bytes = int(np.prod(self.shape)) * self.dtype.itemsize
+        header_bytes = -(-8 * (1 + 3 * self.slots) // _ALIGN) * _ALIGN
+        size = header_bytes + self.slots * slot_bytes
+        if create:
+            self.shm = shared_memory.SharedMemory(name=spec.name, create=True, size=size)
+        else:
+            self.shm = _attach(spec.name)
+        self.owner = create
+        self.spec = spec = spec._replace(name=self.shm.name)
+
+        buf = self.shm.buf
+        self._head = np.ndarray((1,), np.int64, buf, 0)
+        self._seq = np.ndarray((self.slots,), np.int64, buf, 8)
+        self._length = np.ndarray((self.slots,), np.int64, buf, 8 * (1 + self.slots))
+        self._time = np.ndarray((self.slots,), np.float64, buf, 8 * (1 + 2 * self.slots))
+        self._data = np.ndarray((self.slots,) + self.shape, self.dtype, buf, header_bytes)
+        if create:
+            self._head[0] = 0
+            self._seq[:] = 0
+        self.torn = 0
+
+    @classmethod
+    def create(cls, name, shape, dtype, slots=4):
+        return cls(RingSpec(name, tuple(shape), np.dtype(dtype), slots), create=True)
+
+    @property
+    def seq(self):
+        return int(self._head[0])
+
+    def write(self, data, timestamp=None, length=None):
+        """Publish `data`, truncated to `shape[0]` rows; returns its sequence number (1, 2, ...)."""
+        data = np.asarray(data)
+        length = min(len(data) if length is None else length, self.shape[0])
+        count = int(self._head[0])
+        slot = count % self.slots
+        self._seq[slot] = 2 * count + 1
+        self._data[slot][:length] = data[:length]
+        self._length[slot] = length
+        self._time[slot] = time.monotonic() if timestamp is None else timestamp
+        self._seq[slot] = 2 * count + 2
+        self._head[0] = count + 1
+        return count + 1
+
+    def read(self, after=0, out=None, retries=8):
+        """Copy of the newest payload as Message(seq, timestamp, rows) if newer than `after`.
+
+        `out` (an array of the ring's shape) is reused when given. Returns None when there
+        is nothing newer or every attempt raced with the writer.
+        """
+        if out is None:
+            out = np.empty(self.shape, self.dtype)
+        for _ in range(retries):
+            head = int(self._head[0])
+            if head <= after:
+                return None
+            slot = (head - 1) % self.slots
+            seq = int(self._seq[slot])
+            if seq != 2 * head:
+                continue
+            length = int(self._length[slot])
+            timestamp = float(self._time[slot])
+            out[:length] = self._data[slot][:length]
+            if int(self._seq[slot]) == seq:
+                return Message(head, timestamp, out[:length])
+            self.torn += 1
+        return None
+
+    def age(self, now=None):
+        head = int(self._head[0])
+        if head == 0:
+            return float('inf')
+        return (time.monotonic() if now is None else now) - float(self._time[(head - 1) % self.slots])
+
+    def close(self):
+        # Drop the array views first; SharedMemory refuses to close with exports alive
+        self._head = self._seq = self._length = self._time = self._data = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _attach(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13 attaching also registers the segment with the resource tracker.
+        # Workers share their parent's tracker, so that is a no-op and the owner still unlinks.
+        return shared_memory.SharedMemory(name=name)
@@ -0,0 +1,68 @@
+import pytest
+from src.lidar.lidar_stream import LidarStream
+from src.motor_control.motor_driver import MockBackend
+from src.utils import backends, import_budget
+
+
+@pytest.fixture
+def clean_env(monkeypatch):
+    for kind in ("motors", "lidar", "camera", "pose"):
+        monkeypatch.delenv(f"AFROBOTICS_{kind.upper()}_BACKEND", raising=False)
+    monkeypatch.delenv("AFROBOTICS_BACKEND", raising=False)
+    return monkeypatch
+
+
+def test_default_name_precedence(clean_env):
+    assert backends.default_name("motors") == backends.REAL
+    clean_env.setenv("AFROBOTICS_BACKEND", backends.NULL)
+    assert backends.default_name("motors") == backends.NULL
+    clean_env.setenv("AFROBOTICS_MOTORS_BACKEND", backends.SIMULATED)
+    assert backends.default_name("motors") == backends.SIMULATED
+    assert backends.default_name("lidar") == backends.NULL
+
+
+def test_resolve_imports_lazily_and_caches(clean_env):
+    assert backends.resolve("motors", backends.SIMULATED) is MockBackend
+    assert backends._registry["motors"][backends.SIMULATED] is MockBackend
+    clean_env.setenv("AFROBOTICS_BACKEND", backends.SIMULATED)
+    assert isinstance(backends.create("motors"), MockBackend)
+
+
+def test_unknown_backend_lists_the_available_ones():
+    with pytest.raises(ValueError, match="available"):
+        backends.resolve("motors", "warp-drive")
+    with pytest.raises(ValueError):
+        backends.resolve("teleporter", backends.REAL)
+
+
+def test_register_callables_and_strings(clean_env):
+    clean_env.setattr(backends, "_registry", {kind: dict(names) for kind, names in backends._registry.items()})
+    backends.register("motors", "custom", lambda scale=1: ("custom", scale))
+    assert backends.create("motors", "custom", scale=2) == ("custom", 2)
+    backends.register("horn", backends.SIMULATED, "src.motor_control.motor_driver:MockBackend")
+    assert backends.available("horn") == [backends.SIMULATED]
+    assert isinstance(backends.create("horn", backends.SIMULATED), MockBackend)
+
+
+def test_every_kind_has_simulated_and_null_motors_discard():
+    for kind in ("motors", "lidar", "camera", "pose"):
+        assert backends.SIMULATED in backends.available(kind)
+    motors = backends.create("motors", backends.NULL)
+    assert motors.write(0.5, 0.5) is None
+
+
+def test_null_lidar_stream_ends_without_scans(clean_env):
+    clean_env.setenv("AFROBOTICS_BACKEND", backends.NULL)
+    stream = LidarStream().start()
+    stream._thread.join(2.0)
+    try:
+        assert stream.ended and not stream.running
+        assert stream.latest() is None
+        assert stream.reconnects == 0 and stream.errors == 0
+    finally:
+        stream.stop()
+
+
+def test_import_budget(capsys):
+    # Generous scale: this guards against hardware imports and gross regressions, not noise
+    assert import_budget.report(scale=3.0) == 0, capsys.readouterr().out
@@ -0,0 +1,37 @@
+from src.utils import bench_suite
+from src.utils.bench_suite import CASES, THRESHOLDS, compare, run
+
+SMOKE = {"scan_binning", "control_step"}
+
+
+def test_run_measures_every_requested_case():
+    results = run([case for case in CASES if case.name in SMOKE], calls=20, warmup=2, alloc_calls=5)
+    assert set(results) == SMOKE
+    for result in results.values():
+        assert result["calls"] == 20
+        assert 0 < result["p50_us"] <= result["p99_us"] <= result["max_us"]
+        assert result["alloc_kb"] >= 0
+
+
+def result(p50, p99=None, alloc=1.0):
+    return {"calls": 20, "p50_us": p50, "p99_us": p50 * 2 if p99 is None else p99, "alloc_kb": alloc}
+
+
+def test_compare_flags_only_growth_beyond_tolerance():
+    baseline = {"thresholds": THRESHOLDS, "results": {"a": result(100.0), "b": result(100.0)}}
+    regressions = compare({"a": result(120.0), "b": result(150.0), "new": result(1.0)}, baseline)
+    assert [(name, metric) for name, metric, *_ in regressions] == [("b", "p50_us")]
+
+
+def test_compare_widens_tolerance_for_noisy_cases():
+    baseline = {"thresholds": THRESHOLDS, "results": {"a": result(100.0)}, "noise": {"a": {"p50_us": 0.4}}}
+    current = {"a": result(150.0)}
+    assert compare(current, baseline) == []
+    assert compare(current, {**baseline, "noise": {}}) != []
+    # The current run's own spread counts as well
+    assert compare(current, {**baseline, "noise": {}}, noise={"a": {"p50_us": 0.4}}) == []
+
+
+def test_allocations_get_absolute_slack():
+    baseline = {"thresholds": THRESHOLDS, "results": {"a": result(100.0, alloc=0.1)}}
+    assert compare({"a": result(100.0, alloc=0.1 + bench_suite.ALLOC_SLACK_KB)}, baseline) == []
@@ -0,0 +1,52 @@
+import pytest
+from src.motor_control.control_loop import SPIN_TIME, RateScheduler
+
+
+class FakeClock:
+    def __init__(self, step=0.0):
+        self.now = 100.0
+        self.step = step
+        self.reads = 0
+        self.sleeps = []
+
+    def __call__(self):
+        self.reads += 1
+        self.now += self.step
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_default_scheduler_sleeps_without_spinning():
+    clock = FakeClock()
+    scheduler = RateScheduler(100.0, clock=clock, sleep=clock.sleep)
+    assert scheduler.wait() == 100.0
+    clock.now += 0.004
+    reads = clock.reads
+    assert scheduler.wait() == pytest.approx(100.01)
+    assert clock.sleeps == [pytest.approx(0.006)]
+    # One read to find the deadline and one for the jitter sample; no busy-wait
+    assert clock.reads - reads == 2
+
+
+def test_spin_sleeps_short_of_the_deadline():
+    clock = FakeClock(step=0.0001)
+    scheduler = RateScheduler(100.0, clock=clock, sleep=clock.sleep, spin=SPIN_TIME)
+    start = scheduler.wait()
+    clock.sleeps.clear()
+    deadline = scheduler.wait()
+    assert deadline == pytest.approx(start + 0.01)
+    assert clock.sleeps == [pytest.approx(0.01 - SPIN_TIME, abs=0.0004)]
+    assert clock.now >= deadline
+
+
+def test_missed_deadlines_are_skipped():
+    clock = FakeClock()
+    scheduler = RateScheduler(100.0, clock=clock, sleep=clock.sleep)
+    scheduler.wait()
+    clock.now += 0.035
+    assert scheduler.wait() == pytest.approx(100.03)
+    assert scheduler.misses == 2
+    assert scheduler.ticks == 2
@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+from src.computer_vision.detections import DetectionPostProcessor
+
+LABELS = ["person", "car", "dog"]
+
+
+def test_top_k_keeps_best_scores_first():
+    post = DetectionPostProcessor(LABELS, targets=("person", "dog"), threshold=0.3, top_k=2)
+    scores = np.array([0.4, 0.9, 0.8, 0.2, 0.7], dtype=np.float32)
+    classes = np.array([0, 1, 2, 0, 0], dtype=np.float32)
+    assert post.select(scores, classes).tolist() == [2, 4]
+
+
+def test_no_top_k_keeps_all_matches():
+    post = DetectionPostProcessor(LABELS, threshold=0.3)
+    scores = np.array([0.4, 0.9, 0.8], dtype=np.float32)
+    classes = np.array([0, 0, 1], dtype=np.float32)
+    assert post.select(scores, classes).tolist() == [1, 0]
+
+
+@pytest.mark.parametrize("top_k", [0, -1])
+def test_top_k_below_one_is_rejected(top_k):
+    with pytest.raises(ValueError):
+        DetectionPostProcessor(LABELS, top_k=top_k)
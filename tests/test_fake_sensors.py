@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from src.computer_vision.fake_camera import LABELS, MAX_DETECTIONS, FakeCamera
+from src.computer_vision.fake_pose import LANDMARKS, FakePoseSource
+from src.computer_vision.keypoints import NUM_KEYPOINTS
+
+
+def test_fake_camera_outputs_ssd_tensors():
+    camera = FakeCamera(size=(320, 240), people=2, clutter=3, realtime=False)
+    request = camera.capture_request()
+    boxes, scores, classes = camera.get_outputs(request.get_metadata())
+    assert boxes.shape == (1, MAX_DETECTIONS, 4)
+    assert (classes[0, :2] == LABELS.index("person")).all()
+    assert (scores[0, :2] >= 0.6).all() and (scores[0, 5:] == 0).all()
+    assert request.make_array() is None
+
+
+def test_fake_camera_draws_frames_and_fails_on_request():
+    camera = FakeCamera(size=(320, 240), frames=True, realtime=False, fail_after=2)
+    frame = camera.capture_request().make_array("main")
+    assert frame.shape == (240, 320, 4) and frame.dtype == np.uint8
+    camera.capture_request()
+    with pytest.raises(RuntimeError):
+        camera.capture_request()
+
+
+def test_fake_camera_is_deterministic_per_seed():
+    a, b = (FakeCamera(realtime=False, seed=3) for _ in range(2))
+    assert np.array_equal(a.capture_request().metadata["outputs"][2], b.capture_request().metadata["outputs"][2])
+
+
+def test_fake_pose_source_detections():
+    source = FakePoseSource(people=2, others=1, realtime=False)
+    detections = source.next()
+    labels = [d.get_label() for d in detections]
+    assert labels == ["person", "person", "chair"]
+    points = detections[0].get_objects_typed(LANDMARKS)[0].get_points()
+    assert len(points) == NUM_KEYPOINTS
+    assert detections[2].get_objects_typed(LANDMARKS) == []
+    bbox = detections[0].get_bbox()
+    assert 0 <= bbox.xmin() and bbox.xmin() + bbox.width() <= 1
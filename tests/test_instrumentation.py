@@ -0,0 +1,64 @@
+import threading
+import time
+from src.utils.instrumentation import Instruments, LogSink
+
+
+def test_overlapping_blocks_on_one_span_keep_their_own_start():
+    span = Instruments().span("shared")
+    entered, done = threading.Event(), threading.Event()
+
+    def short():
+        entered.wait()
+        with span.time():
+            pass
+        done.set()
+
+    thread = threading.Thread(target=short)
+    thread.start()
+    with span.time():
+        entered.set()
+        done.wait()
+        time.sleep(0.02)
+    thread.join()
+    durations = sorted(span.recent())
+    assert len(durations) == 2
+    assert durations[1] >= 20_000_000
+    assert durations[0] < durations[1]
+
+
+def test_disabled_registry_times_nothing():
+    registry = Instruments(enabled=False)
+    with registry.span("off").time():
+        pass
+    assert registry.spans == {}
+
+
+class _Lines:
+    def __init__(self):
+        self.lines = []
+
+    def write(self, text):
+        self.lines.extend(text.splitlines())
+
+    def flush(self):
+        pass
+
+
+def test_rate_limit_lets_one_line_through_across_threads():
+    stream = _Lines()
+    sink = LogSink(stream, min_interval=60.0)
+    start = threading.Barrier(8)
+
+    def spam():
+        start.wait()
+        for _ in range(500):
+            sink.log("MOVE", "tick")
+
+    threads = [threading.Thread(target=spam) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    sink.flush()
+    assert stream.lines == ["[MOVE] tick"]
+    assert sink.suppressed == 8 * 500 - 1
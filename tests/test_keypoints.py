@@ -0,0 +1,96 @@
+import pytest
+from src.computer_vision.fake_pose import LANDMARKS, FakeBBox, FakeDetection, FakeLandmarks, FakePoint, FakePoseSource
+from src.computer_vision.keypoints import LEFT_WRIST, NUM_KEYPOINTS, RIGHT_WRIST, CapsCache, KeypointExtractor, primary_person
+
+WINDOW_WIDTH, WINDOW_HEIGHT = 1280, 720
+FRAME_WIDTH, FRAME_HEIGHT = 1280, 720
+
+
+def scalar_wrists(detection, width=FRAME_WIDTH, height=FRAME_HEIGHT):
+    """The per-point math pose_callback used before it was vectorized."""
+    points = detection.get_objects_typed(LANDMARKS)[0].get_points()
+    bbox = detection.get_bbox()
+    y_min, y_max = 0.22 * height, 0.78 * height
+    wrists = []
+    for point in (points[LEFT_WRIST], points[RIGHT_WRIST]):
+        x = WINDOW_WIDTH - int((point.x() * bbox.width() + bbox.xmin()) * width)
+        raw_y = (point.y() * bbox.height() + bbox.ymin()) * height
+        wrists.append((x, int((raw_y - y_min) / (y_max - y_min) * WINDOW_HEIGHT)))
+    return wrists
+
+
+def extractor(capacity=4):
+    return KeypointExtractor(LANDMARKS, WINDOW_WIDTH, WINDOW_HEIGHT, capacity=capacity)
+
+
+def test_vectorized_wrists_match_scalar_math():
+    source = FakePoseSource(people=3, others=2, realtime=False, seed=1)
+    keypoints = extractor()
+    for _ in range(200):
+        detections = source.next()
+        poses = keypoints.extract(detections, FRAME_WIDTH)
+        people = [d for d in detections if d.get_label() == "person"]
+        assert len(poses.points) == len(people)
+        for i, person in enumerate(people):
+            left, right = poses.points[i, [LEFT_WRIST, RIGHT_WRIST]].astype(int).tolist()
+            assert [tuple(left), tuple(right)] == scalar_wrists(person)
+
+
+def test_arrays_grow_past_capacity():
+    source = FakePoseSource(people=5, realtime=False)
+    poses = extractor(capacity=2).extract(source.next(), FRAME_WIDTH)
+    assert poses.points.shape == (5, NUM_KEYPOINTS, 2)
+    assert poses.confidences.shape == (5, NUM_KEYPOINTS)
+
+
+def test_people_without_full_landmarks_are_skipped():
+    short = FakeLandmarks([FakePoint(0.5, 0.5, 1.0)] * 5)
+    detections = [FakeDetection("person", FakeBBox(0.1, 0.1, 0.2, 0.5), short),
+                  FakeDetection("person", FakeBBox(0.1, 0.1, 0.2, 0.5))]
+    poses = extractor().extract(detections, FRAME_WIDTH)
+    assert len(poses.points) == 0
+    assert primary_person(poses) is None
+
+
+def test_primary_person_is_the_largest_box():
+    source = FakePoseSource(people=3, realtime=False)
+    detections = source.next()
+    poses = extractor().extract(detections, FRAME_WIDTH)
+    areas = [d.get_bbox().width() * d.get_bbox().height() for d in detections]
+    assert primary_person(poses) == areas.index(max(areas))
+
+
+class FakePad:
+    def __init__(self, caps):
+        self.caps = caps
+        self.handlers = []
+        self.reads = 0
+
+    def connect(self, signal, handler):
+        self.handlers.append((signal, handler))
+
+    def renegotiate(self, caps):
+        self.caps = caps
+        for _, handler in self.handlers:
+            handler(self, None)
+
+
+def test_caps_are_read_once_and_refreshed_on_renegotiation():
+    def get_caps(pad):
+        pad.reads += 1
+        return pad.caps
+
+    pad = FakePad((None, None, None))
+    caps = CapsCache(get_caps)
+    assert caps.size(pad) is None
+    assert pad.handlers == []
+
+    pad.caps = ("RGB", 1280, 720)
+    assert caps.size(pad) == (1280, 720)
+    assert caps.size(pad) == (1280, 720)
+    assert pad.reads == 2
+    assert [signal for signal, _ in pad.handlers] == ["notify::caps"]
+
+    pad.renegotiate(("RGB", 640, 480))
+    assert caps.size(pad) == (640, 480)
+    assert pad.reads == 3
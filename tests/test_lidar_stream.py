@@ -0,0 +1,66 @@
+import time
+import numpy as np
+from src.lidar.fake_lidar import FakeLidar
+from src.lidar.lidar_stream import LidarStream
+
+
+def make_scan(distance=1000.0, points=360):
+    angles = np.arange(points, dtype=np.float32)
+    return np.column_stack((np.full(points, 15.0), angles, np.full(points, distance)))
+
+
+def test_unread_scans_are_not_drops():
+    stream = LidarStream(device_factory=FakeLidar)
+    for i in range(5):
+        stream._publish(make_scan(), float(i) * 0.1)
+    assert stream.seq == 5
+    assert stream.dropped == 0
+
+
+def test_drops_are_scans_a_reader_skipped():
+    stream = LidarStream(device_factory=FakeLidar)
+    stream._publish(make_scan(), 0.0)
+    scan = stream.read_if_newer(0)
+    assert scan.seq == 1 and stream.dropped == 0
+
+    for i in range(3):
+        stream._publish(make_scan(), 0.1 * (i + 1))
+    scan = stream.read_if_newer(scan.seq)
+    assert scan.seq == 4
+    assert stream.dropped == 2
+
+    stream._publish(make_scan(), 0.5)
+    assert stream.wait_for_scan(timeout=0.1).seq == 5
+    assert stream.dropped == 2
+    assert stream.read_if_newer(5) is None
+
+
+def test_sectors_only_consumer_sees_no_drops():
+    stream = LidarStream(device_factory=lambda port: FakeLidar(rate=50.0, obstacles=((0.0, 700.0, 20.0),))).start()
+    try:
+        end = time.monotonic() + 1.0
+        while stream.seq < 5 and time.monotonic() < end:
+            time.sleep(0.01)
+        assert stream.seq >= 5
+        assert stream.sectors.nearest("forward") < 800.0
+        assert stream.stats()["dropped"] == 0
+    finally:
+        stream.stop()
+
+
+def test_reconnects_after_device_failure():
+    devices = []
+
+    def factory(port):
+        devices.append(FakeLidar(rate=100.0, fail_after=2 if not devices else None))
+        return devices[-1]
+
+    stream = LidarStream(device_factory=factory, reconnect_delay=0.01).start()
+    try:
+        end = time.monotonic() + 2.0
+        while stream.seq < 5 and time.monotonic() < end:
+            time.sleep(0.01)
+        assert stream.seq >= 5
+        assert stream.reconnects >= 1 and stream.errors >= 1
+    finally:
+        stream.stop()
@@ -0,0 +1,76 @@
+import cv2
+import numpy as np
+import pytest
+from src.lidar.lidar_control import LidarControl
+from src.lidar.lidar_view import IMAGE_SIZE, MAX_RANGE, FrameRenderer, show
+from src.lidar.scan_buffer import ScanBuffer
+
+
+def make_scan(distance, points=360):
+    angles = np.arange(points, dtype=np.float32) + 0.5
+    return np.column_stack((np.full(points, 15.0), angles, np.full(points, distance)))
+
+
+def test_frame_renderer_writes_png(tmp_path):
+    angles = ScanBuffer().angles
+    view = FrameRenderer(angles, str(tmp_path), rate=1000.0)
+    distances = np.zeros(len(angles), dtype=np.float32)
+    distances[0] = MAX_RANGE / 2  # just right of straight ahead
+    distances[90] = MAX_RANGE + 1  # out of range, not drawn
+    view.draw(distances)
+
+    assert view.frames == 1 and view.last_path == str(tmp_path / "scan_000000.png")
+    image = cv2.imread(view.last_path, cv2.IMREAD_GRAYSCALE)
+    assert image.shape == (IMAGE_SIZE, IMAGE_SIZE)
+    assert np.array_equal(image, view.image)
+    assert np.count_nonzero(image == 255) == 1
+    row, col = np.argwhere(image == 255)[0]
+    assert row < IMAGE_SIZE / 2 and abs(col - IMAGE_SIZE / 2) <= 2
+    # Range rings are drawn behind the hits
+    assert np.count_nonzero(image == 60) > 0
+
+
+def test_frame_renderer_raw_and_bad_format(tmp_path):
+    angles = ScanBuffer().angles
+    view = FrameRenderer(angles, str(tmp_path), size=64, fmt="raw")
+    view.draw(np.full(len(angles), 1000.0, dtype=np.float32))
+    raw = np.fromfile(view.last_path, dtype=np.uint8).reshape(64, 64)
+    assert np.array_equal(raw, view.image)
+    with pytest.raises(ValueError):
+        FrameRenderer(angles, str(tmp_path), fmt="jpg")
+
+
+def test_read_if_newer_returns_only_newer_scans():
+    control = LidarControl(backend="null")
+    assert control.read_if_newer(0) is None
+
+    control.scan_buffer.push(make_scan(1000.0), timestamp=1.0)
+    scan = control.read_if_newer(0)
+    assert scan.seq == 1 and scan.timestamp == 1.0 and scan.points == 360
+    assert np.all(scan.distances == 1000.0)
+    assert control.read_if_newer(scan.seq) is None
+
+    control.scan_buffer.push(make_scan(2000.0), timestamp=2.0)
+    control.scan_buffer.push(make_scan(3000.0), timestamp=3.0)
+    out = scan.distances
+    newer = control.read_if_newer(scan.seq, out)
+    assert newer.seq == 3 and newer.timestamp == 3.0
+    # The caller's buffer is reused and detached from the ring
+    assert newer.distances is out and np.all(out == 3000.0)
+    control.scan_buffer.push(make_scan(4000.0))
+    assert np.all(out == 3000.0)
+
+
+def test_show_draws_each_scan_once(tmp_path):
+    control = LidarControl(backend="null")
+    control.scan_buffer.push(make_scan(1000.0))
+
+    class Source:
+        running = True
+
+        def read_if_newer(self, seq, out=None):
+            return control.read_if_newer(seq, out)
+
+    view = FrameRenderer(control.scan_buffer.angles, str(tmp_path), rate=200.0, size=64)
+    assert show(Source(), view, duration=0.1) == 1
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["scan_000000.png"]
@@ -0,0 +1,62 @@
+import threading
+import time
+from src.utils.mailbox import Mailbox
+
+
+def test_latest_value_and_seq():
+    clock = iter([1.0, 2.0]).__next__
+    box = Mailbox(clock=clock)
+    assert box.get() == (0, None, None)
+    assert box.age() is None
+    assert box.put("a") == 1
+    assert box.put("b") == 2
+    assert box.get().value == "b"
+    assert box.read_if_newer(1).value == "b"
+    assert box.read_if_newer(2) is None
+    assert box.age(now=2.5) == 0.5
+
+
+def test_waiter_wakes_on_put():
+    box = Mailbox()
+    results = []
+    waiting = threading.Event()
+
+    def reader():
+        waiting.set()
+        results.append(box.wait_for_newer(0, timeout=2.0))
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    waiting.wait()
+    while not box._waiters:
+        time.sleep(0.001)
+    box.put("ready")
+    thread.join(2.0)
+    assert results[0].value == "ready"
+    assert box._waiters == 0
+
+
+def test_every_waiter_wakes():
+    box = Mailbox()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(box.wait_for_newer(0, timeout=2.0)))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    while box._waiters < 4:
+        time.sleep(0.001)
+    box.put(42)
+    for thread in threads:
+        thread.join(2.0)
+    assert [message.value for message in results] == [42] * 4
+
+
+def test_wait_times_out_and_unregisters():
+    box = Mailbox()
+    box.put("old")
+    start = time.monotonic()
+    assert box.wait_for_newer(1, timeout=0.05) is None
+    assert time.monotonic() - start >= 0.05
+    assert box._waiters == 0
+    # Already newer: returns without waiting
+    assert box.wait_for_newer(0, timeout=0).value == "old"
@@ -0,0 +1,70 @@
+import pytest
+from src.motor_control.motor_driver import MockBackend, MotorDriver
+
+
+def driver(**kwargs):
+    backend = MockBackend()
+    return MotorDriver(backend, threaded=False, **kwargs), backend
+
+
+def test_output_slews_towards_target():
+    motors, backend = driver(max_accel=4.0, watchdog_timeout=5.0)
+    t = motors._last_step
+    motors.command(1.0, -1.0)
+    motors.step(t + 0.1)
+    assert motors.output == pytest.approx((0.4, -0.4), abs=0.01)
+    motors.step(t + 1.0)
+    assert motors.output == (1.0, -1.0)
+    assert backend.last == (1.0, -1.0)
+
+
+def test_deadband_skips_repeated_commands_and_writes():
+    motors, backend = driver(deadband=0.01, max_accel=100.0)
+    t = motors._last_step
+    assert motors.command(0.5, 0.5)
+    motors.step(t + 0.1)
+    writes = len(backend.writes)
+    assert not motors.command(0.505, 0.5)
+    motors.step(t + 0.2)
+    assert len(backend.writes) == writes
+    assert motors.skipped > 0
+
+
+def test_small_outputs_are_written_as_exact_zero():
+    motors, backend = driver(deadband=0.01, max_accel=100.0)
+    t = motors._last_step
+    motors.command(0.5, 0.5)
+    motors.step(t + 0.1)
+    motors.command(0.004, -0.004)
+    motors.step(t + 0.2)
+    assert backend.last == (0.0, 0.0)
+
+
+def test_watchdog_stops_without_commands():
+    motors, backend = driver(watchdog_timeout=0.5, max_accel=100.0)
+    motors.command(0.8, 0.8)
+    motors.step(motors.last_command + 0.1)
+    assert backend.last == (0.8, 0.8)
+    motors.step(motors.last_command + 0.6)
+    assert motors.watchdog_trips == 1
+    assert motors.target == (0.0, 0.0)
+    assert backend.last == (0.0, 0.0)
+
+
+def test_stop_bypasses_the_slew_limit():
+    motors, backend = driver(max_accel=1.0, watchdog_timeout=5.0)
+    t = motors._last_step
+    motors.command(1.0, 1.0)
+    motors.step(t + 1.0)
+    motors.stop()
+    assert motors.output == (0.0, 0.0)
+    assert backend.last == (0.0, 0.0)
+
+
+def test_close_stops_and_closes_backend():
+    motors, backend = driver(max_accel=100.0)
+    motors.command(0.7, 0.7)
+    motors.step(motors._last_step + 0.1)
+    motors.close()
+    assert backend.last == (0.0, 0.0)
+    assert backend.closed
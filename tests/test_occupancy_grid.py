@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from src.lidar.occupancy_grid import OccupancyGrid
+
+
+def grid():
+    return OccupancyGrid(size=2.0, resolution=0.1, max_range=1.5)
+
+
+def mark(grid, x, y, value=3.0):
+    row, col = grid.cell_of(x, y)
+    grid.log_odds[row, col] = value
+
+
+def value_at(grid, x, y):
+    row, col = grid.cell_of(x, y)
+    return grid.log_odds[row, col]
+
+
+@pytest.mark.parametrize("x, y", [(0.35, 0.0), (-0.35, 0.0), (0.0, 0.35), (0.25, -0.45)])
+def test_scroll_keeps_cells_in_place(x, y):
+    occupancy = grid()
+    mark(occupancy, 0.55, 0.25)
+    mark(occupancy, -0.45, -0.35, value=-2.0)
+    occupancy.move_to(x, y, 0.0)
+    assert occupancy.cell_of(x, y) == (occupancy.cells // 2, occupancy.cells // 2)
+    assert value_at(occupancy, 0.55, 0.25) == 3.0
+    assert value_at(occupancy, -0.45, -0.35) == -2.0
+    assert np.count_nonzero(occupancy.log_odds) == 2
+
+
+def test_scroll_forgets_cells_that_leave():
+    occupancy = grid()
+    mark(occupancy, -0.95, 0.0)
+    occupancy.move_to(0.3, 0.0, 0.0)
+    assert np.count_nonzero(occupancy.log_odds) == 0
+    # Scrolling back does not bring it back
+    occupancy.move_to(0.0, 0.0, 0.0)
+    assert np.count_nonzero(occupancy.log_odds) == 0
+
+
+def test_scroll_further_than_the_grid_clears_it():
+    occupancy = grid()
+    mark(occupancy, 0.15, 0.15)
+    occupancy.move_to(5.0, 5.0, 0.0)
+    assert not occupancy.log_odds.any()
+    assert occupancy.cell_of(5.0, 5.0) == (occupancy.cells // 2, occupancy.cells // 2)
+
+
+def test_wall_ahead_is_occupied_and_space_before_it_free():
+    occupancy = grid()
+    # One beam straight ahead (LiDAR 0 rad is the robot's front, +x at heading 0)
+    occupancy.integrate([705.0], [0.0])
+    assert value_at(occupancy, 0.75, 0.05) == pytest.approx(occupancy.l_occupied)
+    assert value_at(occupancy, 0.35, 0.05) == pytest.approx(occupancy.l_free)
+    assert not occupancy.is_path_clear(1.0, width=0.1)
+    assert occupancy.is_path_clear(0.5, width=0.1)
+    assert occupancy.is_path_clear(1.0, bearing=np.pi / 2, width=0.1)
+
+
+def test_log_odds_are_clamped():
+    occupancy = grid()
+    for _ in range(20):
+        occupancy.integrate([705.0], [0.0])
+    assert occupancy.log_odds.max() == occupancy.l_max
+    assert occupancy.log_odds.min() == occupancy.l_min
+
+
+def test_nearest_obstacle():
+    occupancy = grid()
+    assert occupancy.nearest_obstacle() == float('inf')
+    occupancy.integrate([705.0], [0.0])
+    assert occupancy.nearest_obstacle() == pytest.approx(0.7, abs=0.1)
+    # Outside the grid nothing is known, which compares like any other distance
+    assert occupancy.nearest_obstacle(50.0, 50.0) == float('inf')
+    assert not occupancy.nearest_obstacle(50.0, 50.0) < 0.5
@@ -0,0 +1,76 @@
+import itertools
+import numpy as np
+import pytest
+from src.computer_vision.computer_vision import RobotFollower
+from src.computer_vision.fake_camera import FakeCamera
+from src.computer_vision.overlay import OverlayCompositor, _full_frame_overlay
+from src.motor_control.motor_driver import MockBackend, MotorDriver
+from src.utils import instrumentation
+from src.utils.instrumentation import OVERLAY
+
+WIDTH, HEIGHT = 640, 480
+
+BOXES = [
+    (160, 120, 200, 240),  # well inside
+    (600, 200, 60, 100),  # label runs off the right edge
+    (100, -12, 80, 120),  # label above the top edge
+    (-20, 300, 90, 200),  # box off the left and bottom edges
+    (560, 460, 120, 40),  # bottom right corner
+]
+
+
+def frame(seed=0):
+    return np.random.default_rng(seed).integers(0, 256, (HEIGHT, WIDTH, 4), dtype=np.uint8)
+
+
+@pytest.mark.parametrize("box", BOXES)
+def test_roi_blend_matches_full_frame_blend(box):
+    label = "person (0.87)"
+    expected = frame()
+    _full_frame_overlay(expected, box, label)
+    actual = frame()
+    compositor = OverlayCompositor()
+    compositor.add_detection(box, "person", 0.87)
+    compositor.render(actual)
+    assert np.array_equal(actual, expected)
+
+
+def test_render_clears_the_batch():
+    compositor = OverlayCompositor()
+    compositor.add_detection(BOXES[0], "person", 0.5, track_id=3)
+    compositor.render(frame())
+    assert compositor.boxes == [] and compositor.labels == []
+    untouched = frame()
+    compositor.render(untouched)
+    assert np.array_equal(untouched, frame())
+
+
+def test_render_layer_clears_only_what_it_drew():
+    layer = np.zeros((HEIGHT, WIDTH, 4), dtype=np.uint8)
+    compositor = OverlayCompositor()
+    compositor.add_detection(BOXES[1], "person", 0.9)
+    compositor.render_layer(layer)
+    assert layer[..., 3].any()
+    compositor.add_detection(BOXES[0], "person", 0.9)
+    compositor.render_layer(layer)
+    x, y, w, h = BOXES[1]
+    assert not layer[max(y - 20, 0):y + h + 3, x - 2:, 3].any()
+    compositor.render_layer(layer)
+    assert not layer.any()
+
+
+def test_headless_follower_does_no_overlay_work():
+    camera = FakeCamera(realtime=False)
+    ticks = itertools.count()
+    follower = RobotFollower(None, headless=True, camera=camera, clock=lambda: next(ticks) / camera.rate,
+                             driver=MotorDriver(MockBackend(), threaded=False))
+    assert follower.compositor is None
+    before = instrumentation.instruments.spans.get(OVERLAY)
+    before = 0 if before is None else before.histogram.count
+    for _ in range(10):
+        request = camera.capture_request()
+        follower.draw_and_control(request)
+        request.release()
+    after = instrumentation.instruments.spans.get(OVERLAY)
+    assert (0 if after is None else after.histogram.count) == before
+    assert follower.driver.commands > 1
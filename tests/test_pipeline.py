@@ -0,0 +1,55 @@
+import time
+from src.computer_vision.pipeline import Stage
+
+
+def drain(stage, items, timeout=2.0):
+    for item in items:
+        stage.put(item)
+        end = time.monotonic() + timeout
+        while stage.queue.qsize() and time.monotonic() < end:
+            time.sleep(0.001)
+    time.sleep(0.05)
+
+
+def test_on_error_runs_for_each_failure():
+    handled, errors = [], []
+
+    def handler(item):
+        if item % 2:
+            raise ValueError(item)
+        handled.append(item)
+
+    stage = Stage("test", handler, maxsize=8, on_error=lambda item, error: errors.append(item)).start()
+    try:
+        drain(stage, range(6))
+    finally:
+        stage.stop()
+    assert handled == [0, 2, 4]
+    assert errors == [1, 3, 5]
+    assert stage.errors == 3
+    assert not stage.failed
+
+
+def test_stage_stops_after_consecutive_errors():
+    calls = []
+
+    def handler(item):
+        calls.append(item)
+        raise RuntimeError("broken")
+
+    stage = Stage("test", handler, maxsize=16, max_errors=3).start()
+    try:
+        drain(stage, range(5))
+        assert stage.failed
+        assert calls == [0, 1, 2]
+        assert not stage._thread.is_alive()
+    finally:
+        stage.stop()
+
+
+def test_full_queue_drops_oldest():
+    stage = Stage("test", lambda item: None, maxsize=1)
+    stage.put(1)
+    stage.put(2)
+    assert stage.dropped == 1
+    assert stage.queue.get_nowait() == 2
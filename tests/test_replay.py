@@ -0,0 +1,81 @@
+import time
+import numpy as np
+import pytest
+from src.lidar.lidar_stream import LidarStream
+from src.utils.recording import Recorder, ReplayLidar
+
+SCANS = 5
+POINTS = 360
+
+
+def record_scans(path, scans=SCANS, distance=3000.0):
+    with Recorder(str(path)) as recorder:
+        for seq in range(1, scans + 1):
+            angles = np.arange(POINTS, dtype=np.float32) * 360.0 / POINTS
+            scan = np.column_stack((np.full(POINTS, 15.0), angles, np.full(POINTS, distance + seq)))
+            recorder.record_scan(seq * 0.1, seq, scan)
+    return str(path)
+
+
+def wait_until_stopped(stream, timeout=5.0):
+    end = time.monotonic() + timeout
+    while stream.running and time.monotonic() < end:
+        time.sleep(0.01)
+    return not stream.running
+
+
+def test_replay_lidar_raises_eof_at_end(tmp_path):
+    device = ReplayLidar(record_scans(tmp_path / "scans.log"), speed=None)
+    measures = device.iter_measures()
+    count = 0
+    try:
+        for _ in measures:
+            count += 1
+    except EOFError:
+        pass
+    else:
+        raise AssertionError("iter_measures ended without EOFError")
+    assert count == SCANS * POINTS
+
+
+def test_stream_replays_log_to_completion(tmp_path):
+    path = record_scans(tmp_path / "scans.log")
+    stream = LidarStream(port=path, device_factory=lambda port: ReplayLidar(port, speed=None)).start()
+    try:
+        assert wait_until_stopped(stream)
+        # Every revolution, including the last one with no following marker, is published
+        assert stream.seq == SCANS
+        assert stream.ended
+        assert stream.reconnects == 0
+        assert stream.errors == 0
+        scan = stream.latest()
+        assert scan.distances[0] == 3000.0 + SCANS
+    finally:
+        stream.stop()
+
+
+def test_avoid_obstacle_returns_when_replay_ends(tmp_path, monkeypatch):
+    from src.motor_control import motor_control
+
+    monkeypatch.setenv("AFROBOTICS_MOTORS_BACKEND", "simulated")
+    monkeypatch.setattr(motor_control, "_driver", None)
+    path = record_scans(tmp_path / "scans.log")
+    stream = LidarStream(port=path, device_factory=lambda port: ReplayLidar(port, speed=1.0)).start()
+    start = time.monotonic()
+    motor_control.avoid_obstacle(stream=stream, poll_interval=0.01)
+    assert time.monotonic() - start < 5.0
+    assert stream.seq == SCANS
+    driver = motor_control.get_driver()
+    assert driver.target == (0.0, 0.0)
+    driver.close()
+    stream.stop()
+
+
+def test_simulated_camera_requires_headless():
+    from src.computer_vision.computer_vision import RobotFollower
+    from src.computer_vision.fake_camera import FakeCamera
+    from src.motor_control.motor_driver import MockBackend, MotorDriver
+
+    driver = MotorDriver(MockBackend(), threaded=False)
+    with pytest.raises(ValueError, match="headless"):
+        RobotFollower(None, headless=False, camera=FakeCamera(realtime=False), driver=driver)
@@ -0,0 +1,203 @@
+import math
+import os
+import subprocess
+import sys
+import threading
+import numpy as np
+import pytest
+from src.runtime.supervisor import Supervisor, WorkerSpec
+from src.runtime.workers import RingLidar
+from src.utils.shm_ring import SharedRing
+
+
+@pytest.fixture
+def scans():
+    ring = SharedRing.create(None, (360,), np.float32, slots=2)
+    yield ring
+    ring.close()
+
+
+def test_ring_lidar_clears_sectors_that_go_empty(scans):
+    lidar = RingLidar(scans)
+    scan = np.zeros(360, dtype=np.float32)
+    scan[355] = 200.0
+    scans.write(scan)
+    lidar.age()
+    assert lidar.sectors.revolutions == 1
+    empty = np.zeros(360, dtype=np.float32)
+    for _ in range(2):
+        scans.write(empty)
+        lidar.age()
+    assert lidar.sectors.revolutions == 3
+    assert lidar.sectors.nearest("forward") == math.inf
+
+
+def test_ring_lidar_reads_each_scan_once(scans):
+    lidar = RingLidar(scans)
+    scan = np.full(360, 1000.0, dtype=np.float32)
+    scans.write(scan)
+    lidar.age()
+    lidar.age()
+    assert lidar.seq == 1
+    assert lidar.sectors.revolutions == 1
+
+
+class FakeProcess:
+    def __init__(self):
+        self.alive = True
+        self.exitcode = None
+        self.pid = 1
+        self.terminated = False
+
+    def is_alive(self):
+        return self.alive
+
+    def exit(self, code):
+        self.alive = False
+        self.exitcode = code
+
+    def terminate(self):
+        self.terminated = True
+        self.exit(-15)
+
+    def kill(self):
+        self.exit(-9)
+
+    def join(self, timeout=None):
+        pass
+
+
+def supervisor(**kwargs):
+    """Supervisor wired to fake processes and a plain heartbeat list, without spawning."""
+    specs = [WorkerSpec("perception", None, False), WorkerSpec("control", None, True)]
+    stops = []
+    sup = Supervisor(specs, {}, {}, motor_stop=lambda: stops.append(True), **kwargs)
+    sup.stop_event = threading.Event()
+    sup.estop = threading.Event()
+    sup.estop.set()
+    sup.heartbeats = [0.0] * len(specs)
+    sup.stops = stops
+
+    def spawn(worker):
+        sup.heartbeats[worker.index] = 0.0
+        worker.process = FakeProcess()
+        worker.started = sup.now
+        worker.incarnation += 1
+
+    sup._spawn = spawn
+    sup.now = 100.0
+    for worker in sup.workers:
+        spawn(worker)
+    return sup
+
+
+def beat(sup, now):
+    sup.now = now
+    for worker in sup.workers:
+        if worker.process is not None:
+            sup.heartbeats[worker.index] = now
+    return sup.poll(now)
+
+
+def test_estop_released_once_every_worker_beats():
+    sup = supervisor()
+    assert not sup.poll(100.1)
+    assert sup.estop.is_set()
+    assert beat(sup, 100.2)
+    assert not sup.estop.is_set()
+
+
+def test_dead_worker_sets_estop_and_restarts_after_backoff():
+    sup = supervisor(backoff=0.5)
+    beat(sup, 100.0)
+    perception = sup.workers[0]
+    perception.process.exit(1)
+    assert not sup.poll(101.0)
+    assert sup.estop.is_set()
+    assert perception.process is None and perception.failures == 1
+    assert sup.stops == []
+
+    assert not beat(sup, 101.4)
+    assert perception.process is None
+    beat(sup, 101.5)
+    assert perception.incarnation == 2
+    assert beat(sup, 101.6)
+    assert not sup.estop.is_set()
+
+
+def test_backoff_doubles_up_to_the_cap():
+    sup = supervisor(backoff=0.5, max_backoff=1.5, max_restarts=10)
+    control = sup.workers[1]
+    delays = []
+    now = 100.0
+    for _ in range(4):
+        beat(sup, now)
+        control.process.exit(1)
+        sup.poll(now)
+        delays.append(control.next_start - now)
+        now = control.next_start
+        beat(sup, now)
+    assert delays == [0.5, 1.0, 1.5, 1.5]
+
+
+def test_gives_up_after_max_restarts_in_the_window():
+    sup = supervisor(backoff=0.1, max_restarts=2, restart_window=60.0)
+    control = sup.workers[1]
+    now = 100.0
+    for _ in range(3):
+        beat(sup, now)
+        control.process.exit(1)
+        sup.poll(now)
+        now = max(now, control.next_start) + 0.1
+    assert sup.failed is not None
+    beat(sup, now + 10.0)
+    assert control.process is None
+
+
+def test_restarts_outside_the_window_are_forgotten():
+    sup = supervisor(backoff=0.1, max_restarts=2, restart_window=5.0)
+    control = sup.workers[1]
+    for now in (100.0, 110.0, 120.0, 130.0):
+        beat(sup, now)
+        control.process.exit(1)
+        sup.poll(now)
+        beat(sup, now + 1.0)
+    assert sup.failed is None
+    assert control.incarnation == 5
+
+
+def test_motor_owner_death_stops_motors():
+    sup = supervisor()
+    beat(sup, 100.0)
+    sup.workers[1].process.exit(1)
+    sup.poll(100.5)
+    assert sup.stops == [True]
+
+
+def test_hung_and_unstarted_workers_are_terminated():
+    sup = supervisor(heartbeat_timeout=2.0, start_timeout=5.0)
+    perception, control = sup.workers
+    sup.heartbeats[perception.index] = 100.0
+    perception_process, control_process = perception.process, control.process
+    sup.poll(102.5)
+    assert perception_process.terminated and perception.process is None
+    assert control.process is control_process
+    sup.poll(105.5)
+    assert control_process.terminated and sup.stops == [True]
+
+
+def test_shutdown_sets_estop_and_stops_motors():
+    sup = supervisor()
+    assert beat(sup, 100.0)
+    sup.shutdown(timeout=0.1)
+    assert sup.stop_event.is_set() and sup.estop.is_set()
+    assert sup.stops == [True]
+
+
+def test_simulated_run_recovers_from_an_injected_crash():
+    result = subprocess.run([sys.executable, "-m", "src.runtime.supervisor", "--simulated", "--duration", "4",
+                             "--crash", "control:1"], capture_output=True, text=True, timeout=60,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "Worker control exited with code 1" in result.stdout
+    assert "control={'incarnation': 2, 'failures': 1}" in result.stdout
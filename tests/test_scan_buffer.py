@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from src.lidar.scan_buffer import ScanBuffer
+
+
+def scan(distance, angles=(0.5, 90.5, 180.5)):
+    return [(15, angle, distance) for angle in angles]
+
+
+def test_window_is_contiguous_across_the_wrap():
+    buffer = ScanBuffer(capacity=4)
+    for i in range(6):
+        buffer.push(scan(1000.0 + i), timestamp=float(i))
+    timestamps, distances, points = buffer.window()
+    assert timestamps.tolist() == [2.0, 3.0, 4.0, 5.0]
+    assert distances[:, 0].tolist() == [1002.0, 1003.0, 1004.0, 1005.0]
+    assert points.tolist() == [3, 3, 3, 3]
+    # A view into the mirrored storage, not a copy
+    assert np.shares_memory(distances, buffer._distances)
+
+
+def test_window_of_a_partial_buffer():
+    buffer = ScanBuffer(capacity=4)
+    buffer.push(scan(500.0), timestamp=1.0)
+    buffer.push(scan(600.0), timestamp=2.0)
+    timestamps, distances, _ = buffer.window(3)
+    assert timestamps.tolist() == [1.0, 2.0]
+    assert buffer.window(1)[1][0, 0] == 600.0
+
+
+def test_latest_is_read_only():
+    buffer = ScanBuffer(capacity=2)
+    assert buffer.latest() is None
+    buffer.push(scan(700.0))
+    latest = buffer.latest()
+    assert latest[90] == 700.0 and latest[45] == 0.0
+    with pytest.raises(ValueError):
+        latest[0] = 1.0
+
+
+def test_min_and_mean_reduction():
+    measures = [(15, 10.2, 1000.0), (15, 10.7, 2000.0)]
+    low = ScanBuffer(capacity=1, reduction="min")
+    mean = ScanBuffer(capacity=1, reduction="mean")
+    low.push(measures)
+    mean.push(measures)
+    assert low.latest()[10] == 1000.0
+    assert mean.latest()[10] == 1500.0
@@ -0,0 +1,61 @@
+import math
+from src.lidar.sector_index import SectorIndex
+
+
+def sweep(index, distances, start=0, stop=360, default=5000.0):
+    """One revolution: distance per whole degree from the dict, `default` mm elsewhere."""
+    for degree in range(start, stop):
+        index.update(degree + 0.5, distances.get(degree, default), new_scan=degree == start)
+
+
+def test_forward_sector_commits_after_crossing_zero():
+    index = SectorIndex()
+    sweep(index, {350: 800.0, 10: 1200.0}, start=300, stop=360)
+    # Sweep is still inside the forward sector: visible, not yet committed
+    assert index.nearest("forward") == 800.0
+    assert index._committed[index._ids["forward"]] == math.inf
+    sweep(index, {10: 1200.0}, start=0, stop=40)
+    assert index._committed[index._ids["forward"]] == 800.0
+
+
+def test_obstacle_clears_one_sweep_after_it_leaves():
+    index = SectorIndex()
+    sweep(index, {355: 400.0})
+    sweep(index, {})
+    # Committed when the second sweep left the sector at 30 degrees
+    assert index.nearest("forward") == 400.0
+    sweep(index, {})
+    assert index.nearest("forward") == 5000.0
+    assert not index.is_blocked("forward", speed=1.0)
+
+
+def test_heading_offset_rotates_sectors():
+    index = SectorIndex(heading_offset=90.0)
+    sweep(index, {90: 300.0})
+    sweep(index, {90: 300.0})
+    assert index.nearest("forward") == 300.0
+    assert index.nearest("right") == 5000.0
+
+
+def test_bad_returns_are_ignored():
+    index = SectorIndex()
+    index.update(0.5, 0.0)
+    index.update(1.5, 100.0, quality=0)
+    assert index.nearest("forward") == math.inf
+
+
+def test_obstacle_clears_when_sector_goes_out_of_range():
+    index = SectorIndex()
+    sweep(index, {355: 200.0}, default=0.0)
+    sweep(index, {}, default=0.0)
+    assert index.is_blocked("forward")
+    sweep(index, {}, default=0.0)
+    # Only zero-distance returns since: the sweeps still commit, with nothing in them
+    assert index.nearest("forward") == math.inf
+    assert not index.is_blocked("forward")
+
+
+def test_negative_offset_angles_floor_into_the_previous_degree():
+    index = SectorIndex(sectors={"narrow": (355.0, 356.0)}, heading_offset=10.0)
+    index.update(5.5, 700.0)
+    assert index.nearest("narrow") == 700.0
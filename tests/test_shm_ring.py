@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from src.utils.shm_ring import SharedRing
+
+
+@pytest.fixture
+def ring():
+    ring = SharedRing.create(None, (4, 2), np.float32, slots=1)
+    yield ring
+    ring.close()
+
+
+class _LappedOut(np.ndarray):
+    """Output buffer that lets the writer publish again while the reader copies into it."""
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        if self.lap is not None:
+            lap, self.lap = self.lap, None
+            lap()
+
+
+def test_read_retries_when_the_writer_laps_the_copy(ring):
+    ring.write(np.ones((4, 2)), timestamp=1.0)
+    out = np.empty((4, 2), np.float32).view(_LappedOut)
+    out.lap = lambda: ring.write(np.full((4, 2), 2.0), timestamp=2.0)
+    message = ring.read(0, out)
+    assert ring.torn == 1
+    assert message.seq == 2 and message.timestamp == 2.0
+    assert (message.value == 2.0).all()
+
+
+def test_slot_being_written_is_not_read(ring):
+    ring.write(np.ones((4, 2)))
+    ring._seq[0] = 3  # second write stopped between its two seq stores
+    assert ring.read(0, retries=3) is None
+    assert ring.torn == 0
+    ring._seq[0] = 4
+    ring._head[0] = 2
+    assert ring.read(0).seq == 2
+
+
+def test_attached_reader_sees_variable_length_payloads(ring):
+    reader = SharedRing(ring.spec)
+    try:
+        assert reader.read(0) is None
+        assert ring.write(np.arange(6).reshape(3, 2), timestamp=5.0) == 1
+        message = reader.read(0)
+        assert message.value.tolist() == [[0, 1], [2, 3], [4, 5]]
+        assert reader.read(message.seq) is None
+        # Longer payloads are truncated to the ring's rows
+        ring.write(np.zeros((9, 2)), timestamp=7.0)
+        assert len(reader.read(1).value) == 4
+        assert reader.age(now=8.0) == 1.0
+    finally:
+        reader.close()
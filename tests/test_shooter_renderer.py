@@ -0,0 +1,80 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+import pytest
+from src.computer_vision.shooter_renderer import BLACK, BLUE, ShooterRenderer, TextCache
+from src.computer_vision.shooter_world import ShooterWorld
+
+
+@pytest.fixture
+def screen():
+    pygame.display.init()
+    yield pygame.display.set_mode((600, 600))
+    pygame.display.quit()
+
+
+@pytest.fixture
+def updates(monkeypatch):
+    calls = []
+    monkeypatch.setattr(pygame.display, "update", lambda rects=None: calls.append(list(rects)))
+    monkeypatch.setattr(pygame.display, "flip", lambda: calls.append("flip"))
+    return calls
+
+
+def test_text_cache_reuses_surfaces_for_unchanged_text():
+    cache = TextCache(max_entries=2)
+    score = cache.render("Score: 1")
+    assert cache.render("Score: 1") is score
+    assert cache.render("Score: 1", (255, 0, 0)) is not score
+    assert (cache.hits, cache.misses) == (1, 2)
+    cache.render("Score: 2")
+    # Least recently used entry was evicted
+    assert cache.render("Score: 1") is not score
+
+
+def test_dirty_rects_cover_old_and_new_positions(screen, updates):
+    world = ShooterWorld()
+    renderer = ShooterRenderer(screen, world)
+    brick = world.bricks.spawn(300, 200, 75, 30)
+    renderer.draw()
+    assert updates == ["flip"]
+
+    world.bricks.y[brick] += 40
+    renderer.draw()
+    dirty = updates[-1]
+    assert dirty != "flip"
+    old, new = pygame.Rect(300, 200, 75, 30), pygame.Rect(300, 240, 75, 30)
+    assert any(rect.contains(old) for rect in dirty)
+    assert any(rect.contains(new) for rect in dirty)
+    assert screen.get_at((310, 205))[:3] == BLACK
+    assert screen.get_at((310, 265))[:3] == BLUE
+
+
+def test_unchanged_hud_is_not_redrawn(screen, updates):
+    world = ShooterWorld()
+    renderer = ShooterRenderer(screen, world)
+    renderer.draw()
+    renderer.draw()
+    misses = renderer.text.misses
+    renderer.draw()
+    assert renderer.text.misses == misses
+    # Only the player, which did not move, is redrawn
+    assert updates[-1] == [pygame.Rect(world.player.x, world.player.y, world.player.width, world.player.height)] * 2
+
+
+def test_full_redraw_fallbacks(screen, updates):
+    world = ShooterWorld()
+    ShooterRenderer(screen, world, full_redraw=True).draw()
+    assert updates[-1] == "flip"
+
+    renderer = ShooterRenderer(screen, world, max_dirty_rects=3)
+    renderer.draw()
+    world.bricks.spawn_many([0, 100, 200, 300], 100, 75, 30)
+    renderer.draw()
+    assert updates[-1] == "flip" and renderer.flips == 2
+
+    renderer.invalidate()
+    renderer.draw()
+    assert renderer.flips == 3
@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+from src.computer_vision import shooter_world
+from src.computer_vision.entity_store import EntityStore, points_in_boxes
+from src.computer_vision.shooter_world import BRICK_HEIGHT, BRICK_WIDTH, ShooterWorld
+
+
+def test_dead_slots_are_reused_before_growing():
+    store = EntityStore(capacity=4)
+    first = store.spawn_many([1, 2, 3, 4], 0, 1, 1)
+    assert first.tolist() == [0, 1, 2, 3]
+    assert store.kill([1, 3, 3]) == 2
+    assert len(store) == 2
+    again = store.spawn_many([5, 6, 7], 0, 1, 1)
+    assert sorted(again[:2].tolist()) == [1, 3]
+    assert again[2] == 4 and store.capacity >= 5
+    assert store.indices().tolist() == [0, 1, 2, 3, 4]
+    assert sorted(store.x[store.indices()].tolist()) == [1, 3, 5, 6, 7]
+
+
+def test_killing_everything_compacts_to_empty():
+    store = EntityStore()
+    idx = store.spawn_many(np.arange(10), 0, 1, 1)
+    store.kill(idx[:5])
+    assert store.used == 10
+    store.kill(idx)
+    assert store.used == 0 and len(store) == 0
+    assert store.spawn(1, 1, 1, 1) == 0
+
+
+def test_move_and_kill_where_touch_only_live_entities():
+    store = EntityStore()
+    idx = store.spawn_many([0, 0, 0], [0, 10, 20], 1, 1, vel_y=5.0)
+    store.kill([idx[1]])
+    store.move()
+    assert store.y[:3].tolist() == [5.0, 10.0, 25.0]
+    assert store.kill_where(store.y[:store.used] > 0) == 2
+    assert len(store) == 0
+
+
+def brute_force(points, boxes):
+    hits = set()
+    for b in boxes.indices():
+        for p in points.indices():
+            if (boxes.x[b] < points.x[p] < boxes.x[b] + boxes.w[b] and
+                    boxes.y[b] < points.y[p] < boxes.y[b] + boxes.h[b]):
+                hits.add(int(b))
+    return sorted(hits)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_grid_hash_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    boxes, points = EntityStore(), EntityStore()
+    n = int(rng.integers(1, 60))
+    boxes.spawn_many(rng.uniform(-100, 600, n), rng.uniform(-100, 600, n),
+                     rng.uniform(1, 80, n), rng.uniform(1, 40, n))
+    m = int(rng.integers(1, 200))
+    points.spawn_many(rng.uniform(-100, 700, m), rng.uniform(-100, 700, m), 5, 10)
+    # Some on exact edges, which the strict test must not count
+    points.spawn_many(boxes.x[:3], boxes.y[:3] + 1, 5, 10)
+    boxes.kill(rng.choice(n, size=n // 4, replace=False))
+    points.kill(rng.choice(m, size=m // 4, replace=False))
+    assert points_in_boxes(points, boxes).tolist() == brute_force(points, boxes)
+
+
+def test_empty_stores_collide_with_nothing():
+    boxes, points = EntityStore(), EntityStore()
+    assert len(points_in_boxes(points, boxes)) == 0
+    boxes.spawn(0, 0, 10, 10)
+    assert len(points_in_boxes(points, boxes)) == 0
+
+
+def test_tick_scores_hits_and_loses_lives(monkeypatch):
+    monkeypatch.setattr(shooter_world, "SPAWN_RATE", 10 ** 6)
+    monkeypatch.setattr(shooter_world, "FIRE_RATE", 10 ** 6)
+    world = ShooterWorld(starting_lives=2)
+    world.tick()  # frame 0 spawns a brick and fires; clear them for a scripted scene
+    world.bricks.clear()
+    world.bullets.clear()
+
+    # A bullet just below a brick flies into it on the next tick
+    world.bricks.spawn(100, 100, BRICK_WIDTH, BRICK_HEIGHT, 0.0)
+    world.bullets.spawn(120, 100 + BRICK_HEIGHT + 3, 5, 10, -7.0)
+    world.tick()
+    assert world.score == 1
+    assert len(world.bricks) == 0 and len(world.bullets) == 1
+
+    # Two bricks falling off the bottom cost both lives and end the game
+    world.bricks.spawn_many([0, 200], world.height - 1, BRICK_WIDTH, BRICK_HEIGHT, 2.0)
+    world.tick()
+    assert world.lives == 0 and world.game_over
+    world.tick()
+    assert not world.game_over and world.lives == 2 and world.score == 0
+
+
+def test_player_follows_the_wrists_within_the_window():
+    world = ShooterWorld()
+    world.move_player((100, 300), (200, 300))
+    assert world.player.x == 150 - world.player.width // 2
+    world.move_player((-500, 0), (-500, 0))
+    assert world.player.x == 0
+    world.move_player((5000, 0), (5000, 0))
+    assert world.player.x == world.width - world.player.width
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from src.computer_vision.detections import DETECTION_DTYPE
+from src.computer_vision.tracker import KalmanBoxFilter, Tracker, iou_matrix
+
+
+def detections(*boxes, score=0.9):
+    out = np.zeros(len(boxes), dtype=DETECTION_DTYPE)
+    for i, box in enumerate(boxes):
+        out[i] = (box, score, 0)
+    return out
+
+
+def test_iou_matrix():
+    ious = iou_matrix([(0, 0, 10, 10)], [(0, 0, 10, 10), (5, 0, 10, 10), (20, 20, 5, 5)])
+    assert ious[0].tolist() == pytest.approx([1.0, 50 / 150, 0.0])
+
+
+def test_kalman_filter_learns_constant_velocity():
+    kalman = KalmanBoxFilter((100, 100, 50, 100), 0.0)
+    for step in range(1, 30):
+        t = step / 30
+        kalman.predict(t)
+        kalman.update((100 + 300 * t, 100, 50, 100))
+    assert kalman.x[4] == pytest.approx(300.0, rel=0.05)
+    # Extrapolated half a second ahead without touching the filter
+    assert kalman.state_at(kalman.timestamp + 0.5)[0] == pytest.approx(kalman.x[0] + 150.0, rel=0.05)
+    assert kalman.timestamp == pytest.approx(29 / 30)
+
+
+def test_locks_on_largest_confirmed_track_and_keeps_it():
+    tracker = Tracker(min_hits=2)
+    small, large = (10, 10, 40, 80), (300, 50, 100, 200)
+    tracker.update(detections(small, large), 0.0)
+    assert tracker.locked_id is None
+    tracker.update(detections(small, large), 0.1)
+    locked = tracker.locked_track()
+    assert tuple(locked.filter.x[2:4]) == pytest.approx((100, 200), abs=1)
+
+    # A bigger newcomer does not steal the lock
+    tracker.update(detections(small, large, (500, 0, 300, 400)), 0.2)
+    tracker.update(detections(small, large, (500, 0, 300, 400)), 0.3)
+    assert tracker.locked_id == locked.track_id
+
+
+def test_target_coasts_then_expires():
+    tracker = Tracker(min_hits=1, max_age=1.0, coast_time=0.5)
+    tracker.update(detections((100, 100, 50, 100)), 0.0)
+    target = tracker.target(0.0)
+    assert target is not None and not target.predicted
+    assert tracker.target(0.3).predicted
+    assert tracker.target(0.6) is None
+    tracker.update(detections(), 1.2)
+    assert tracker.tracks == [] and tracker.locked_id is None
+
+
+def test_fast_mover_matches_by_centroid():
+    tracker = Tracker(min_hits=1)
+    tracker.update(detections((100, 100, 50, 100)), 0.0)
+    track_id = tracker.locked_id
+    # Moved a full width: no overlap with the prediction, but within the centroid gate
+    tracker.update(detections((160, 100, 50, 100)), 0.1)
+    assert len(tracker.tracks) == 1
+    assert tracker.locked_id == track_id